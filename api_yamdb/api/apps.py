@@ -7,3 +7,7 @@ class ApiConfig(AppConfig):
     """Настройки конфигурации приложения api."""
 
     name = 'api'
+
+    def ready(self):
+        """Подключает сигналы и проверки настроек приложения."""
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,46 @@
+"""Аутентификация приложения api."""
+
+import copy
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import LRUBackend, resource_versions
+
+USER_VERSION = 'user:{}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с кэшем пользователей по идентификатору токена.
+
+    Ключ включает версию пользователя из общего хранилища, которую
+    увеличивает любое сохранение или удаление User, поэтому смена роли
+    сразу действует во всех воркерах.
+    """
+
+    users = None
+
+    @classmethod
+    def get_cache(cls):
+        """Возвращает ограниченный кэш пользователей процесса."""
+        if cls.users is None:
+            cls.users = LRUBackend(settings.AUTH_USER_CACHE['MAX_ENTRIES'])
+        return cls.users
+
+    def get_user(self, validated_token):
+        """Возвращает пользователя из кэша или из базы данных."""
+        config = settings.AUTH_USER_CACHE
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        token_id = validated_token.get(api_settings.JTI_CLAIM)
+        if not config['ENABLED'] or user_id is None or token_id is None:
+            return super().get_user(validated_token)
+        key = '{}:{}'.format(
+            token_id, resource_versions.get([USER_VERSION.format(user_id)])
+        )
+        user = self.get_cache().get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            self.get_cache().set(key, user, config['TIMEOUT'])
+        # Views may change request.user, so every request gets its own copy.
+        return copy.copy(user)
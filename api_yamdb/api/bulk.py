@@ -0,0 +1,225 @@
+"""Пакетное создание и обновление объектов каталога."""
+
+from django.db import router, transaction
+from reviews.models import Category, Genre, Title, TitleStats
+
+from .serializers import (CategoryBulkSerializer, CategorySerializer,
+                          GenreBulkSerializer, GenreSerializer,
+                          TitleBulkSerializer)
+from .signals import bump_on_commit
+
+
+class BulkCreator:
+    """Пакетное создание объектов с ошибками по каждому элементу.
+
+    Элементы проверяются сериализатором без запросов к базе, проверки,
+    требующие базы, выполняются в resolve одним запросом на пакет, а
+    прошедшие проверку объекты вставляются в одной транзакции: при ошибке
+    базы не сохраняется ни один объект пакета. Объекты с естественным
+    ключом upsert_key можно создавать или обновлять (upsert=True).
+    """
+
+    model = None
+    serializer_class = None
+    resources = ()
+    upsert_key = None
+
+    def __init__(self, items, using=None, upsert=False):
+        """Запоминает элементы пакета."""
+        self.items = items
+        self.using = using or router.db_for_write(self.model)
+        self.upsert = upsert
+        self.errors = {}
+        self.updated = []
+
+    def validate(self):
+        """Возвращает проверенные данные элементов по их индексам."""
+        rows = {}
+        for index, item in enumerate(self.items):
+            serializer = self.serializer_class(data=item)
+            if serializer.is_valid():
+                rows[index] = serializer.validated_data
+            else:
+                self.errors[index] = serializer.errors
+        self.resolve(rows)
+        return rows
+
+    def reject(self, rows, index, field, message):
+        """Исключает элемент из пакета с ошибкой в поле."""
+        del rows[index]
+        self.errors.setdefault(index, {}).setdefault(field, []).append(
+            message
+        )
+
+    def resolve(self, rows):
+        """Проверяет пакет целиком."""
+
+    def insert(self, rows):
+        """Вставляет объекты и возвращает их представления."""
+        raise NotImplementedError
+
+    def save(self):
+        """Создает прошедшие проверку объекты и возвращает их."""
+        rows = self.validate()
+        if not rows:
+            return []
+        with transaction.atomic(using=self.using):
+            for resource in self.resources:
+                bump_on_commit(resource, self.using)
+            return self.insert(rows)
+
+    def result(self, created):
+        """Возвращает тело ответа с сохраненными объектами и ошибками."""
+        result = {'created': created}
+        if self.upsert:
+            result['updated'] = self.updated
+        result['errors'] = [
+            {'index': index, 'errors': errors}
+            for index, errors in sorted(self.errors.items())
+        ]
+        return result
+
+
+class SlugBulkCreator(BulkCreator):
+    """Пакетное создание и обновление объектов с уникальным slug."""
+
+    output_serializer_class = None
+    upsert_key = 'slug'
+
+    def resolve(self, rows):
+        """Отклоняет повторы slug в пакете и находит существующие slug.
+
+        При создании существующий slug - ошибка, при upsert элемент
+        обновляет объект с этим slug.
+        """
+        seen = set()
+        for index, row in list(rows.items()):
+            if row['slug'] in seen:
+                self.reject(rows, index, 'slug', 'Slug повторяется в пакете.')
+            seen.add(row['slug'])
+        existing = dict(
+            self.model.objects.using(self.using)
+            .filter(slug__in=[row['slug'] for row in rows.values()])
+            .values_list('slug', 'pk')
+        )
+        for index, row in list(rows.items()):
+            if row['slug'] not in existing:
+                continue
+            if self.upsert:
+                row['pk'] = existing[row['slug']]
+            else:
+                self.reject(
+                    rows, index, 'slug', 'Объект с таким slug уже существует.'
+                )
+
+    def insert(self, rows):
+        """Вставляет новые объекты и обновляет существующие двумя запросами."""
+        objects = [self.model(**row) for _, row in sorted(rows.items())]
+        created = [obj for obj in objects if obj.pk is None]
+        updated = [obj for obj in objects if obj.pk is not None]
+        manager = self.model.objects.using(self.using)
+        manager.bulk_create(created)
+        if updated:
+            manager.bulk_update(updated, [
+                name for name in self.serializer_class.Meta.fields
+                if name != self.upsert_key
+            ])
+        self.updated = self.output_serializer_class(updated, many=True).data
+        return self.output_serializer_class(created, many=True).data
+
+
+class GenreBulkCreator(SlugBulkCreator):
+    """Пакетное создание и обновление жанров."""
+
+    model = Genre
+    serializer_class = GenreBulkSerializer
+    output_serializer_class = GenreSerializer
+    resources = ('genres',)
+
+
+class CategoryBulkCreator(SlugBulkCreator):
+    """Пакетное создание и обновление категорий."""
+
+    model = Category
+    serializer_class = CategoryBulkSerializer
+    output_serializer_class = CategorySerializer
+    resources = ('categories',)
+
+
+class TitleBulkCreator(BulkCreator):
+    """Пакетное создание произведений с жанрами и категориями по slug."""
+
+    model = Title
+    serializer_class = TitleBulkSerializer
+    resources = ('titles',)
+    title_fields = ('name', 'year', 'description')
+
+    def resolve(self, rows):
+        """Находит жанры и категории всего пакета двумя запросами."""
+        genres = dict(
+            Genre.objects.using(self.using).filter(slug__in={
+                slug for row in rows.values() for slug in row['genre']
+            }).values_list('slug', 'pk')
+        )
+        categories = dict(
+            Category.objects.using(self.using).filter(slug__in={
+                row['category'] for row in rows.values()
+            }).values_list('slug', 'pk')
+        )
+        for index, row in list(rows.items()):
+            missing = [slug for slug in row['genre'] if slug not in genres]
+            if missing:
+                self.reject(rows, index, 'genre', 'Жанры не найдены: {}.'
+                            .format(', '.join(missing)))
+            elif row['category'] not in categories:
+                self.reject(rows, index, 'category', 'Категория не найдена.')
+            else:
+                row['genre_ids'] = list(dict.fromkeys(
+                    genres[slug] for slug in row['genre']
+                ))
+                row['category_id'] = categories[row['category']]
+
+    def insert(self, rows):
+        """Вставляет произведения и их жанры пакетами."""
+        rows = [row for _, row in sorted(rows.items())]
+        titles = [
+            Title(category_id=row['category_id'], **{
+                field: row[field] for field in self.title_fields
+                if field in row
+            })
+            for row in rows
+        ]
+        self.create_titles(titles)
+        through = Title.genre.through
+        through.objects.using(self.using).bulk_create([
+            through(title_id=title.pk, genre_id=genre_id)
+            for title, row in zip(titles, rows)
+            for genre_id in row['genre_ids']
+        ])
+        return [
+            {
+                'id': title.pk,
+                'name': title.name,
+                'year': title.year,
+                'description': title.description,
+                'genre': row['genre'],
+                'category': row['category'],
+            }
+            for title, row in zip(titles, rows)
+        ]
+
+    def create_titles(self, titles):
+        """Вставляет произведения, получая их первичные ключи.
+
+        Если база не возвращает ключи из пакетной вставки, произведения
+        сохраняются по одному в той же транзакции.
+        """
+        connection = transaction.get_connection(self.using)
+        if not connection.features.can_return_ids_from_bulk_insert:
+            for title in titles:
+                title.save(using=self.using)
+            return
+        Title.objects.using(self.using).bulk_create(titles)
+        TitleStats.objects.using(self.using).bulk_create(
+            [TitleStats(title_id=title.pk) for title in titles]
+        )
@@ -0,0 +1,236 @@
+"""Кэш ответов приложения api."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .replicas import primary
+
+VERSION_KEY = 'api:version:{}'
+LOCK_KEY = '{}:lock'
+
+
+class LRUBackend:
+    """Ограниченный по размеру кэш в памяти процесса."""
+
+    def __init__(self, max_entries):
+        """Создает пустой кэш на max_entries записей."""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Возвращает значение или None, если его нет или оно устарело."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        """Сохраняет значение, вытесняя давно не использованные."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def claim(self, key, timeout):
+        """Внутри процесса заполнение уже защищено блокировкой."""
+        return True
+
+    def release(self, key):
+        """Освобождать нечего."""
+
+    def clear(self):
+        """Очищает кэш."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedBackend:
+    """Кэш в общем хранилище Django, доступный всем воркерам."""
+
+    def __init__(self, alias):
+        """Использует кэш Django с псевдонимом alias."""
+        self.cache = caches[alias]
+
+    def get(self, key):
+        """Возвращает значение или None."""
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout):
+        """Сохраняет значение."""
+        self.cache.set(key, value, timeout)
+
+    def claim(self, key, timeout):
+        """Захватывает право заполнить ключ среди всех воркеров."""
+        return self.cache.add(LOCK_KEY.format(key), 1, timeout)
+
+    def release(self, key):
+        """Снимает захват ключа."""
+        self.cache.delete(LOCK_KEY.format(key))
+
+    def clear(self):
+        """Очищает общее хранилище."""
+        self.cache.clear()
+
+
+class ResourceVersions:
+    """Счетчики версий ресурсов в общем хранилище Django."""
+
+    @property
+    def cache(self):
+        """Общее хранилище счетчиков версий."""
+        return caches[settings.RESPONSE_CACHE['CACHE_ALIAS']]
+
+    def get(self, resources):
+        """Возвращает текущие версии ресурсов."""
+        keys = [VERSION_KEY.format(resource) for resource in resources]
+        stored = self.cache.get_many(keys)
+        for key in keys:
+            if key not in stored:
+                # A lost counter restarts from the clock, so it never
+                # matches a version that was in use before.
+                self.cache.add(key, time.time_ns(), None)
+                stored[key] = self.cache.get(key)
+        return tuple(stored[key] for key in keys)
+
+    def bump(self, resource):
+        """Увеличивает версию ресурса."""
+        key = VERSION_KEY.format(resource)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, time.time_ns(), None)
+
+
+class ResponseCache:
+    """Кэш ответов на чтение с версиями ресурсов.
+
+    Ключ строится из пути, параметров запроса, роли пользователя и
+    текущих версий ресурсов, от которых зависит ответ. Запись в ресурс
+    увеличивает его версию в общем хранилище, после чего старые ключи
+    больше не совпадают ни в одном воркере. Ответ для кэша вычисляется
+    в основной базе: отстающая реплика сохранила бы под новой версией
+    данные до записи.
+    """
+
+    wait_interval = 0.05
+
+    def __init__(self):
+        """Создает кэш; бэкенд выбирается при первом обращении."""
+        self._backend = None
+        self._stripes = [threading.Lock() for _ in range(64)]
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    @property
+    def config(self):
+        """Настройки кэша из RESPONSE_CACHE."""
+        return settings.RESPONSE_CACHE
+
+    @property
+    def backend(self):
+        """Бэкенд для хранения ответов."""
+        if self._backend is None:
+            if self.config['BACKEND'] == 'shared':
+                self._backend = SharedBackend(self.config['CACHE_ALIAS'])
+            else:
+                self._backend = LRUBackend(self.config['MAX_ENTRIES'])
+        return self._backend
+
+    def make_key(self, request, resources):
+        """Строит ключ ответа для запроса."""
+        user = request.user
+        role = user.role if user.is_authenticated else 'anonymous'
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw = '{}|{}|{}|{}|{}?{}'.format(
+            ','.join(resources),
+            resource_versions.get(resources),
+            role,
+            request.get_host(),
+            request.path,
+            query,
+        )
+        return 'api:response:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def fetch(self, request, resources, compute, timeout=None):
+        """Возвращает ответ из кэша или вычисляет его один раз.
+
+        timeout ограничивает время жизни ответа сильнее RESPONSE_CACHE.
+        """
+        if not self.config['ENABLED']:
+            return compute()
+        key = self.make_key(request, resources)
+        cached = self.backend.get(key)
+        if cached is None:
+            stripe = self._stripes[hash(key) % len(self._stripes)]
+            with stripe:
+                cached = self.backend.get(key)
+                if cached is None:
+                    cached = self._wait_for_peer(key)
+                if cached is None:
+                    return self._fill(key, resources, compute, timeout)
+        self._count(resources[0], 'hit')
+        response = Response(cached)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def _wait_for_peer(self, key):
+        """Ждет, пока ответ вычислит воркер, захвативший ключ."""
+        timeout = self.config['LOCK_TIMEOUT']
+        if self.backend.claim(key, timeout):
+            return None
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.wait_interval)
+            cached = self.backend.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+    def _fill(self, key, resources, compute, timeout=None):
+        """Вычисляет ответ и сохраняет его в кэш."""
+        timeout = min(
+            timeout or self.config['TIMEOUT'], self.config['TIMEOUT']
+        )
+        try:
+            with primary():
+                response = compute()
+            if response.status_code == 200:
+                self.backend.set(key, response.data, timeout)
+        finally:
+            self.backend.release(key)
+        self._count(resources[0], 'miss')
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def _count(self, resource, outcome):
+        """Учитывает попадание или промах."""
+        with self._stats_lock:
+            counters = self._stats.setdefault(resource, {'hit': 0, 'miss': 0})
+            counters[outcome] += 1
+
+    def stats(self):
+        """Возвращает счетчики попаданий и промахов по ресурсам."""
+        with self._stats_lock:
+            return {
+                resource: dict(counters)
+                for resource, counters in self._stats.items()
+            }
+
+
+resource_versions = ResourceVersions()
+response_cache = ResponseCache()
@@ -0,0 +1,61 @@
+"""Проверки настроек приложения api."""
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared(alias):
+    """Проверяет, что кэш alias общий для всех процессов."""
+    return settings.CACHES[alias]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+@checks.register()
+def check_shared_cache(app_configs, **kwargs):
+    """Предупреждает об общем состоянии в кэше одного процесса."""
+    warnings = []
+    config = settings.RESPONSE_CACHE
+    if config['ENABLED'] and not cache_is_shared(config['CACHE_ALIAS']):
+        warnings.append(checks.Warning(
+            'RESPONSE_CACHE is enabled, but resource versions are kept in '
+            'a process-local cache.',
+            hint=(
+                'Writes made by other processes, workers and management '
+                'commands stay invisible for up to RESPONSE_CACHE TIMEOUT '
+                'seconds. Set CACHE_BACKEND and CACHE_LOCATION to a shared '
+                'store.'
+            ),
+            id='api.W001',
+        ))
+    if settings.AUTH_USER_CACHE['ENABLED'] and not cache_is_shared(
+        config['CACHE_ALIAS']
+    ):
+        warnings.append(checks.Warning(
+            'AUTH_USER_CACHE is enabled, but user versions are kept in a '
+            'process-local cache.',
+            hint=(
+                'Role changes and deactivations made in another process '
+                'take effect only after AUTH_USER_CACHE TIMEOUT seconds. '
+                'Set CACHE_BACKEND and CACHE_LOCATION to a shared store.'
+            ),
+            id='api.W003',
+        ))
+    if settings.DATABASE_REPLICAS['ALIASES'] and not cache_is_shared(
+        DEFAULT_CACHE_ALIAS
+    ):
+        warnings.append(checks.Warning(
+            'Database replicas are configured, but writers are pinned to '
+            'the primary in a process-local cache.',
+            hint=(
+                'A client whose next read lands on another worker may not '
+                'see its own writes. Set CACHE_BACKEND and CACHE_LOCATION '
+                'to a shared store.'
+            ),
+            id='api.W002',
+        ))
+    return warnings
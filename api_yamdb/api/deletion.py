@@ -0,0 +1,315 @@
+"""Удаление произведений, отзывов и пользователей запросами к базе."""
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.utils import timezone
+from reviews.models import (SCORE_FIELD, Comment, Review, Title, TitleRanking,
+                            TitleStats)
+from reviews.search import get_title_search
+from reviews.signals import shift_titles_rating
+from users.models import User
+
+from .authentication import USER_VERSION
+from .signals import bump_on_commit
+
+
+def per_row(rows, column, aggregate):
+    """Возвращает подзапрос с агрегатом строк rows, где column = OuterRef."""
+    return Subquery(
+        rows.filter(**{column: OuterRef('pk')}).order_by().values(column)
+        .annotate(total=aggregate).values('total'),
+        output_field=IntegerField(),
+    )
+
+
+def drop(rows, using):
+    """Удаляет строки одним запросом без сигналов и счетчиков.
+
+    QuerySet.delete() не удаляет отзывы и комментарии одним запросом:
+    у них есть сигналы post_delete и зависимые строки, поэтому сборщик
+    каскада загружает каждую строку в память. Счетчики, которые ведут
+    эти сигналы, шаги каскада сдвигают сами, так что здесь используется
+    закрытый QuerySet._raw_delete - только в этой функции.
+    """
+    rows._raw_delete(using)
+
+
+def forget_rankings(rankings, using):
+    """Удаляет строки рейтинга лучших и сдвигает следующие позиции вверх."""
+    for position in rankings.order_by('-position').values_list(
+        'position', flat=True
+    ):
+        TitleRanking.objects.using(using).filter(
+            position__gt=position
+        ).update(position=F('position') - 1)
+    drop(rankings, using)
+
+
+def forget_comments(comments, using):
+    """Удаляет комментарии и вычитает их из счетчиков отзывов."""
+    now = timezone.now()
+    reviews = Review.objects.using(using).filter(
+        pk__in=comments.values('review_id')
+    )
+    Title.objects.using(using).filter(
+        pk__in=reviews.values('title_id')
+    ).update(modified=now)
+    reviews.update(
+        comment_count=F('comment_count') - per_row(
+            comments, 'review_id', Count('pk')
+        ),
+        modified=now,
+    )
+    drop(comments, using)
+
+
+def forget_reviews(reviews, using):
+    """Удаляет отзывы и вычитает их из рейтинга и распределения оценок."""
+    for score in reviews.order_by().values_list(
+        'score', flat=True
+    ).distinct():
+        field = SCORE_FIELD.format(score)
+        scored = reviews.filter(score=score)
+        TitleStats.objects.using(using).filter(
+            title_id__in=scored.values('title_id')
+        ).update(**{
+            field: F(field) - per_row(scored, 'title_id', Count('pk'))
+        })
+    shift_titles_rating(
+        Title.objects.using(using).filter(pk__in=reviews.values('title_id')),
+        -per_row(reviews, 'title_id', Sum('score')),
+        -per_row(reviews, 'title_id', Count('pk')),
+    )
+    drop(reviews, using)
+
+
+class Cascade:
+    """Удаление объекта с зависимыми строками без сборщика каскада Django.
+
+    Зависимые строки удаляются запросами DELETE по условию в порядке
+    зависимостей, без загрузки в память и без сигналов post_delete;
+    счетчики, которые поддерживают эти сигналы, сдвигаются UPDATE того же
+    шага. Сам объект удаляется обычным delete(): зависимых строк у него
+    к этому времени нет, а его собственные сигналы срабатывают. Объект, у
+    которого не меньше DELETION['ASYNC_THRESHOLD'] зависимых строк,
+    скрывается сразу, а строки порциями удаляет воркер purge_deletions.
+    """
+
+    model = None
+    resources = ()
+
+    def __init__(self, instance, using=None):
+        """Запоминает удаляемый объект и базу."""
+        self.instance = instance
+        self.using = using or router.db_for_write(
+            self.model, instance=instance
+        )
+
+    def steps(self):
+        """Возвращает пары (выборка, удаление) в порядке зависимостей."""
+        raise NotImplementedError
+
+    def size(self):
+        """Возвращает число зависимых строк или None, если скрыть нельзя."""
+
+    def hide(self):
+        """Скрывает объект до удаления воркером."""
+        raise NotImplementedError
+
+    def bump(self):
+        """Сбрасывает кэши ресурсов после фиксации транзакции."""
+        for resource in self.resources:
+            bump_on_commit(resource, self.using)
+
+    def destroy(self):
+        """Удаляет или скрывает объект; True означает отложенное удаление."""
+        size = self.size()
+        if size is None or size < settings.DELETION['ASYNC_THRESHOLD']:
+            self.delete()
+            return False
+        with transaction.atomic(using=self.using):
+            self.bump()
+            self.hide()
+        return True
+
+    def delete(self):
+        """Удаляет зависимые строки и объект в одной транзакции."""
+        with transaction.atomic(using=self.using):
+            self.bump()
+            for rows, purge in self.steps():
+                purge(rows, self.using)
+            self.instance.delete(using=self.using)
+
+    def delete_batch(self, size):
+        """Удаляет порцию зависимых строк и возвращает число удаленных.
+
+        Когда зависимых строк не остается, удаляется сам объект.
+        """
+        for rows, purge in self.steps():
+            pks = list(rows.values_list('pk', flat=True)[:size])
+            if pks:
+                with transaction.atomic(using=self.using):
+                    self.bump()
+                    purge(
+                        rows.model.objects.using(self.using).filter(
+                            pk__in=pks
+                        ).order_by(),
+                        self.using,
+                    )
+                return len(pks)
+        self.delete()
+        return 1
+
+
+class ReviewCascade(Cascade):
+    """Удаление отзыва с комментариями.
+
+    Рейтинг произведения пересчитывают сигналы удаления отзыва.
+    """
+
+    model = Review
+
+    def steps(self):
+        """Комментарии удаляются без счетчика: он удаляется с отзывом."""
+        return (
+            (
+                Comment.objects.using(self.using).filter(
+                    review_id=self.instance.pk
+                ).order_by(),
+                drop,
+            ),
+        )
+
+
+class TitleCascade(Cascade):
+    """Удаление произведения с отзывами и комментариями.
+
+    Скрытое произведение исключается из выдачи, рейтинга лучших и
+    поиска; счетчики его отзывов до удаления не поддерживаются.
+    """
+
+    model = Title
+    resources = ('titles',)
+
+    def reviews(self):
+        """Возвращает отзывы произведения."""
+        return Review.objects.using(self.using).filter(
+            title_id=self.instance.pk
+        ).order_by()
+
+    def steps(self):
+        """Место в рейтинге лучших, комментарии, затем отзывы."""
+        return (
+            (
+                TitleRanking.objects.using(self.using).filter(
+                    title_id=self.instance.pk
+                ).order_by(),
+                forget_rankings,
+            ),
+            (
+                Comment.objects.using(self.using).filter(
+                    review_id__in=self.reviews().values('pk')
+                ).order_by(),
+                drop,
+            ),
+            (self.reviews(), drop),
+        )
+
+    def size(self):
+        """Считает строки по счетчикам отзывов и комментариев."""
+        comments = self.reviews().aggregate(total=Sum('comment_count'))
+        return self.instance.review_count + (comments['total'] or 0)
+
+    def hide(self):
+        """Помечает произведение и убирает его из рейтинга и поиска."""
+        pk = self.instance.pk
+        Title.objects.using(self.using).filter(pk=pk).update(
+            pending_deletion=True, modified=timezone.now()
+        )
+        TitleStats.objects.using(self.using).filter(title_id=pk).delete()
+        forget_rankings(
+            TitleRanking.objects.using(self.using).filter(title_id=pk),
+            self.using,
+        )
+        get_title_search(self.using).remove(pk)
+
+
+class UserCascade(Cascade):
+    """Удаление пользователя с отзывами и комментариями.
+
+    Его комментарии и отзывы вычитаются из счетчиков отзывов, рейтингов
+    и распределений оценок, которые остаются. Скрытый пользователь не
+    может войти, но его отзывы видны, пока их не удалит воркер.
+    """
+
+    model = User
+    resources = ('titles',)
+
+    def reviews(self):
+        """Возвращает отзывы пользователя."""
+        return Review.objects.using(self.using).filter(
+            author_id=self.instance.pk
+        ).order_by()
+
+    def comments(self):
+        """Возвращает комментарии пользователя."""
+        return Comment.objects.using(self.using).filter(
+            author_id=self.instance.pk
+        ).order_by()
+
+    def steps(self):
+        """Комментарии пользователя, комментарии к его отзывам, отзывы."""
+        return (
+            (self.comments(), forget_comments),
+            (
+                Comment.objects.using(self.using).filter(
+                    review_id__in=self.reviews().values('pk')
+                ).order_by(),
+                forget_comments,
+            ),
+            (self.reviews(), forget_reviews),
+        )
+
+    def size(self):
+        """Считает отзывы, комментарии к ним и комментарии пользователя."""
+        reviews = self.reviews().aggregate(
+            count=Count('pk'), comments=Sum('comment_count')
+        )
+        return (
+            reviews['count'] + (reviews['comments'] or 0)
+            + self.comments().count()
+        )
+
+    def hide(self):
+        """Помечает пользователя и закрывает ему вход."""
+        pk = self.instance.pk
+        User.objects.using(self.using).filter(pk=pk).update(
+            pending_deletion=True, is_active=False
+        )
+        bump_on_commit(USER_VERSION.format(pk), self.using)
+
+
+DEFERRED = (TitleCascade, UserCascade)
+
+
+def purge_batch(config=None):
+    """Удаляет порцию строк одного скрытого объекта и возвращает их число.
+
+    Объект блокируется с SKIP LOCKED, поэтому параллельные воркеры
+    удаляют разные объекты.
+    """
+    config = config or settings.DELETION
+    for cascade_class in DEFERRED:
+        model = cascade_class.model
+        using = router.db_for_write(model)
+        with transaction.atomic(using=using):
+            instance = (
+                model.objects.using(using).select_for_update(skip_locked=True)
+                .filter(pending_deletion=True).order_by('pk').first()
+            )
+            if instance is not None:
+                return cascade_class(instance, using).delete_batch(
+                    config['BATCH_SIZE']
+                )
+    return 0
@@ -0,0 +1,166 @@
+"""Потоковая выгрузка каталога, отзывов и комментариев."""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from reviews.models import Comment, Review, Title
+
+CHUNK_SIZE = 500
+
+
+def parse_since(value):
+    """Возвращает время из параметра since или None.
+
+    Время без часового пояса считается временем UTC.
+    """
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValidationError(
+            {'since': 'Ожидается дата и время в формате ISO 8601.'}
+        )
+    if timezone.is_naive(moment):
+        return timezone.make_aware(moment, timezone.utc)
+    return moment
+
+
+def next_since():
+    """Возвращает значение since для следующей выгрузки.
+
+    Время начала выгрузки сдвигается назад на EXPORT['SINCE_OVERLAP']
+    секунд, чтобы не потерять строки из транзакций, зафиксированных во
+    время выгрузки, и отставание реплик; такие строки могут повториться.
+    """
+    moment = timezone.now() - timedelta(
+        seconds=settings.EXPORT['SINCE_OVERLAP']
+    )
+    return moment.isoformat().replace('+00:00', 'Z')
+
+
+class Export:
+    """Выгрузка строк модели порциями через серверный курсор.
+
+    Строки читаются итератором values_list() с chunk_size, поэтому в
+    памяти находится не больше одной порции независимо от размера таблицы.
+    Столбцы с источником None заполняет complete. Фильтр since отбирает
+    строки, измененные не раньше указанного времени, по индексу
+    (modified, id) в порядке изменения.
+    """
+
+    model = None
+    columns = ()
+    sources = {}
+
+    def __init__(self, since=None, using=None):
+        """Запоминает фильтр и базу выгрузки."""
+        self.since = since
+        self.using = using
+
+    def get_queryset(self):
+        """Возвращает все строки по ключу или измененные по времени."""
+        queryset = self.model.objects.using(self.using)
+        if self.since is None:
+            return queryset.order_by('pk')
+        return queryset.filter(modified__gte=self.since).order_by(
+            'modified', 'pk'
+        )
+
+    def chunks(self):
+        """Возвращает порции строк выгрузки."""
+        names = [
+            name for name in self.columns
+            if self.sources.get(name, name) is not None
+        ]
+        sources = [self.sources.get(name, name) for name in names]
+        chunk = []
+        for values in self.get_queryset().values_list(*sources).iterator(
+            chunk_size=CHUNK_SIZE
+        ):
+            chunk.append(dict(zip(names, values)))
+            if len(chunk) == CHUNK_SIZE:
+                yield self.complete(chunk)
+                chunk = []
+        if chunk:
+            yield self.complete(chunk)
+
+    def complete(self, chunk):
+        """Дополняет порцию данными, которых нет в основной выборке."""
+        return chunk
+
+
+class TitleExport(Export):
+    """Выгрузка произведений с категорией, жанрами и рейтингом."""
+
+    model = Title
+    columns = (
+        'id', 'name', 'year', 'rating', 'review_count', 'description',
+        'category', 'modified', 'genre',
+    )
+    sources = {'category': 'category__slug', 'genre': None}
+
+    def get_queryset(self):
+        """Исключает произведения, ожидающие удаления."""
+        return super().get_queryset().filter(pending_deletion=False)
+
+    def complete(self, chunk):
+        """Добавляет жанры порции одним запросом."""
+        genres = defaultdict(list)
+        for title_id, slug in Title.genre.through.objects.using(
+            self.using
+        ).filter(
+            title_id__in=[row['id'] for row in chunk]
+        ).order_by('genre__slug').values_list('title_id', 'genre__slug'):
+            genres[title_id].append(slug)
+        for row in chunk:
+            row['genre'] = genres.get(row['id'], [])
+        return chunk
+
+
+class ReviewExport(Export):
+    """Выгрузка отзывов."""
+
+    model = Review
+    columns = (
+        'id', 'title', 'author', 'score', 'text', 'comment_count',
+        'pub_date', 'modified',
+    )
+    sources = {'title': 'title_id', 'author': 'author__username'}
+
+    def get_queryset(self):
+        """Исключает отзывы произведений, ожидающих удаления."""
+        return super().get_queryset().exclude(title__pending_deletion=True)
+
+
+class CommentExport(Export):
+    """Выгрузка комментариев."""
+
+    model = Comment
+    columns = (
+        'id', 'title', 'review', 'author', 'text', 'pub_date', 'modified',
+    )
+    sources = {
+        'title': 'review__title_id',
+        'review': 'review_id',
+        'author': 'author__username',
+    }
+
+    def get_queryset(self):
+        """Исключает комментарии произведений, ожидающих удаления."""
+        return super().get_queryset().exclude(
+            review__title__pending_deletion=True
+        )
+
+
+EXPORTS = {
+    'titles': TitleExport,
+    'reviews': ReviewExport,
+    'comments': CommentExport,
+}
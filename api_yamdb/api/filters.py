@@ -1,7 +1,38 @@
 """Фильтры приложения api."""
 
-from django_filters import CharFilter, FilterSet
-from reviews.models import Title
+from django.db.models import F
+from django_filters import CharFilter, FilterSet, NumberFilter, OrderingFilter
+from django_filters.constants import EMPTY_VALUES
+from reviews.models import Title, TitleRanking
+from reviews.search import search_titles
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """Сортировка, которую обслуживают индексы по (поле, id).
+
+    Пустые значения nullable-полей идут в конце в обоих направлениях,
+    а id в том же направлении делает порядок однозначным.
+    """
+
+    def get_ordering_value(self, param):
+        """Возвращает выражение сортировки с пустыми значениями в конце."""
+        descending = param.startswith('-')
+        name = self.param_map.get(param.lstrip('-'), param.lstrip('-'))
+        field = self.model._meta.get_field(name)
+        if not field.null:
+            return super().get_ordering_value(param)
+        expression = F(name)
+        if descending:
+            return expression.desc(nulls_last=True)
+        return expression.asc(nulls_last=True)
+
+    def filter(self, qs, value):
+        """Добавляет id к порядку сортировки."""
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        ordering.append('-id' if value[-1].startswith('-') else 'id')
+        return qs.order_by(*ordering)
 
 
 class TitleFilter(FilterSet):
@@ -10,9 +41,29 @@ class TitleFilter(FilterSet):
     category = CharFilter(field_name='category__slug')
     genre = CharFilter(field_name='genre__slug')
     name = CharFilter(lookup_expr='contains')
+    search = CharFilter(method='filter_search')
+    ordering = IndexedOrderingFilter(fields=('name', 'rating', 'year'))
 
     class Meta:
         """Класс Meta, хранящий информацию полях модели Title."""
 
         model = Title
         fields = ('year', 'name', 'category', 'genre')
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию."""
+        return search_titles(queryset, value)
+
+
+class LeaderboardFilter(FilterSet):
+    """Класс, в котором описаны настройки фильтрации рейтинга."""
+
+    category = CharFilter(field_name='title__category__slug')
+    genre = CharFilter(field_name='title__genre__slug')
+    year = NumberFilter(field_name='title__year')
+
+    class Meta:
+        """Класс Meta, хранящий информацию полях модели TitleRanking."""
+
+        model = TitleRanking
+        fields = ('category', 'genre', 'year')
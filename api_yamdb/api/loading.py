@@ -0,0 +1,103 @@
+"""Пакетная загрузка строк в таблицы моделей."""
+
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils import timezone
+
+
+def dependency_order(models):
+    """Упорядочивает модели так, чтобы связанные шли раньше ссылающихся."""
+    pending = list(models)
+    ordered = []
+    while pending:
+        for model in pending:
+            depends_on = {
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model is not model
+            }
+            if not depends_on & set(pending):
+                break
+        else:
+            raise ValueError('Circular foreign keys between {}'.format(
+                ', '.join(model._meta.label for model in pending)
+            ))
+        pending.remove(model)
+        ordered.append(model)
+    return ordered
+
+
+class TableWriter:
+    """Вставка строк в таблицу модели пакетами через executemany.
+
+    Строки не превращаются в экземпляры моделей и не проходят через
+    сигналы и pre_save, поэтому даты публикации из источника сохраняются
+    как есть, а для отсутствующих столбцов подставляются значения по
+    умолчанию полей модели.
+    """
+
+    def __init__(self, model, columns, using, ignore_conflicts=False):
+        """Готовит INSERT для столбцов columns таблицы модели."""
+        self.model = model
+        self.connection = connections[using]
+        self.using = using
+        opts = model._meta
+        self.fields = [opts.get_field(column) for column in columns]
+        self.defaults = [
+            field for field in opts.concrete_fields
+            if field not in self.fields and not field.primary_key
+        ]
+        ops = self.connection.ops
+        names = [
+            ops.quote_name(field.column)
+            for field in self.fields + self.defaults
+        ]
+        self.sql = '{} {} ({}) VALUES ({}) {}'.format(
+            ops.insert_statement(ignore_conflicts=ignore_conflicts),
+            ops.quote_name(opts.db_table),
+            ', '.join(names),
+            ', '.join(['%s'] * len(names)),
+            ops.ignore_conflicts_suffix_sql(ignore_conflicts=ignore_conflicts),
+        )
+
+    def convert(self, field, value):
+        """Приводит значение из источника к значению для базы данных."""
+        if value == '' and field.null:
+            return None
+        return field.get_db_prep_save(field.to_python(value), self.connection)
+
+    def default(self, field):
+        """Возвращает значение по умолчанию для незаполненного поля."""
+        if getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            return field.get_db_prep_save(timezone.now(), self.connection)
+        return field.get_db_prep_save(field.get_default(), self.connection)
+
+    def prepare(self, values):
+        """Готовит строку значений в порядке столбцов."""
+        return [
+            self.convert(field, value)
+            for field, value in zip(self.fields, values)
+        ] + [self.default(field) for field in self.defaults]
+
+    def write(self, rows):
+        """Вставляет пакет строк в одной транзакции.
+
+        Возвращает число вставленных строк: при ignore_conflicts строки с
+        уже занятыми ключами пропускаются.
+        """
+        with transaction.atomic(using=self.using):
+            with self.connection.cursor() as cursor:
+                cursor.executemany(
+                    self.sql, [self.prepare(values) for values in rows]
+                )
+                return cursor.rowcount
+
+    def reset_sequences(self):
+        """Сдвигает последовательности первичных ключей за загруженные."""
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), [self.model]
+        )
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,455 @@
+"""Нагрузочное тестирование маршрутов api."""
+
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import ADMIN, MODER, USER, User
+
+API = '/api/v1/'
+BULK_SIZE = 20
+
+
+def seed(scale, rng):
+    """Наполняет пустую базу данными в масштабе scale произведений."""
+    User.objects.bulk_create(
+        User(username='bench{}'.format(i),
+             email='bench{}@example.com'.format(i), role=role)
+        for i, role in enumerate(
+            [ADMIN] * 2 + [MODER] * max(2, scale // 20)
+            + [USER] * max(10, scale * 2)
+        )
+    )
+    users = list(User.objects.filter(username__startswith='bench'))
+    Category.objects.bulk_create(
+        Category(name='Category {}'.format(i), slug='category-{}'.format(i))
+        for i in range(5)
+    )
+    Genre.objects.bulk_create(
+        Genre(name='Genre {}'.format(i), slug='genre-{}'.format(i))
+        for i in range(15)
+    )
+    categories = list(Category.objects.all())
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        (Title(name='Title {}'.format(i), year=rng.randint(1950, 2020),
+               description='Description of title {}'.format(i),
+               category=rng.choice(categories))
+         for i in range(scale))
+    )
+    titles = list(Title.objects.values_list('pk', flat=True))
+    Title.genre.through.objects.bulk_create(
+        (Title.genre.through(title_id=title, genre_id=genre.pk)
+         for title in titles for genre in rng.sample(genres, 2))
+    )
+    Review.objects.bulk_create(
+        (Review(title_id=title, author=author, text='Review text',
+                score=rng.randint(1, 10))
+         for title in titles
+         for author in rng.sample(users, min(5, len(users))))
+    )
+    Comment.objects.bulk_create(
+        (Comment(review_id=review, author=rng.choice(users),
+                 text='Comment text')
+         for review in Review.objects.values_list('pk', flat=True)
+         for _ in range(2))
+    )
+    call_command('recalculate_ratings', verbosity=0)
+    call_command('refresh_leaderboard', once=True, verbosity=0)
+
+
+class Workload:
+    """Общее для всех потоков состояние нагрузки."""
+
+    sample_size = 2000
+
+    def __init__(self):
+        """Загружает из базы идентификаторы объектов и токены."""
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.titles = list(
+            Title.objects.values_list('pk', flat=True)[:self.sample_size]
+        )
+        self.reviews = list(
+            Review.objects.filter(title__in=self.titles)
+            .values_list('title_id', 'pk', 'author_id')[:self.sample_size]
+        )
+        self.comments = list(
+            Comment.objects.filter(review__in=[r[1] for r in self.reviews])
+            .values_list('review__title_id', 'review_id', 'pk', 'author_id')
+            [:self.sample_size]
+        )
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.users = {}
+        for role in (USER, MODER, ADMIN):
+            self.users[role] = list(
+                User.objects.filter(role=role).values_list(
+                    'pk', 'username', 'confirmation_code'
+                )[:self.sample_size]
+            )
+        self.tokens = {}
+        self.created = defaultdict(list)
+
+    def next_number(self):
+        """Возвращает уникальный номер для создаваемых объектов."""
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def token(self, user_id):
+        """Возвращает токен доступа пользователя."""
+        if user_id not in self.tokens:
+            self.tokens[user_id] = str(AccessToken.for_user(
+                User.objects.get(pk=user_id)
+            ))
+        return self.tokens[user_id]
+
+    def remember(self, kind, value):
+        """Запоминает объект, созданный во время нагрузки."""
+        with self.lock:
+            self.created[kind].append(value)
+
+    def take(self, kind):
+        """Забирает созданный объект для удаления."""
+        with self.lock:
+            if self.created[kind]:
+                return self.created[kind].pop()
+            return None
+
+
+def anonymous_reads(work, rng):
+    """Возвращает запросы чтения без аутентификации."""
+    title = rng.choice(work.titles)
+    title_id, review_id, _ = rng.choice(work.reviews)
+    comment = rng.choice(work.comments)
+    return rng.choice((
+        ('api-root', 'GET', API, None),
+        ('titles-list', 'GET', API + 'titles/', None),
+        ('titles-list', 'GET', API + 'titles/?genre={}'.format(
+            rng.choice(work.genres)), None),
+        ('titles-list', 'GET', API + 'titles/?search=title', None),
+        ('titles-detail', 'GET', API + 'titles/{}/'.format(title), None),
+        ('titles-stats', 'GET', API + 'titles/{}/stats/'.format(title), None),
+        ('titles-top', 'GET', API + 'titles/top/?genre={}'.format(
+            rng.choice(work.genres)), None),
+        ('titles-list', 'GET', API + 'titles/?ordering=-rating', None),
+        ('titles-list', 'GET', API + 'titles/?stats=true', None),
+        ('titles-list', 'GET', API + 'titles/?fields=id,name,rating', None),
+        ('reviews-list', 'GET',
+         API + 'titles/{}/reviews/'.format(title_id), None),
+        ('reviews-detail', 'GET',
+         API + 'titles/{}/reviews/{}/'.format(title_id, review_id), None),
+        ('comments-list', 'GET', API + 'titles/{}/reviews/{}/comments/'
+         .format(comment[0], comment[1]), None),
+        ('comments-detail', 'GET', API + 'titles/{}/reviews/{}/comments/{}/'
+         .format(*comment[:3]), None),
+        ('genres-list', 'GET', API + 'genres/', None),
+        ('categories-list', 'GET', API + 'categories/', None),
+    ))
+
+
+def auth_requests(work, rng):
+    """Возвращает запросы регистрации и получения токена."""
+    if rng.random() < 0.5:
+        name = 'signup{}_{}'.format(
+            work.next_number(), rng.randrange(10 ** 9)
+        )
+        return ('signup', 'POST', API + 'auth/signup/', {
+            'username': name, 'email': name + '@example.com',
+        })
+    _, username, code = rng.choice(work.users[USER])
+    return ('get_token', 'POST', API + 'auth/token/', {
+        'username': username, 'confirmation_code': code,
+    })
+
+
+def user_writes(work, rng):
+    """Возвращает запросы пользователя, пишущего отзывы и комментарии."""
+    title_id, review_id, author_id = rng.choice(work.reviews)
+    comment = rng.choice(work.comments)
+    return rng.choice((
+        ('reviews-list', 'POST', API + 'titles/{}/reviews/'.format(
+            rng.choice(work.titles)), {'text': 'New review', 'score': 7}),
+        ('reviews-detail', 'PATCH', API + 'titles/{}/reviews/{}/'.format(
+            title_id, review_id), {'text': 'Edited review'}, author_id),
+        ('comments-list', 'POST', API + 'titles/{}/reviews/{}/comments/'
+         .format(title_id, review_id), {'text': 'New comment'}),
+        ('comments-detail', 'PATCH', API + 'titles/{}/reviews/{}/comments/'
+         '{}/'.format(*comment[:3]), {'text': 'Edited'}, comment[3]),
+        ('user-me', 'GET', API + 'users/me/', None),
+        ('user-me', 'PATCH', API + 'users/me/', {'bio': 'Benchmark bio'}),
+    ))
+
+
+def moderator_deletes(work, rng):
+    """Возвращает удаление отзыва или комментария модератором."""
+    comment = work.take('comments')
+    if comment is not None:
+        return ('comments-detail', 'DELETE', comment, None)
+    review = work.take('reviews')
+    if review is not None:
+        return ('reviews-detail', 'DELETE', review, None)
+    title_id, review_id, _ = rng.choice(work.reviews)
+    return ('reviews-detail', 'DELETE', API + 'titles/{}/reviews/{}/'.format(
+        title_id, review_id), None)
+
+
+def admin_requests(work, rng):
+    """Возвращает запросы администратора к каталогу и пользователям."""
+    number = work.next_number()
+    _, username, _ = rng.choice(work.users[USER])
+    choices = [
+        ('user-list', 'GET', API + 'users/', None),
+        ('metrics', 'GET', API + 'metrics/', None),
+        ('export', 'GET', API + 'export/{}/?format={}'.format(
+            rng.choice(('titles', 'reviews', 'comments')),
+            rng.choice(('ndjson', 'csv')),
+        ), None),
+        ('user-detail', 'GET', API + 'users/{}/'.format(username), None),
+        ('user-list', 'POST', API + 'users/', {
+            'username': 'admin{}_{}'.format(number, rng.randrange(10 ** 9)),
+            'email': 'admin{}@example.com'.format(number),
+        }),
+        ('titles-list', 'POST', API + 'titles/', {
+            'name': 'New title {}'.format(number), 'year': 2000,
+            'genre': rng.sample(work.genres, 2),
+            'category': 'category-0',
+        }),
+        ('genres-list', 'POST', API + 'genres/', {
+            'name': 'New genre', 'slug': 'new-genre-{}'.format(number),
+        }),
+        ('categories-list', 'POST', API + 'categories/', {
+            'name': 'New category', 'slug': 'new-category-{}'.format(number),
+        }),
+        ('titles-bulk', 'POST', API + 'titles/bulk/', [{
+            'name': 'Bulk title {}-{}'.format(number, index), 'year': 2000,
+            'genre': rng.sample(work.genres, 2), 'category': 'category-0',
+        } for index in range(BULK_SIZE)]),
+        ('genres-bulk', 'POST', API + 'genres/bulk/', [{
+            'name': 'Bulk genre',
+            'slug': 'bulk-genre-{}-{}'.format(number, index),
+        } for index in range(BULK_SIZE)]),
+        ('genres-bulk', 'PUT', API + 'genres/bulk/', [{
+            'name': 'Renamed genre', 'slug': slug,
+        } for slug in rng.sample(work.genres, 2)]),
+        ('categories-bulk', 'POST', API + 'categories/bulk/', [{
+            'name': 'Bulk category',
+            'slug': 'bulk-category-{}-{}'.format(number, index),
+        } for index in range(BULK_SIZE)]),
+    ]
+    for kind in ('users', 'titles', 'genres', 'categories'):
+        url = work.take(kind)
+        if url is not None:
+            choices.append((ROUTE_OF[kind], 'DELETE', url, None))
+    return rng.choice(choices)
+
+
+ROUTE_OF = {
+    'users': 'user-detail',
+    'titles': 'titles-detail',
+    'genres': 'genres-detail',
+    'categories': 'categories-detail',
+}
+
+# weight, role of the client, generator of requests
+MIX = (
+    (70, None, anonymous_reads),
+    (5, None, auth_requests),
+    (15, USER, user_writes),
+    (4, MODER, moderator_deletes),
+    (6, ADMIN, admin_requests),
+)
+
+# created object -> (kind, url of the created object)
+CREATED = {
+    ('reviews-list', 'POST'): (
+        'reviews', lambda url, data: '{}{}/'.format(url, data['id'])
+    ),
+    ('comments-list', 'POST'): (
+        'comments', lambda url, data: '{}{}/'.format(url, data['id'])
+    ),
+    ('user-list', 'POST'): (
+        'users', lambda url, data: '{}{}/'.format(url, data['username'])
+    ),
+    ('titles-list', 'POST'): (
+        'titles', lambda url, data: '{}{}/'.format(url, data['id'])
+    ),
+    ('genres-list', 'POST'): (
+        'genres', lambda url, data: '{}{}/'.format(url, data['slug'])
+    ),
+    ('categories-list', 'POST'): (
+        'categories', lambda url, data: '{}{}/'.format(url, data['slug'])
+    ),
+}
+
+
+COVERED_ROUTES = {
+    'api-root', 'titles-list', 'titles-detail', 'reviews-list',
+    'reviews-detail', 'comments-list', 'comments-detail', 'genres-list',
+    'genres-detail', 'categories-list', 'categories-detail',
+    'user-list', 'user-detail', 'user-me', 'signup', 'get_token',
+    'metrics', 'export', 'titles-bulk', 'titles-stats', 'titles-top',
+    'genres-bulk', 'categories-bulk',
+}
+
+
+class Recorder:
+    """Потокобезопасный сбор замеров по эндпоинтам."""
+
+    def __init__(self):
+        """Создает пустые замеры."""
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+
+    def add(self, endpoint, status, seconds, queries):
+        """Добавляет замер одного запроса."""
+        with self.lock:
+            self.samples[endpoint].append((status, seconds, queries))
+
+    def summary(self, elapsed):
+        """Возвращает перцентили, RPS и запросы к БД по эндпоинтам."""
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            endpoints[endpoint] = summarize(samples, elapsed)
+        total = [sample for samples in self.samples.values()
+                 for sample in samples]
+        return {'endpoints': endpoints, 'total': summarize(total, elapsed)}
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль по методу ближайшего ранга."""
+    index = max(0, int(round(fraction * len(values) + 0.5)) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(samples, elapsed):
+    """Сводит замеры одного эндпоинта."""
+    latencies = sorted(seconds * 1000 for _, seconds, _ in samples)
+    statuses = defaultdict(int)
+    for status, _, _ in samples:
+        statuses[str(status)] += 1
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'queries_per_request': round(
+            sum(queries for _, _, queries in samples) / len(samples), 2
+        ),
+        'statuses': dict(statuses),
+    }
+
+
+class Runner:
+    """Выполняет смесь запросов в нескольких потоках."""
+
+    def __init__(self, work, requests, concurrency, seed_value):
+        """Готовит прогон из requests запросов в concurrency потоках."""
+        self.work = work
+        self.requests = requests
+        self.concurrency = concurrency
+        self.seed = seed_value
+        self.recorder = Recorder()
+        self.remaining = requests
+        self.lock = threading.Lock()
+
+    def claim(self):
+        """Забирает право на следующий запрос."""
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def pick(self, rng):
+        """Выбирает роль клиента и запрос согласно смеси."""
+        weights = [weight for weight, _, _ in MIX]
+        _, role, generate = rng.choices(MIX, weights=weights)[0]
+        request = generate(self.work, rng)
+        author = request[4] if len(request) > 4 else None
+        user_id = author or (
+            rng.choice(self.work.users[role])[0] if role else None
+        )
+        return request[:4], user_id
+
+    def execute(self, client, rng):
+        """Выполняет один запрос и записывает замер."""
+        (route, method, url, data), user_id = self.pick(rng)
+        headers = {}
+        if user_id is not None:
+            headers['HTTP_AUTHORIZATION'] = 'Bearer ' + self.work.token(
+                user_id
+            )
+        counter = QueryCounter()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                response = client.generic(
+                    method, url, json.dumps(data) if data else '',
+                    content_type='application/json', **headers
+                )
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            status = response.status_code
+        except Exception as error:
+            response, status = None, type(error).__name__
+        seconds = time.perf_counter() - started
+        self.recorder.add(
+            '{} {}'.format(method, route), status, seconds, counter.count
+        )
+        if response is not None and status == 201:
+            self.remember(route, method, url, response.json())
+
+    def remember(self, route, method, url, data):
+        """Запоминает созданный объект для последующего удаления."""
+        created = CREATED.get((route, method))
+        if created is not None:
+            kind, make_url = created
+            self.work.remember(kind, make_url(url, data))
+
+    def worker(self, number):
+        """Тело рабочего потока."""
+        rng = random.Random('{}-{}'.format(self.seed, number))
+        client = APIClient()
+        try:
+            while self.claim():
+                self.execute(client, rng)
+        finally:
+            connection.close()
+
+    def run(self):
+        """Запускает потоки и возвращает сводку."""
+        threads = [
+            threading.Thread(target=self.worker, args=(number,))
+            for number in range(self.concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        summary = self.recorder.summary(elapsed)
+        summary['elapsed_s'] = round(elapsed, 3)
+        return summary
+
+
+class QueryCounter:
+    """Обертка выполнения SQL, считающая запросы."""
+
+    def __init__(self):
+        """Обнуляет счетчик."""
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Учитывает запрос и выполняет его."""
+        self.count += 1
+        return execute(sql, params, many, context)
@@ -0,0 +1,60 @@
+"""Потоковая выгрузка каталога, отзывов и комментариев в файл."""
+
+from api.export import EXPORTS, next_since, parse_since
+from api.renderers import CSVRenderer, NDJSONRenderer
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import ValidationError
+
+RENDERERS = {
+    renderer.format: renderer for renderer in (NDJSONRenderer, CSVRenderer)
+}
+
+
+class Command(BaseCommand):
+    """Настройки инструмента для выгрузки данных."""
+
+    help = 'Streams titles, reviews or comments as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument('resource', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format',
+            choices=sorted(RENDERERS),
+            default=NDJSONRenderer.format,
+            help='Output format',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only rows modified at or after this ISO 8601 time',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to instead of stdout',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database to export from',
+        )
+
+    def handle(self, *args, **options):
+        """Пишет выгрузку порциями и сообщает since для следующей."""
+        try:
+            since = parse_since(options['since'])
+        except ValidationError as error:
+            raise CommandError(error.detail['since'])
+        watermark = next_since()
+        export = EXPORTS[options['resource']](since, options['database'])
+        chunks = RENDERERS[options['format']]().stream(
+            export.columns, export.chunks()
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
+        self.stderr.write('Next --since: {}'.format(watermark))
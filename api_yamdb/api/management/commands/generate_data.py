@@ -0,0 +1,94 @@
+"""Генерация набора данных для тестов производительности."""
+
+import time
+
+from api.cache import resource_versions
+from api.synthetic import Generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from reviews.ranking import refresh_ranking
+from reviews.search import get_title_search
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Настройки генератора данных."""
+
+    help = ('Generates a deterministic dataset of users, titles, reviews '
+            'and comments with Zipf-distributed activity')
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--users', type=int, default=1000, help='Number of users',
+        )
+        parser.add_argument(
+            '--titles', type=int, default=1000, help='Number of titles',
+        )
+        parser.add_argument(
+            '--categories', type=int, default=10,
+            help='Number of categories',
+        )
+        parser.add_argument(
+            '--genres', type=int, default=25, help='Number of genres',
+        )
+        parser.add_argument(
+            '--max-reviews', type=int, default=1000,
+            help='Maximum number of reviews per title',
+        )
+        parser.add_argument(
+            '--max-comments', type=int, default=50,
+            help='Maximum number of comments per review',
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Zipf exponent of reviews per title and comments per review',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0, help='Random seed of the data',
+        )
+        parser.add_argument(
+            '--prefix', default='gen',
+            help='Prefix of usernames, emails and slugs',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows per INSERT',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database alias to fill',
+        )
+
+    def handle(self, *args, **options):
+        """Создает данные, обновляет поиск и рейтинг и выводит итог."""
+        using = options['database']
+        if User.objects.using(using).filter(
+            username='{}0'.format(options['prefix'])
+        ).exists():
+            raise CommandError(
+                'Data with prefix "{}" already exists: pass another '
+                '--prefix'.format(options['prefix'])
+            )
+        started = time.monotonic()
+        counts = Generator(
+            options['users'], options['titles'],
+            categories=options['categories'], genres=options['genres'],
+            seed=options['seed'], prefix=options['prefix'],
+            max_reviews=options['max_reviews'],
+            max_comments=options['max_comments'], exponent=options['zipf'],
+            batch_size=options['batch_size'], using=using,
+        ).generate()
+        get_title_search(using).rebuild()
+        refresh_ranking(using=using)
+        for resource in ('categories', 'genres', 'titles', 'leaderboard'):
+            resource_versions.bump(resource)
+        elapsed = time.monotonic() - started
+        for name, count in counts.items():
+            self.stdout.write('{}: {}'.format(name.capitalize(), count))
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            'Generated {} rows in {:.1f} s ({:.0f} rows/s)'.format(
+                total, elapsed, total / elapsed if elapsed else 0
+            )
+        ))
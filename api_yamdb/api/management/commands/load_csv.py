@@ -0,0 +1,132 @@
+"""Потоковая загрузка данных из csv файлов в БД."""
+
+import json
+import time
+from csv import reader
+from itertools import islice
+from pathlib import Path
+
+from api.cache import resource_versions
+from api.loading import TableWriter, dependency_order
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+CSV_FILES = {
+    User: 'users.csv',
+    Category: 'category.csv',
+    Genre: 'genre.csv',
+    Title: 'titles.csv',
+    Title.genre.through: 'genre_title.csv',
+    Review: 'review.csv',
+    Comment: 'comments.csv',
+}
+
+
+class Command(BaseCommand):
+    """Настройки инструмента для загрузки csv файлов."""
+
+    help = 'Streams csv files from static/data into the database'
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--path',
+            default=str(Path(settings.BASE_DIR) / 'static' / 'data'),
+            help='Directory with csv files',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows per INSERT transaction',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue an interrupted load from its state file',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database alias to load into',
+        )
+
+    def handle(self, *args, **options):
+        """Загружает файлы в порядке зависимостей внешних ключей."""
+        path = Path(options['path'])
+        state_file = path / '.load_csv_state.json'
+        state = {}
+        if options['resume'] and state_file.exists():
+            state = json.loads(state_file.read_text())
+        elif state_file.exists():
+            raise CommandError(
+                'Previous load was interrupted: rerun with --resume '
+                'or delete {}'.format(state_file)
+            )
+        for model in dependency_order(CSV_FILES):
+            file = path / CSV_FILES[model]
+            if not file.exists():
+                self.stdout.write('Skipped {}: no such file'.format(file))
+                continue
+            self.load_file(model, file, state, state_file, options)
+        if state_file.exists():
+            state_file.unlink()
+        call_command('recalculate_ratings', database=options['database'],
+                     verbosity=0, stdout=self.stdout)
+        call_command('rebuild_search_index', database=options['database'],
+                     stdout=self.stdout)
+        call_command('refresh_leaderboard', database=options['database'],
+                     once=True, stdout=self.stdout)
+        for resource in ('genres', 'categories', 'titles'):
+            resource_versions.bump(resource)
+
+    def load_file(self, model, file, state, state_file, options):
+        """Загружает один файл пакетами и сохраняет прогресс."""
+        progress = state.setdefault(file.name, {'rows': 0, 'done': False})
+        if progress['done']:
+            self.stdout.write('Skipped {}: already loaded'.format(file.name))
+            return
+        started = time.monotonic()
+        loaded = skipped = 0
+        with open(file, newline='', encoding='utf-8') as read_file:
+            rows = reader(read_file)
+            writer = TableWriter(
+                model, next(rows), options['database'],
+                ignore_conflicts=options['resume'],
+            )
+            rows = islice(rows, progress['rows'], None)
+            batch = list(islice(rows, options['batch_size']))
+            while batch:
+                try:
+                    inserted = writer.write(batch)
+                except (ValidationError, DatabaseError) as error:
+                    raise CommandError(
+                        '{} rows {}-{}: {}. Fix the file and rerun with '
+                        '--resume'.format(
+                            file.name, progress['rows'] + 1,
+                            progress['rows'] + len(batch), error,
+                        )
+                    )
+                loaded += len(batch)
+                skipped += len(batch) - inserted
+                progress['rows'] += len(batch)
+                state_file.write_text(json.dumps(state))
+                batch = list(islice(rows, options['batch_size']))
+        writer.reset_sequences()
+        progress['done'] = True
+        state_file.write_text(json.dumps(state))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            'Loaded {}: {} rows in {:.1f} s ({:.0f} rows/s)'.format(
+                model._meta.db_table, loaded, elapsed,
+                loaded / elapsed if elapsed else 0,
+            )
+        ))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                'Skipped {} rows of {} with existing keys: rows loaded '
+                'before the interruption or duplicates in the file'.format(
+                    skipped, file.name
+                )
+            ))
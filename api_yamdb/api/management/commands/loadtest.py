@@ -0,0 +1,92 @@
+"""Нагрузочный прогон по всем маршрутам api."""
+
+import json
+import random
+import subprocess
+import sys
+
+from api.loadtest import COVERED_ROUTES, Runner, Workload, seed
+from api.urls import router_v1, urlpatterns
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Настройки инструмента нагрузочного тестирования."""
+
+    help = ('Seeds a local database and drives every api route, reporting '
+            'latency percentiles, RPS and queries per request as JSON')
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--scale', type=int, default=200,
+            help='Number of titles to seed into an empty database',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Total number of requests to send',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Number of client threads',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Random seed of the data and of the request mix',
+        )
+        parser.add_argument(
+            '--reuse', action='store_true',
+            help='Run against the data already in the database',
+        )
+        parser.add_argument(
+            '--output', help='File to write the JSON report to',
+        )
+
+    def handle(self, *args, **options):
+        """Наполняет базу, выполняет нагрузку и выводит отчет."""
+        routes = {url.name for url in router_v1.urls} | {
+            getattr(url, 'name', None) for url in urlpatterns
+        } - {None}
+        missing = routes - COVERED_ROUTES
+        if missing:
+            raise CommandError('Routes without load: {}'.format(
+                ', '.join(sorted(missing))
+            ))
+        if not options['reuse']:
+            if Title.objects.exists():
+                raise CommandError(
+                    'The database already has data: use an empty local '
+                    'database or pass --reuse'
+                )
+            seed(options['scale'], random.Random(options['seed']))
+        report = Runner(
+            Workload(), options['requests'], options['concurrency'],
+            options['seed'],
+        ).run()
+        report['meta'] = {
+            'commit': self.get_commit(),
+            'database': connection.vendor,
+            'titles': Title.objects.count(),
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'seed': options['seed'],
+            'python': sys.version.split()[0],
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as write_file:
+                write_file.write(output)
+        self.stdout.write(output)
+
+    @staticmethod
+    def get_commit():
+        """Возвращает текущий коммит git, если он доступен."""
+        try:
+            return subprocess.run(
+                ('git', 'rev-parse', 'HEAD'), stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, check=True,
+            ).stdout.decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,105 @@
+"""Просмотр, объединение и сравнение профилей запросов."""
+
+import io
+
+from api.profiling import (diff_stats, list_profiles, load_stats,
+                           select_profiles)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls', 'filename')
+
+
+class Command(BaseCommand):
+    """Настройки инструмента для работы с профилями запросов."""
+
+    help = 'Lists, aggregates and diffs captured request profiles'
+
+    def add_arguments(self, parser):
+        """Добавляет подкоманды и аргументы командной строки."""
+        parser.add_argument(
+            '--directory',
+            help='Profiles directory, REQUEST_PROFILING DIRECTORY by default',
+        )
+        subparsers = parser.add_subparsers(dest='action')
+        subparsers.required = True
+        listing = subparsers.add_parser(
+            'list', help='List profiles, newest first'
+        )
+        listing.add_argument(
+            'selector', nargs='?',
+            help='View name, file name pattern or path',
+        )
+        aggregate = subparsers.add_parser(
+            'aggregate', help='Print combined statistics'
+        )
+        aggregate.add_argument(
+            'selector', help='View name, file name pattern or path'
+        )
+        aggregate.add_argument(
+            '--sort', choices=SORT_KEYS, default='cumulative',
+            help='Statistics order',
+        )
+        diff = subparsers.add_parser(
+            'diff',
+            help='Compare per-request cumulative time of two profile sets',
+        )
+        diff.add_argument('first', help='Profiles before')
+        diff.add_argument('second', help='Profiles after')
+        for subparser in (aggregate, diff):
+            subparser.add_argument(
+                '--limit', type=int, default=30, help='Functions to print'
+            )
+
+    def handle(self, *args, **options):
+        """Выполняет подкоманду."""
+        self.directory = (
+            options['directory'] or settings.REQUEST_PROFILING['DIRECTORY']
+        )
+        getattr(self, 'handle_' + options['action'])(options)
+
+    def select(self, selector):
+        """Возвращает профили по селектору или завершает команду."""
+        profiles = select_profiles(self.directory, selector)
+        if not profiles:
+            raise CommandError('No profiles match {!r}'.format(selector))
+        return profiles
+
+    def handle_list(self, options):
+        """Печатает профили от новых к старым."""
+        if options['selector']:
+            profiles = self.select(options['selector'])
+        else:
+            profiles = list_profiles(self.directory)
+        for profile in reversed(profiles):
+            self.stdout.write('{:%Y-%m-%d %H:%M:%S}  {:>9.1f} ms  {}'.format(
+                profile.created, profile.duration * 1000, profile.name
+            ))
+
+    def handle_aggregate(self, options):
+        """Печатает объединенную статистику профилей."""
+        profiles = self.select(options['selector'])
+        self.stdout.write('{} profiles, {:.1f} ms per request'.format(
+            len(profiles),
+            sum(profile.duration for profile in profiles)
+            / len(profiles) * 1000,
+        ))
+        buffer = io.StringIO()
+        load_stats(profiles, stream=buffer).strip_dirs().sort_stats(
+            options['sort']
+        ).print_stats(options['limit'])
+        self.stdout.write(buffer.getvalue(), ending='')
+
+    def handle_diff(self, options):
+        """Печатает функции с наибольшим изменением времени за запрос."""
+        before = self.select(options['first'])
+        after = self.select(options['second'])
+        self.stdout.write('{:>10} {:>10} {:>10}  {}'.format(
+            'before ms', 'after ms', 'delta ms', 'function'
+        ))
+        for function, old, new, delta in diff_stats(before, after)[
+            :options['limit']
+        ]:
+            self.stdout.write('{:>10.3f} {:>10.3f} {:>+10.3f}  {}'.format(
+                old * 1000, new * 1000, delta * 1000, function
+            ))
@@ -0,0 +1,32 @@
+"""Воркер отложенного удаления произведений и пользователей."""
+
+import time
+
+from api.deletion import purge_batch
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Настройки воркера отложенного удаления."""
+
+    help = 'Deletes rows of hidden titles and users in batches'
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Delete everything that is pending and exit',
+        )
+
+    def handle(self, *args, **options):
+        """Удаляет порции строк, пока очередь не опустеет или бесконечно."""
+        while True:
+            deleted = purge_batch()
+            if deleted:
+                self.stdout.write('Deleted {} rows'.format(deleted))
+                continue
+            if options['once']:
+                return
+            time.sleep(settings.DELETION['POLL_INTERVAL'])
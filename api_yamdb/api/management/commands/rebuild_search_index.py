@@ -0,0 +1,24 @@
+"""Перестроение поискового индекса произведений."""
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from reviews.search import get_title_search
+
+
+class Command(BaseCommand):
+    """Настройки инструмента для перестроения поискового индекса."""
+
+    help = 'Rebuilds the full-text search index of titles'
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to rebuild the index in',
+        )
+
+    def handle(self, *args, **options):
+        """Заполняет поисковый индекс заново."""
+        get_title_search(options['database']).rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,147 @@
+"""Пересчет сохраненных рейтингов произведений."""
+
+from api.cache import resource_versions
+from api.deletion import per_row
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.expressions import ExpressionWrapper
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+from reviews.models import Comment, Review, Title
+from reviews.stats import find_stats_drift, save_stats
+
+BATCH_SIZE = 500
+
+
+def repair(rows, pks, **values):
+    """Перезаписывает значения строк pks порциями под блокировкой.
+
+    Строки порции блокируются до UPDATE, а значения считаются
+    подзапросами в самом UPDATE, поэтому отзыв или комментарий, записанный
+    после сверки, не затирается.
+    """
+    using = rows.db
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = rows.filter(pk__in=pks[start:start + BATCH_SIZE])
+        with transaction.atomic(using=using):
+            list(batch.select_for_update().order_by('pk').values_list(
+                'pk', flat=True
+            ))
+            batch.update(**values)
+
+
+class Command(BaseCommand):
+    """Настройки инструмента для пересчета рейтингов."""
+
+    help = (
+        'Recalculates stored title ratings, score histograms and comment '
+        'counts and reports drift'
+    )
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drift without fixing it',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to recalculate ratings in',
+        )
+
+    def handle(self, *args, **options):
+        """Сравнивает сохраненные значения с пересчитанными с нуля."""
+        using = options['database']
+        titles = Title.objects.using(using).annotate(
+            actual_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_count=Count('reviews'),
+        ).order_by('pk')
+        drifted = []
+        for title in titles.iterator():
+            actual_rating = (
+                title.actual_sum / title.actual_count
+                if title.actual_count else None
+            )
+            if (title.score_sum, title.review_count) == (
+                title.actual_sum, title.actual_count
+            ) and title.rating == actual_rating:
+                continue
+            if options['verbosity'] > 0:
+                self.stdout.write(
+                    'Title {}: stored sum={} count={} rating={}, '
+                    'actual sum={} count={} rating={}'.format(
+                        title.pk, title.score_sum, title.review_count,
+                        title.rating, title.actual_sum, title.actual_count,
+                        actual_rating,
+                    )
+                )
+            drifted.append(title.pk)
+        if drifted and not options['dry_run']:
+            reviews = Review.objects.using(using)
+            actual_sum = Coalesce(
+                per_row(reviews, 'title_id', Sum('score')), 0
+            )
+            actual_count = Coalesce(
+                per_row(reviews, 'title_id', Count('pk')), 0
+            )
+            repair(
+                Title.objects.using(using), drifted,
+                score_sum=actual_sum,
+                review_count=actual_count,
+                rating=ExpressionWrapper(
+                    Cast(actual_sum, FloatField()) / NullIf(actual_count, 0),
+                    output_field=FloatField(),
+                ),
+                modified=timezone.now(),
+            )
+            resource_versions.bump('titles')
+        self.stdout.write(self.style.SUCCESS(
+            'Titles with drift: {}{}'.format(
+                len(drifted), ' (not fixed)' if options['dry_run'] else ''
+            )
+        ))
+        self.reconcile_stats(options)
+        self.reconcile_comment_counts(options)
+
+    def reconcile_stats(self, options):
+        """Сверяет распределения оценок с отзывами и исправляет их."""
+        drifted = find_stats_drift(options['database'])
+        if drifted and not options['dry_run']:
+            save_stats(drifted, options['database'])
+            resource_versions.bump('titles')
+        self.stdout.write(self.style.SUCCESS(
+            'Score histograms with drift: {}{}'.format(
+                len(drifted), ' (not fixed)' if options['dry_run'] else ''
+            )
+        ))
+
+    def reconcile_comment_counts(self, options):
+        """Сверяет число комментариев отзывов с комментариями."""
+        using = options['database']
+        drifted = list(
+            Review.objects.using(using).annotate(actual=Count('comments'))
+            .exclude(comment_count=F('actual'))
+            .order_by('pk').values_list('pk', 'title_id')
+        )
+        if drifted and not options['dry_run']:
+            now = timezone.now()
+            repair(
+                Review.objects.using(using), [pk for pk, _ in drifted],
+                comment_count=Coalesce(per_row(
+                    Comment.objects.using(using), 'review_id', Count('pk')
+                ), 0),
+                modified=now,
+            )
+            title_ids = sorted({title_id for _, title_id in drifted})
+            for start in range(0, len(title_ids), BATCH_SIZE):
+                Title.objects.using(using).filter(
+                    pk__in=title_ids[start:start + BATCH_SIZE]
+                ).update(modified=now)
+        self.stdout.write(self.style.SUCCESS(
+            'Reviews with comment count drift: {}{}'.format(
+                len(drifted), ' (not fixed)' if options['dry_run'] else ''
+            )
+        ))
@@ -0,0 +1,38 @@
+"""Периодический пересчет рейтинга лучших произведений."""
+
+import time
+
+from api.cache import resource_versions
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from reviews.ranking import refresh_ranking
+
+
+class Command(BaseCommand):
+    """Настройки инструмента для пересчета рейтинга лучших произведений."""
+
+    help = 'Recomputes the top-rated leaderboard, once or periodically'
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Refresh the leaderboard once and exit',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to refresh the leaderboard in',
+        )
+
+    def handle(self, *args, **options):
+        """Пересчитывает рейтинг однократно или с интервалом."""
+        while True:
+            ranked = refresh_ranking(using=options['database'])
+            resource_versions.bump('leaderboard')
+            self.stdout.write('Ranked {} titles'.format(ranked))
+            if options['once']:
+                return
+            time.sleep(settings.LEADERBOARD['REFRESH_INTERVAL'])
@@ -0,0 +1,32 @@
+"""Воркер отправки писем из очереди."""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users.outbox import send_batch
+
+
+class Command(BaseCommand):
+    """Настройки воркера очереди писем."""
+
+    help = 'Sends queued emails in batches with retries'
+
+    def add_arguments(self, parser):
+        """Добавляет аргументы командной строки."""
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send everything that is due and exit',
+        )
+
+    def handle(self, *args, **options):
+        """Отправляет письма, пока очередь не опустеет или бесконечно."""
+        while True:
+            sent = send_batch()
+            if sent:
+                self.stdout.write('Sent {} emails'.format(sent))
+                continue
+            if options['once']:
+                return
+            time.sleep(settings.OUTBOX['POLL_INTERVAL'])
@@ -0,0 +1,210 @@
+"""Метрики запросов приложения api."""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .cache import response_cache
+
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+_local = threading.local()
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets):
+        """Создает пустую гистограмму."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Учитывает значение."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Возвращает пары (граница, число значений не больше нее)."""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    """Гистограммы метрик по представлениям в памяти процесса."""
+
+    metrics = (
+        ('request_duration_seconds', 'Wall time of the request',
+         SECONDS_BUCKETS),
+        ('serializer_duration_seconds', 'Time spent in serializers',
+         SECONDS_BUCKETS),
+        ('sql_duration_seconds', 'Time spent executing SQL',
+         SECONDS_BUCKETS),
+        ('sql_queries', 'SQL queries per request', QUERIES_BUCKETS),
+    )
+
+    def __init__(self):
+        """Создает пустой реестр."""
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, record):
+        """Добавляет замеры одного запроса."""
+        values = (
+            record.wall, record.serializer, record.sql_time, record.queries,
+        )
+        with self.lock:
+            histograms = self.views.get(view)
+            if histograms is None:
+                histograms = self.views[view] = [
+                    Histogram(buckets) for _, _, buckets in self.metrics
+                ]
+            for histogram, value in zip(histograms, values):
+                histogram.observe(value)
+
+    def render(self):
+        """Возвращает метрики в текстовом формате Prometheus."""
+        lines = []
+        with self.lock:
+            for index, (name, help_text, _) in enumerate(self.metrics):
+                lines.append('# HELP yamdb_{} {}'.format(name, help_text))
+                lines.append('# TYPE yamdb_{} histogram'.format(name))
+                for view, histograms in sorted(self.views.items()):
+                    lines.extend(
+                        format_histogram(name, view, histograms[index])
+                    )
+        lines.append('# HELP yamdb_response_cache_total Response cache '
+                     'lookups')
+        lines.append('# TYPE yamdb_response_cache_total counter')
+        for resource, counters in sorted(response_cache.stats().items()):
+            for outcome, value in sorted(counters.items()):
+                lines.append(
+                    'yamdb_response_cache_total{{resource="{}",outcome="{}"}}'
+                    ' {}'.format(resource, outcome, value)
+                )
+        return '\n'.join(lines) + '\n'
+
+
+def format_histogram(name, view, histogram):
+    """Возвращает строки Prometheus для гистограммы представления."""
+    for bound, total in histogram.cumulative():
+        yield 'yamdb_{}_bucket{{view="{}",le="{}"}} {}'.format(
+            name, view, bound, total
+        )
+    yield 'yamdb_{}_sum{{view="{}"}} {}'.format(name, view, histogram.sum)
+    yield 'yamdb_{}_count{{view="{}"}} {}'.format(
+        name, view, histogram.count
+    )
+
+
+registry = Registry()
+
+
+class RequestRecord:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        """Обнуляет замеры."""
+        self.wall = 0
+        self.serializer = 0
+        self.sql_time = 0
+        self.queries = 0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обертка выполнения SQL, учитывающая время и число запросов."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+    def server_timing(self):
+        """Возвращает значение заголовка Server-Timing."""
+        return (
+            'total;dur={:.1f}, sql;dur={:.1f};desc="{} queries", '
+            'serializer;dur={:.1f}'.format(
+                self.wall * 1000, self.sql_time * 1000, self.queries,
+                self.serializer * 1000,
+            )
+        )
+
+
+def view_name(request):
+    """Возвращает имя представления и действия для запроса."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view = getattr(match.func, 'cls', None)
+    if view is None:
+        return match.view_name or 'unresolved'
+    actions = getattr(match.func, 'actions', None) or {}
+    method = request.method.lower()
+    return '{}.{}'.format(view.__name__, actions.get(method, method))
+
+
+class RequestMetricsMiddleware:
+    """Middleware, измеряющий время, SQL и сериализацию запросов.
+
+    При выключенной настройке REQUEST_METRICS['ENABLED'] не подключается
+    вовсе, поэтому накладных расходов нет.
+    """
+
+    def __init__(self, get_response):
+        """Подключается только при включенных метриках."""
+        if not settings.REQUEST_METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Измеряет запрос и сохраняет замеры."""
+        record = RequestRecord()
+        _local.record = record
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record))
+                response = self.get_response(request)
+        finally:
+            _local.record = None
+        record.wall = time.perf_counter() - started
+        registry.observe(view_name(request), record)
+        if settings.REQUEST_METRICS['SERVER_TIMING']:
+            response['Server-Timing'] = record.server_timing()
+        return response
+
+
+class TimedSerializerMixin:
+    """Миксин сериализатора, учитывающий время to_representation.
+
+    Учитывается только внешний вызов, чтобы вложенные сериализаторы
+    не считались дважды.
+    """
+
+    def to_representation(self, instance):
+        """Преобразует объект и учитывает затраченное время."""
+        record = getattr(_local, 'record', None)
+        if record is None or record.serializer_depth:
+            return super().to_representation(instance)
+        record.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            record.serializer += time.perf_counter() - started
+            record.serializer_depth -= 1
@@ -1,6 +1,25 @@
 """Миксины приложения api."""
 
-from rest_framework import mixins, viewsets
+import calendar
+import hashlib
+from contextlib import nullcontext
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .cache import response_cache
+from .permissions import AdminOnly
+from .replicas import primary
 
 
 class CreateListDestroyMixinViewset(mixins.CreateModelMixin,
@@ -10,3 +29,309 @@ class CreateListDestroyMixinViewset(mixins.CreateModelMixin,
     """Кастомный миксин для настройки представлений."""
 
     pass
+
+
+class ReadQuerysetMixin:
+    """Миксин, подгружающий связанные объекты для действий чтения.
+
+    Связи из read_select_related загружаются через JOIN, а из
+    read_prefetch_related - отдельным запросом на всю страницу, поэтому
+    число запросов не зависит от размера страницы. Параметры ?fields= и
+    ?omit= ограничивают поля ответа: выбираются только нужные столбцы,
+    а незапрошенные связи не подгружаются.
+    """
+
+    read_actions = ('list', 'retrieve')
+    read_select_related = ()
+    read_prefetch_related = ()
+
+    def get_read_fields(self):
+        """Возвращает запрошенные поля ответа или None, если нужны все."""
+        if self.action not in self.read_actions:
+            return None
+        if not hasattr(self, '_read_fields'):
+            self._read_fields = parse_sparse_fields(
+                self.request.query_params,
+                self.get_serializer_class().Meta.fields,
+            )
+        return self._read_fields
+
+    def get_read_columns(self, fields):
+        """Возвращает столбцы модели, нужные для полей ответа."""
+        model = self.get_serializer_class().Meta.model
+        columns = [model._meta.pk.name]
+        for name in fields:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.append(name)
+        return columns
+
+    def get_serializer_context(self):
+        """Передает сериализатору запрошенные поля ответа."""
+        context = super().get_serializer_context()
+        context['fields'] = self.get_read_fields()
+        return context
+
+    def get_queryset(self):
+        """Добавляет подгрузку связей для действий чтения."""
+        return self.get_read_queryset(super().get_queryset())
+
+    def get_read_queryset(self, queryset):
+        """Ограничивает столбцы и подгружает связи для действий чтения."""
+        if self.action not in self.read_actions:
+            return queryset
+        fields = self.get_read_fields()
+        wanted = partial(is_requested, fields)
+        select_related = list(filter(wanted, self.read_select_related))
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if fields is not None:
+            queryset = queryset.only(*self.get_read_columns(fields))
+        return queryset.prefetch_related(
+            *filter(wanted, self.read_prefetch_related)
+        )
+
+
+def is_requested(fields, lookup):
+    """Проверяет, нужна ли связь lookup для полей ответа."""
+    return fields is None or lookup.split('__')[0] in fields
+
+
+def parse_sparse_fields(params, available):
+    """Возвращает поля из ?fields= без полей из ?omit= или None.
+
+    Неизвестные поля дают ошибку 400 со списком доступных.
+    """
+    requested = params.get('fields')
+    omitted = params.get('omit')
+    if requested is None and omitted is None:
+        return None
+    requested = set(split_names(requested)) if requested else set(available)
+    omitted = set(split_names(omitted))
+    unknown = (requested | omitted) - set(available)
+    if unknown:
+        raise ValidationError({
+            'fields': 'Неизвестные поля: {}. Доступны: {}.'.format(
+                ', '.join(sorted(unknown)), ', '.join(available)
+            )
+        })
+    return tuple(
+        name for name in available
+        if name in requested and name not in omitted
+    )
+
+
+def split_names(value):
+    """Разбирает список имен через запятую."""
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class CachedListMixin:
+    """Миксин, кэширующий ответы list по версиям cache_resources.
+
+    Первым в cache_resources указывается ресурс самого представления,
+    далее - ресурсы, данные которых попадают в ответ.
+    """
+
+    cache_resources = ()
+
+    def list(self, request, *args, **kwargs):
+        """Возвращает список из кэша или вычисляет его."""
+        return response_cache.fetch(
+            request,
+            self.cache_resources,
+            partial(super().list, request, *args, **kwargs),
+        )
+
+
+class CachedReadMixin(CachedListMixin):
+    """Миксин, кэширующий ответы list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        """Возвращает объект из кэша или вычисляет его."""
+        return response_cache.fetch(
+            request,
+            self.cache_resources,
+            partial(super().retrieve, request, *args, **kwargs),
+        )
+
+
+class ConditionalReadMixin:
+    """Миксин, отвечающий 304 на условные запросы list и retrieve.
+
+    Валидаторы ETag и Last-Modified строятся из метки изменения коллекции,
+    которую возвращает get_watermark, до выборки и сериализации данных.
+    ETag зависит и от формата ответа, выбранного по заголовку Accept.
+    Если метка берется не из базы, а из версий ресурсов (versioned_watermark),
+    данные читаются из основной базы: иначе отстающая реплика отдала бы
+    строки до записи с ETag новой версии.
+    """
+
+    versioned_watermark = False
+
+    def get_watermark(self):
+        """Возвращает метку изменения коллекции и время изменения или None."""
+        raise NotImplementedError
+
+    def get_validator_headers(self, request):
+        """Возвращает пустой ответ с валидаторами для текущего запроса."""
+        token, modified = self.get_watermark()
+        headers = HttpResponse()
+        headers['ETag'] = quote_etag(hashlib.md5('{}|{}|{}'.format(
+            token, request.get_full_path(), request.accepted_media_type
+        ).encode()).hexdigest())
+        if modified is not None:
+            headers['Last-Modified'] = http_date(
+                calendar.timegm(modified.utctimetuple())
+            )
+        return headers
+
+    def conditional(self, read, request, *args, **kwargs):
+        """Отвечает 304 по валидаторам или выполняет чтение."""
+        headers = self.get_validator_headers(request)
+        last_modified = headers.get('Last-Modified')
+        response = get_conditional_response(
+            request,
+            etag=headers['ETag'],
+            last_modified=last_modified and parse_http_date(last_modified),
+            response=headers,
+        )
+        if response is not headers:
+            patch_vary_headers(response, ('Accept',))
+            return response
+        with primary() if self.versioned_watermark else nullcontext():
+            response = read(request, *args, **kwargs)
+        if response.status_code == 200:
+            for header in ('ETag', 'Last-Modified'):
+                if header in headers:
+                    response[header] = headers[header]
+            patch_vary_headers(response, ('Accept',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """Возвращает список или 304."""
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Возвращает объект или 304."""
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class BulkCreateMixin:
+    """Миксин с действием bulk для пакетного создания объектов.
+
+    Тело запроса - список объектов; POST создает объекты, а PUT создает
+    или обновляет их по естественному ключу, если он есть у модели. Ответ
+    содержит сохраненные объекты и ошибки по индексам элементов, не
+    прошедших проверку.
+    """
+
+    bulk_creator_class = None
+
+    @action(
+        detail=False,
+        methods=('post', 'put'),
+        permission_classes=(IsAuthenticated, AdminOnly),
+    )
+    def bulk(self, request):
+        """Создает или обновляет объекты из списка в теле запроса."""
+        upsert = request.method == 'PUT'
+        if upsert and self.bulk_creator_class.upsert_key is None:
+            raise MethodNotAllowed(request.method)
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'detail': 'Ожидается список объектов.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_items = settings.BULK_CREATE['MAX_ITEMS']
+        if len(items) > max_items:
+            return Response(
+                {'detail': 'Не больше {} объектов за запрос.'.format(
+                    max_items
+                )},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        creator = self.bulk_creator_class(items, upsert=upsert)
+        try:
+            created = creator.save()
+        except IntegrityError:
+            return Response(
+                {'detail': 'Пакет конфликтует с параллельной записью.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            creator.result(created),
+            status=bulk_status(created, creator.updated, items),
+        )
+
+
+def bulk_status(created, updated, items):
+    """Возвращает статус ответа на пакетную запись."""
+    if updated and not created:
+        return status.HTTP_200_OK
+    if created or not items:
+        return status.HTTP_201_CREATED
+    return status.HTTP_400_BAD_REQUEST
+
+
+class CascadeDestroyMixin:
+    """Миксин, удаляющий объекты через cascade_class вместо сборщика Django.
+
+    Если удаление отложено, объект скрыт, а ответ имеет статус 202.
+    """
+
+    cascade_class = None
+
+    def destroy(self, request, *args, **kwargs):
+        """Удаляет объект с зависимыми строками."""
+        if self.cascade_class(self.get_object()).destroy():
+            return Response(status=status.HTTP_202_ACCEPTED)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class NestedParentMixin:
+    """Миксин вложенного ресурса с родителем, найденным один раз за запрос.
+
+    get_parent_queryset проверяет всю цепочку родителей по параметрам
+    адреса одним запросом; отсутствие родителя дает 404.
+    """
+
+    def get_parent_queryset(self):
+        """Возвращает выборку из одного родительского объекта."""
+        raise NotImplementedError
+
+    def get_parent(self):
+        """Возвращает родительский объект, запоминая его до конца запроса."""
+        if getattr(self, '_parent', None) is None:
+            self._parent = self.get_parent_queryset().first()
+            if self._parent is None:
+                raise Http404
+        return self._parent
+
+
+class RowListMixin:
+    """Миксин, строящий list из строк values() вместо экземпляров моделей.
+
+    Используется, если все поля ответа умеет строить row_class, иначе
+    список строится сериализатором. Ответы обоих путей совпадают.
+    """
+
+    row_class = None
+
+    def list(self, request, *args, **kwargs):
+        """Возвращает список, построенный из строк выборки."""
+        names = list(self.get_serializer().fields)
+        if not settings.FAST_LISTS or not self.row_class.supports(names):
+            return super().list(request, *args, **kwargs)
+        rows = self.row_class(names)
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        ).values(*rows.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.render(page, queryset.db))
+        return Response(rows.render(queryset, queryset.db))
@@ -0,0 +1,243 @@
+"""Пагинация приложения api."""
+
+import json
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
+
+
+class KnownCountPaginator(Paginator):
+    """Пагинатор, принимающий заранее известное число объектов."""
+
+    def __init__(self, object_list, per_page, known_count=None, **kwargs):
+        """Подставляет известное число объектов вместо COUNT(*)."""
+        super().__init__(object_list, per_page, **kwargs)
+        if known_count is not None:
+            self.count = known_count
+
+
+def estimate_rows(model, using):
+    """Возвращает число строк таблицы модели по статистике базы или None.
+
+    PostgreSQL хранит оценку в pg_class.reltuples, SQLite - в sqlite_stat1
+    после ANALYZE.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(table)],
+            )
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                    [table],
+                )
+            except DatabaseError:
+                return None
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    estimate = int(float(str(row[0]).split()[0]))
+    return estimate if estimate > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки, оценивающий размер больших таблиц.
+
+    Для выборки без фильтров число строк берется из статистики базы, если
+    оценка не меньше ADMIN_ESTIMATED_COUNT['THRESHOLD']; отфильтрованные
+    выборки и небольшие таблицы считаются точно.
+    """
+
+    @cached_property
+    def count(self):
+        """Возвращает оценку или точное число объектов."""
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimate_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate >= (
+                settings.ADMIN_ESTIMATED_COUNT['THRESHOLD']
+            ):
+                return estimate
+        return super().count
+
+
+def after_key(ordering, values):
+    """Возвращает условие на строки, идущие после ключа в порядке ordering."""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = '__lt' if field.startswith('-') else '__gt'
+        condition |= equal & Q(**{name + lookup: value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def reverse_ordering(ordering):
+    """Возвращает обратный порядок сортировки."""
+    return tuple(
+        field[1:] if field.startswith('-') else '-' + field
+        for field in ordering
+    )
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Курсорная пагинация по ключу из всех полей сортировки.
+
+    CursorPagination из DRF хранит в курсоре только первое поле сортировки
+    и смещение среди строк с тем же значением, поэтому при неуникальном
+    первом поле (названии произведения) страницы выбираются через OFFSET.
+    Здесь курсор хранит значения всех полей сортировки, последнее из
+    которых уникально, и страница выбирается условием по этому ключу.
+    Поля сортировки не должны допускать NULL.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Возвращает страницу после или перед позицией курсора."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = (
+            reverse_ordering(self.ordering) if reverse else self.ordering
+        )
+        queryset = self.select_key(queryset).order_by(*ordering)
+        if self.cursor is not None and self.cursor.position is not None:
+            queryset = self.filter_after(
+                queryset, ordering, self.cursor.position
+            )
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+        self.has_next = reverse or has_more
+        self.has_previous = has_more if reverse else self.cursor is not None
+        return self.page
+
+    def select_key(self, queryset):
+        """Добавляет в выборку values() недостающие поля ключа."""
+        selected = queryset.query.values_select
+        missing = [
+            field.lstrip('-') for field in self.ordering
+            if field.lstrip('-') not in selected
+        ]
+        if selected and missing:
+            return queryset.values(*selected, *missing)
+        return queryset
+
+    def filter_after(self, queryset, ordering, position):
+        """Отбирает строки после позиции курсора."""
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError(position)
+            return queryset.filter(after_key(ordering, values))
+        except (ValueError, TypeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_position(self, item):
+        """Возвращает позицию курсора для объекта или строки values()."""
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(item, dict):
+            values = [item[name] for name in names]
+        else:
+            values = [getattr(item, name) for name in names]
+        return json.dumps(values, default=str)
+
+    def get_next_link(self):
+        """Возвращает ссылку на страницу после последнего объекта."""
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=False, position=self.get_position(self.page[-1])
+        ))
+
+    def get_previous_link(self):
+        """Возвращает ссылку на страницу перед первым объектом."""
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=True, position=self.get_position(self.page[0])
+        ))
+
+
+class CursorOptInPagination(PageNumberPagination):
+    """Пагинация по номеру страницы с курсорным режимом по запросу.
+
+    Курсорный режим включается параметром ?pagination=cursor или наличием
+    ?cursor=: выборка идет по ключу cursor_ordering без COUNT(*) и OFFSET,
+    а курсоры в ссылках next/previous непрозрачны для клиента. Параметры
+    из cursor_conflicts меняют порядок выдачи, поэтому в курсорном режиме
+    отклоняются с ошибкой 400.
+    Если представление знает размер коллекции (get_collection_count),
+    режим по номеру страницы обходится без COUNT(*).
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_ordering = ('-pub_date', 'id')
+    cursor_conflicts = ('ordering', 'search')
+
+    def is_cursor_requested(self, request):
+        """Проверяет, запросил ли клиент курсорный режим."""
+        return (
+            CursorPagination.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Выбирает режим пагинации и возвращает страницу."""
+        self.cursor_paginator = None
+        if not self.is_cursor_requested(request):
+            get_count = getattr(view, 'get_collection_count', None)
+            self.django_paginator_class = partial(
+                KnownCountPaginator,
+                known_count=get_count() if get_count else None,
+            )
+            return super().paginate_queryset(queryset, request, view)
+        conflicts = [
+            param for param in self.cursor_conflicts
+            if request.query_params.get(param)
+        ]
+        if conflicts:
+            raise ValidationError({
+                param: 'Не поддерживается курсорной пагинацией.'
+                for param in conflicts
+            })
+        self.cursor_paginator = KeysetCursorPagination()
+        self.cursor_paginator.ordering = self.cursor_ordering
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        """Возвращает ответ в формате выбранного режима."""
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(CursorOptInPagination):
+    """Пагинация произведений с курсором по названию."""
+
+    cursor_ordering = ('name', 'id')
@@ -0,0 +1,199 @@
+"""Профилирование отдельных запросов по требованию."""
+
+import cProfile
+import fnmatch
+import os
+import pstats
+import random
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+from users.models import ADMIN
+
+from .metrics import view_name
+
+SUFFIX = '.prof'
+SEPARATOR = '--'
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%S.%fZ'
+
+Profile = namedtuple('Profile', 'path name created view duration')
+
+
+def is_admin(request):
+    """Проверяет, что запрос отправил администратор.
+
+    Пользователь определяется аутентификацией API до выполнения
+    представления; пользователи с токеном кэшируются, поэтому повторная
+    проверка в представлении не обращается к базе.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except APIException:
+            return False
+        if result is not None:
+            return result[0].role == ADMIN or result[0].is_superuser
+    return False
+
+
+def profile_name(view, duration):
+    """Возвращает имя файла профиля запроса."""
+    return '{}{sep}{}{sep}{:.0f}ms{}'.format(
+        timezone.now().strftime(TIMESTAMP_FORMAT),
+        view.replace(os.sep, '.'),
+        duration * 1000,
+        SUFFIX,
+        sep=SEPARATOR,
+    )
+
+
+def parse_profile(path):
+    """Возвращает описание профиля по имени файла или None."""
+    name = os.path.basename(path)
+    if not name.endswith(SUFFIX):
+        return None
+    try:
+        created, rest = name[:-len(SUFFIX)].split(SEPARATOR, 1)
+        view, duration = rest.rsplit(SEPARATOR, 1)
+        return Profile(
+            path, name,
+            timezone.datetime.strptime(created, TIMESTAMP_FORMAT).replace(
+                tzinfo=timezone.utc
+            ),
+            view,
+            float(duration[:-len('ms')]) / 1000,
+        )
+    except ValueError:
+        return None
+
+
+def list_profiles(directory):
+    """Возвращает профили каталога от старых к новым."""
+    if not os.path.isdir(directory):
+        return []
+    profiles = (
+        parse_profile(os.path.join(directory, name))
+        for name in sorted(os.listdir(directory))
+    )
+    return [profile for profile in profiles if profile is not None]
+
+
+def select_profiles(directory, selector):
+    """Возвращает профили по пути к файлу, шаблону имени или представлению.
+
+    Шаблон содержит символы *, ? или [ и сравнивается с именем файла,
+    иначе строка считается именем представления, например
+    TitleViewSet.list.
+    """
+    if os.path.isfile(selector):
+        profile = parse_profile(selector)
+        return [profile] if profile else []
+    profiles = list_profiles(directory)
+    if any(char in selector for char in '*?['):
+        return [
+            profile for profile in profiles
+            if fnmatch.fnmatch(profile.name, selector)
+        ]
+    return [profile for profile in profiles if profile.view == selector]
+
+
+def load_stats(profiles, stream=None):
+    """Возвращает объединенную статистику профилей."""
+    return pstats.Stats(
+        *(profile.path for profile in profiles), stream=stream
+    )
+
+
+def per_request(stats, requests):
+    """Возвращает среднее за запрос время функций: (собственное, общее)."""
+    return {
+        function: (tottime / requests, cumtime / requests)
+        for function, (_, _, tottime, cumtime, _) in stats.stats.items()
+    }
+
+
+def diff_stats(before, after):
+    """Возвращает строки сравнения двух наборов профилей.
+
+    Строка - функция, среднее общее время за запрос до и после и
+    разница; строки упорядочены по убыванию модуля разницы.
+    """
+    first = per_request(load_stats(before), len(before))
+    second = per_request(load_stats(after), len(after))
+    rows = []
+    for function in set(first) | set(second):
+        old = first.get(function, (0, 0))[1]
+        new = second.get(function, (0, 0))[1]
+        rows.append((pstats.func_std_string(function), old, new, new - old))
+    return sorted(rows, key=lambda row: (-abs(row[3]), row[0]))
+
+
+def prune(directory, limit):
+    """Удаляет старые профили сверх limit."""
+    for profile in list_profiles(directory)[:-limit or None]:
+        try:
+            os.remove(profile.path)
+        except FileNotFoundError:
+            pass
+
+
+class RequestProfilingMiddleware:
+    """Middleware, снимающий профиль CPU выбранных запросов через cProfile.
+
+    Профилируются запросы администратора с заголовком X-Profile и доля
+    SAMPLE_RATE остальных. Профиль сохраняется в DIRECTORY с временем,
+    представлением и длительностью в имени файла, а имя возвращается в
+    заголовке X-Profile-Id. Тело потокового ответа формируется после
+    выхода из middleware и в профиль не попадает. При выключенной
+    настройке REQUEST_PROFILING['ENABLED'] не подключается.
+    """
+
+    def __init__(self, get_response):
+        """Подключается только при включенном профилировании."""
+        if not settings.REQUEST_PROFILING['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        """Проверяет, нужно ли профилировать запрос."""
+        config = settings.REQUEST_PROFILING
+        if request.META.get(config['HEADER']) and is_admin(request):
+            return True
+        return random.random() < config['SAMPLE_RATE']
+
+    def __call__(self, request):
+        """Выполняет запрос, при необходимости под профилировщиком."""
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Другой поток уже профилирует процесс (Python 3.12+).
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        response['X-Profile-Id'] = self.save(
+            profiler, view_name(request), time.perf_counter() - started
+        )
+        return response
+
+    @staticmethod
+    def save(profiler, view, duration):
+        """Сохраняет профиль и возвращает имя файла."""
+        config = settings.REQUEST_PROFILING
+        os.makedirs(config['DIRECTORY'], exist_ok=True)
+        name = profile_name(view, duration)
+        path = os.path.join(config['DIRECTORY'], name)
+        profiler.dump_stats(path + '.tmp')
+        os.replace(path + '.tmp', path)
+        prune(config['DIRECTORY'], config['MAX_FILES'])
+        return name
@@ -0,0 +1,108 @@
+"""Чтение из реплик базы данных."""
+
+import hashlib
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'api:replicas:pin:{}'
+
+_local = threading.local()
+
+
+def replica_aliases():
+    """Возвращает псевдонимы реплик из настроек."""
+    return settings.DATABASE_REPLICAS['ALIASES']
+
+
+def current_replica():
+    """Возвращает реплику, выбранную для текущего запроса, или None."""
+    return getattr(_local, 'alias', None)
+
+
+@contextmanager
+def primary():
+    """Направляет чтение внутри блока в основную базу."""
+    alias = current_replica()
+    _local.alias = None
+    try:
+        yield
+    finally:
+        _local.alias = alias
+
+
+class ReplicaRouter:
+    """Роутер, направляющий чтение моделей в реплики.
+
+    Реплики используются только внутри запросов, которые разрешил
+    ReplicaMiddleware, поэтому команды управления, админка и любые записи
+    всегда работают с основной базой. Все чтения запроса идут в одну
+    реплику, чтобы число строк, метка изменения и сами строки ответа
+    согласовывались между собой при разном отставании реплик.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Возвращает реплику запроса или None для основной базы."""
+        if model._meta.app_label not in settings.DATABASE_REPLICAS['APPS']:
+            return None
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        """Все записи идут в основную базу."""
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Реплики содержат те же данные, что и основная база."""
+        return True
+
+
+def client_key(request):
+    """Возвращает ключ закрепления клиента или None для анонимного."""
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return PIN_KEY.format(hashlib.md5(authorization.encode()).hexdigest())
+
+
+class ReplicaMiddleware:
+    """Middleware, разрешающий чтение из реплик безопасным запросам.
+
+    Безопасный запрос читает из одной случайной реплики. После записи
+    клиент на STICKY_SECONDS закрепляется за основной базой, чтобы видеть
+    свои изменения, даже если реплики отстают. Клиент определяется по
+    заголовку Authorization, а закрепление хранится в кэше Django,
+    который должен быть общим для всех воркеров. Без настроенных реплик
+    middleware не подключается.
+    """
+
+    def __init__(self, get_response):
+        """Подключается только при настроенных репликах."""
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def use_replicas(self, request, key):
+        """Проверяет, можно ли читать запрос из реплик."""
+        if request.method not in SAFE_METHODS or request.path.startswith(
+            settings.DATABASE_REPLICAS['PRIMARY_PATHS']
+        ):
+            return False
+        return key is None or not cache.get(key)
+
+    def __call__(self, request):
+        """Выполняет запрос с выбранными базами и закрепляет писавших."""
+        key = client_key(request)
+        if self.use_replicas(request, key):
+            _local.alias = random.choice(replica_aliases())
+        try:
+            response = self.get_response(request)
+        finally:
+            _local.alias = None
+        if key is not None and request.method not in SAFE_METHODS:
+            cache.set(key, True, settings.DATABASE_REPLICAS['STICKY_SECONDS'])
+        return response
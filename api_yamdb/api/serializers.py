@@ -2,13 +2,27 @@
 
 from django.utils import timezone
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking, TitleStats)
 from users.models import User
 
+from .metrics import TimedSerializerMixin
 from .utils import check_username_not_me
 
 
-class UserSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Миксин, оставляющий в ответе только поля из context['fields']."""
+
+    def __init__(self, *args, **kwargs):
+        """Убирает поля, не запрошенные клиентом."""
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                del self.fields[name]
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для обработки User."""
 
     def validate_username(self, value):
@@ -24,7 +38,7 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
 
 
-class CreateUserSerializer(serializers.ModelSerializer):
+class CreateUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для создания модели User."""
 
     def validate_username(self, value):
@@ -38,7 +52,7 @@ class CreateUserSerializer(serializers.ModelSerializer):
         model = User
 
 
-class ConfirmUserSerializer(serializers.ModelSerializer):
+class ConfirmUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для обработки кодов подтверждения."""
 
     username = serializers.CharField(max_length=150)
@@ -50,7 +64,7 @@ class ConfirmUserSerializer(serializers.ModelSerializer):
         model = User
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для обработки модели Genre."""
 
     class Meta:
@@ -64,7 +78,7 @@ class GenreSerializer(serializers.ModelSerializer):
         }
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для обработки модели Category."""
 
     class Meta:
@@ -78,8 +92,53 @@ class CategorySerializer(serializers.ModelSerializer):
         }
 
 
-class TitleGetSerializer(serializers.ModelSerializer):
-    """Сериализатор для получения объекта модели Title."""
+class GenreBulkSerializer(serializers.ModelSerializer):
+    """Сериализатор для проверки жанров при пакетном создании."""
+
+    slug = serializers.SlugField(max_length=50)
+
+    class Meta:
+        """Класс Meta, хранящий информацию полях модели Genre."""
+
+        model = Genre
+        fields = ('name', 'slug')
+
+
+class CategoryBulkSerializer(serializers.ModelSerializer):
+    """Сериализатор для проверки категорий при пакетном создании."""
+
+    slug = serializers.SlugField(max_length=50)
+
+    class Meta:
+        """Класс Meta, хранящий информацию полях модели Category."""
+
+        model = Category
+        fields = ('name', 'slug')
+
+
+class TitleStatsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Сериализатор распределения оценок произведения."""
+
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.FloatField(read_only=True)
+    median = serializers.FloatField(read_only=True)
+    scores = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta:
+        """Класс Meta, хранящий информацию полях модели TitleStats."""
+
+        model = TitleStats
+        fields = ('count', 'mean', 'median', 'scores')
+
+
+class TitleGetSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                         serializers.ModelSerializer):
+    """Сериализатор для получения объекта модели Title.
+
+    Поле stats выводится, только если в контексте передан include_stats.
+    """
 
     genre = GenreSerializer(
         read_only=True,
@@ -88,17 +147,45 @@ class TitleGetSerializer(serializers.ModelSerializer):
     category = CategorySerializer(
         read_only=True,
     )
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
+    stats = serializers.SerializerMethodField()
 
     class Meta:
         """Класс Meta, хранящий информацию полях модели Title."""
 
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
-                  'description', 'genre', 'category',)
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
+                  'description', 'genre', 'category', 'stats')
+
+    def __init__(self, *args, **kwargs):
+        """Убирает поле stats, если оно не запрошено."""
+        super().__init__(*args, **kwargs)
+        if not self.context.get('include_stats'):
+            self.fields.pop('stats', None)
+
+    def get_stats(self, title):
+        """Возвращает распределение оценок произведения."""
+        try:
+            stats = title.stats
+        except TitleStats.DoesNotExist:
+            stats = TitleStats(title=title)
+        return TitleStatsSerializer(stats).data
 
 
-class TitlePostSerializer(serializers.ModelSerializer):
+class LeaderboardSerializer(TimedSerializerMixin,
+                            serializers.ModelSerializer):
+    """Сериализатор позиции произведения в рейтинге лучших."""
+
+    title = TitleGetSerializer(read_only=True)
+
+    class Meta:
+        """Класс Meta, хранящий информацию полях модели TitleRanking."""
+
+        model = TitleRanking
+        fields = ('position', 'score', 'review_count', 'title')
+
+
+class TitlePostSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для создания объекта модели Title."""
 
     genre = serializers.SlugRelatedField(
@@ -128,7 +215,19 @@ class TitlePostSerializer(serializers.ModelSerializer):
         return year
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBulkSerializer(TitlePostSerializer):
+    """Сериализатор для проверки произведений при пакетном создании.
+
+    Жанры и категория принимаются как slug без обращения к базе, их
+    наличие проверяется одним запросом на весь пакет.
+    """
+
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+
+class ReviewSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                       serializers.ModelSerializer):
     """Сериализатор для обработки объекта модели Review."""
 
     author = serializers.SlugRelatedField(
@@ -140,7 +239,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         """Класс Meta, хранящий информацию полях модели Review."""
 
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
 
     def validate(self, data):
         """Валидатор объекта Review."""
@@ -158,7 +258,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, SparseFieldsMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для обработки объекта модели Comment."""
 
     author = serializers.SlugRelatedField(
@@ -171,5 +272,5 @@ class CommentSerializer(serializers.ModelSerializer):
         """Класс Meta, хранящий информацию полях модели Review."""
 
         model = Comment
-        fields = '__all__'
+        fields = ('id', 'review', 'author', 'text', 'pub_date')
         read_only_fields = ('author', 'review')
@@ -0,0 +1,46 @@
+"""Сигналы приложения api."""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+from .authentication import USER_VERSION
+from .cache import resource_versions
+
+CACHE_RESOURCES = (
+    (Genre, 'genres'),
+    (Category, 'categories'),
+    (Title, 'titles'),
+    # Review writes change the rating stored on Title.
+    (Review, 'titles'),
+)
+
+
+def bump_on_commit(resource, using=None, **kwargs):
+    """Увеличивает версию ресурса после фиксации транзакции."""
+    transaction.on_commit(partial(resource_versions.bump, resource), using)
+
+
+for model, resource in CACHE_RESOURCES:
+    post_save.connect(
+        partial(bump_on_commit, resource), sender=model, weak=False
+    )
+    post_delete.connect(
+        partial(bump_on_commit, resource), sender=model, weak=False
+    )
+m2m_changed.connect(
+    partial(bump_on_commit, 'titles'), sender=Title.genre.through,
+    weak=False,
+)
+
+
+def bump_user_on_commit(instance, using=None, **kwargs):
+    """Сбрасывает кэш аутентификации пользователя после фиксации."""
+    bump_on_commit(USER_VERSION.format(instance.pk), using)
+
+
+post_save.connect(bump_user_on_commit, sender=User)
+post_delete.connect(bump_user_on_commit, sender=User)
@@ -0,0 +1,328 @@
+"""Детерминированная генерация данных для тестов производительности."""
+
+import random
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+from reviews.models import (SCORE_FIELD, SCORES, Category, Comment, Genre,
+                            Review, Title, TitleStats)
+from users.models import ADMIN, MODER, USER, User
+
+TITLES_PER_CHUNK = 100
+MAX_GENRES_PER_TITLE = 4
+HISTORY = timedelta(days=5 * 365)
+
+
+class ZipfSampler:
+    """Выбор целого k от 0 до maximum с весом 1 / (k + 1) ** exponent."""
+
+    def __init__(self, maximum, exponent):
+        """Строит накопленные веса значений."""
+        self.cumulative = list(accumulate(
+            (k + 1) ** -exponent for k in range(maximum + 1)
+        ))
+
+    def __call__(self, rng):
+        """Возвращает случайное значение."""
+        return bisect(self.cumulative, rng.random() * self.cumulative[-1])
+
+
+def role_of(index):
+    """Возвращает роль пользователя по его номеру.
+
+    Каждый тысячный пользователь - администратор, каждый пятидесятый -
+    модератор, поэтому при двух и больше пользователях есть обе роли.
+    """
+    if index % 1000 == 0:
+        return ADMIN
+    if index % 50 == 1:
+        return MODER
+    return USER
+
+
+def batches(rows, size):
+    """Возвращает строки списками не длиннее size."""
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
+
+class Table:
+    """Вставка строк модели многострочными INSERT.
+
+    Строки передаются кортежами уже подготовленных для базы значений
+    полей names и не проходят через экземпляры моделей и компилятор
+    запросов Django. Остальные поля получают значение по умолчанию,
+    вычисленное один раз, а автоинкрементный ключ, если его нет в names,
+    назначает база.
+    """
+
+    def __init__(self, model, names, using, batch_size):
+        """Готовит текст запроса и значения по умолчанию."""
+        self.connection = connections[using]
+        fields = [model._meta.get_field(name) for name in names]
+        rest = [
+            field for field in model._meta.concrete_fields
+            if field.name not in names
+            and not isinstance(field, models.AutoField)
+        ]
+        self.defaults = [
+            field.get_db_prep_save(field.get_default(), self.connection)
+            for field in rest
+        ]
+        columns = [field.column for field in fields + rest]
+        limit = self.connection.features.max_query_params
+        self.batch_size = batch_size if limit is None else max(
+            1, min(batch_size, limit // len(columns))
+        )
+        quote = self.connection.ops.quote_name
+        self.sql = 'INSERT INTO {} ({}) VALUES '.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(column) for column in columns),
+        )
+        self.placeholder = '({})'.format(', '.join(['%s'] * len(columns)))
+
+    def insert(self, rows):
+        """Вставляет строки порциями и возвращает их число."""
+        count = 0
+        with self.connection.cursor() as cursor:
+            for batch in batches(rows, self.batch_size):
+                params = []
+                for row in batch:
+                    params.extend(row)
+                    params.extend(self.defaults)
+                cursor.execute(
+                    self.sql + ', '.join([self.placeholder] * len(batch)),
+                    params,
+                )
+                count += len(batch)
+        return count
+
+
+class Generator:
+    """Генератор пользователей, каталога, отзывов и комментариев.
+
+    Одинаковые параметры и seed дают одинаковые данные, кроме первичных
+    ключей в непустой базе и времени, от которого отсчитываются даты.
+    Число отзывов к произведению и комментариев к отзыву распределено по
+    закону Ципфа, авторы отзывов к одному произведению различны, как
+    требует unique_review. Первичные ключи назначаются заранее, поэтому
+    связи не требуют запросов, а в памяти держится только порция из
+    TITLES_PER_CHUNK произведений с оценками их отзывов. Рейтинги,
+    распределения оценок и счетчики комментариев считаются при генерации
+    и сразу согласованы с отзывами.
+    """
+
+    def __init__(self, users, titles, categories=10, genres=25, seed=0,
+                 prefix='gen', max_reviews=1000, max_comments=50,
+                 exponent=1.1, batch_size=1000, using=DEFAULT_DB_ALIAS):
+        """Запоминает размеры набора данных."""
+        self.users = users
+        self.titles = titles
+        self.categories = categories
+        self.genres = genres
+        self.prefix = prefix
+        self.using = using
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+        self.adapt = connections[using].ops.adapt_datetimefield_value
+        self.reviews_per_title = ZipfSampler(
+            min(max_reviews, users), exponent
+        )
+        self.comments_per_review = ZipfSampler(max_comments, exponent)
+        self.genres_per_title = ZipfSampler(MAX_GENRES_PER_TITLE - 1, 1.5)
+        self.genre_weights = list(accumulate(
+            1 / rank for rank in range(1, genres + 1)
+        ))
+        tables = {
+            'users': (User, (
+                'id', 'username', 'email', 'role', 'password',
+                'confirmation_code',
+            )),
+            'categories': (Category, ('id', 'name', 'slug')),
+            'genres': (Genre, ('id', 'name', 'slug')),
+            'titles': (Title, (
+                'id', 'name', 'year', 'description', 'category',
+                'score_sum', 'review_count', 'rating', 'modified',
+            )),
+            'title genres': (Title.genre.through, ('title', 'genre')),
+            'title stats': (TitleStats, ('title',) + tuple(
+                SCORE_FIELD.format(score) for score in SCORES
+            )),
+            'reviews': (Review, (
+                'id', 'title', 'author', 'score', 'comment_count', 'text',
+                'pub_date', 'modified',
+            )),
+            'comments': (Comment, (
+                'review', 'author', 'text', 'pub_date', 'modified',
+            )),
+        }
+        self.tables = {
+            name: Table(model, names, using, batch_size)
+            for name, (model, names) in tables.items()
+        }
+        self.counts = dict.fromkeys(self.tables, 0)
+
+    def first_pk(self, model):
+        """Возвращает первый свободный первичный ключ модели."""
+        last = model.objects.using(self.using).aggregate(last=Max('pk'))
+        return (last['last'] or 0) + 1
+
+    def insert(self, name, rows):
+        """Вставляет строки в таблицу и учитывает их число."""
+        self.counts[name] += self.tables[name].insert(rows)
+
+    def generate(self):
+        """Создает набор данных и возвращает число строк по таблицам."""
+        self.user_pk = self.first_pk(User)
+        self.review_pk = self.first_pk(Review)
+        category_pk = self.first_pk(Category)
+        genre_pk = self.first_pk(Genre)
+        self.category_pks = range(category_pk, category_pk + self.categories)
+        self.genre_pks = range(genre_pk, genre_pk + self.genres)
+        with transaction.atomic(using=self.using):
+            self.insert('users', self.user_rows())
+            self.insert('categories', (
+                (pk, 'Category {}'.format(i),
+                 '{}-category-{}'.format(self.prefix, i))
+                for i, pk in enumerate(self.category_pks)
+            ))
+            self.insert('genres', (
+                (pk, 'Genre {}'.format(i),
+                 '{}-genre-{}'.format(self.prefix, i))
+                for i, pk in enumerate(self.genre_pks)
+            ))
+        title_pk = self.first_pk(Title)
+        for start in range(0, self.titles, TITLES_PER_CHUNK):
+            with transaction.atomic(using=self.using):
+                self.insert_titles(title_pk, start, min(
+                    TITLES_PER_CHUNK, self.titles - start
+                ))
+        self.reset_sequences()
+        return self.counts
+
+    def user_rows(self):
+        """Возвращает пользователей всех ролей."""
+        for i in range(self.users):
+            yield (
+                self.user_pk + i,
+                '{}{}'.format(self.prefix, i),
+                '{}{}@example.com'.format(self.prefix, i),
+                role_of(i),
+                UNUSABLE_PASSWORD_PREFIX,
+                '{:032x}'.format(self.rng.getrandbits(128)),
+            )
+
+    def title_genres(self):
+        """Возвращает жанры произведения, популярные жанры чаще."""
+        if not self.genres:
+            return []
+        picked = self.rng.choices(
+            self.genre_pks, cum_weights=self.genre_weights,
+            k=self.genres_per_title(self.rng) + 1,
+        )
+        return sorted(set(picked))
+
+    def title_reviews(self):
+        """Возвращает отзывы произведения без ключей.
+
+        Отзыв - это автор, оценка, число комментариев и дата.
+        """
+        count = self.reviews_per_title(self.rng)
+        return [
+            (
+                author,
+                self.rng.choice(SCORES),
+                self.comments_per_review(self.rng),
+                self.now - HISTORY * self.rng.random(),
+            )
+            for author in self.rng.sample(range(self.users), count)
+        ]
+
+    def insert_titles(self, title_pk, start, size):
+        """Вставляет порцию произведений с жанрами, отзывами, комментариями."""
+        titles, genres, reviews = [], [], []
+        for index in range(start, start + size):
+            pk = title_pk + index
+            title_reviews = self.title_reviews()
+            score_sum = sum(review[1] for review in title_reviews)
+            titles.append((
+                pk,
+                'Title {}'.format(index),
+                self.rng.randint(1920, 2020),
+                'Description of title {}'.format(index),
+                (
+                    self.rng.choice(self.category_pks)
+                    if self.categories else None
+                ),
+                score_sum,
+                len(title_reviews),
+                score_sum / len(title_reviews) if title_reviews else None,
+                self.adapt(self.now),
+            ))
+            genres.extend((pk, genre) for genre in self.title_genres())
+            reviews.extend((pk,) + review for review in title_reviews)
+        self.insert('titles', titles)
+        self.insert('title genres', genres)
+        self.insert('title stats', self.stats_rows(titles, reviews))
+        review_pk = self.review_pk
+        self.review_pk += len(reviews)
+        self.insert('reviews', (
+            (
+                review_pk + i, title, self.user_pk + author, score,
+                comments, 'Review text', created, created,
+            )
+            for i, (title, author, score, comments, created) in enumerate(
+                self.adapt_dates(reviews)
+            )
+        ))
+        self.insert('comments', (
+            (
+                review_pk + i,
+                self.user_pk + self.rng.randrange(self.users),
+                'Comment text',
+                created,
+                created,
+            )
+            for i, review in enumerate(reviews)
+            for created in map(self.adapt, self.comment_dates(review))
+        ))
+
+    def adapt_dates(self, rows):
+        """Подготавливает для базы дату - последнее значение строк."""
+        for row in rows:
+            yield row[:-1] + (self.adapt(row[-1]),)
+
+    def comment_dates(self, review):
+        """Возвращает даты комментариев к отзыву, не раньше самого отзыва."""
+        comments, reviewed = review[3], review[4]
+        return sorted(
+            reviewed + (self.now - reviewed) * self.rng.random()
+            for _ in range(comments)
+        )
+
+    @staticmethod
+    def stats_rows(titles, reviews):
+        """Возвращает распределения оценок произведений порции."""
+        scores = {title[0]: [0] * len(SCORES) for title in titles}
+        for title, _, score, _, _ in reviews:
+            scores[title][SCORES.index(score)] += 1
+        return ((title,) + tuple(row) for title, row in scores.items())
+
+    def reset_sequences(self):
+        """Сдвигает последовательности ключей за вставленные строки."""
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Category, Genre, Title, Review]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
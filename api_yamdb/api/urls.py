@@ -4,7 +4,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, ConfirmUser, CreateUser,
-                    GenreViewSet, ReviewViewSet, TitleViewSet, UserViewSet)
+                    ExportView, GenreViewSet, MetricsView, ReviewViewSet,
+                    TitleViewSet, UserViewSet)
 
 router_v1 = routers.DefaultRouter()
 router_v1.register('users', UserViewSet)
@@ -26,5 +27,7 @@ router_v1.register(r'genres', GenreViewSet, basename='genres')
 urlpatterns = [
     path('v1/auth/signup/', CreateUser.as_view(), name='signup'),
     path('v1/auth/token/', ConfirmUser.as_view(), name='get_token'),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
+    path('v1/export/<str:resource>/', ExportView.as_view(), name='export'),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,33 +1,92 @@
 """Представления приложения api."""
 
-from django.core.mail import send_mail
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from functools import partial
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import OuterRef, Subquery
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (Category, Genre, Review, Title, TitleRanking,
+                            TitleStats)
 from users.models import User
-
-from api_yamdb.settings import DEFAULT_FROM_EMAIL
-
-from .filters import TitleFilter
-from .mixins import CreateListDestroyMixinViewset
+from users.outbox import enqueue_email
+
+from .bulk import CategoryBulkCreator, GenreBulkCreator, TitleBulkCreator
+from .cache import resource_versions, response_cache
+from .deletion import ReviewCascade, TitleCascade, UserCascade
+from .export import EXPORTS, next_since, parse_since
+from .filters import LeaderboardFilter, TitleFilter
+from .metrics import registry
+from .mixins import (BulkCreateMixin, CachedListMixin, CachedReadMixin,
+                     CascadeDestroyMixin, ConditionalReadMixin,
+                     CreateListDestroyMixinViewset, NestedParentMixin,
+                     ReadQuerysetMixin, RowListMixin, split_names)
+from .pagination import CursorOptInPagination, TitlePagination
 from .permissions import (AdminOnly, IsAdminOrIsSelf, IsAdminOrReadOnly,
                           IsAuthorPatch, IsModeratorAuthorDelete)
+from .renderers import CSVRenderer, NDJSONRenderer
+from .rows import TitleRows
 from .serializers import (CategorySerializer, CommentSerializer,
                           ConfirmUserSerializer, CreateUserSerializer,
-                          GenreSerializer, ReviewSerializer,
-                          TitleGetSerializer, TitlePostSerializer,
+                          GenreSerializer, LeaderboardSerializer,
+                          ReviewSerializer, TitleGetSerializer,
+                          TitlePostSerializer, TitleStatsSerializer,
                           UserSerializer)
 
 
+class MetricsView(APIView):
+    """Представление метрик запросов в формате Prometheus."""
+
+    permission_classes = (IsAuthenticated, AdminOnly)
+
+    def get(self, request):
+        """Метод, возвращающий накопленные гистограммы."""
+        return HttpResponse(
+            registry.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class ExportView(APIView):
+    """Представление потоковой выгрузки в форматах NDJSON и CSV."""
+
+    permission_classes = (IsAuthenticated, AdminOnly)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+
+    def get(self, request, resource):
+        """Метод, возвращающий выгрузку ресурса порциями."""
+        export_class = EXPORTS.get(resource)
+        if export_class is None:
+            raise Http404
+        since = parse_since(request.query_params.get('since'))
+        watermark = next_since()
+        export = export_class(since, router.db_for_read(export_class.model))
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += '; charset={}'.format(renderer.charset)
+        response = StreamingHttpResponse(
+            renderer.stream(export.columns, export.chunks()),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="{}.{}"'.format(resource, renderer.format)
+        )
+        response['X-Export-Since'] = watermark
+        return response
+
+
 class CreateUser(APIView):
     """Представление для создания пользователя."""
 
@@ -35,14 +94,13 @@ class CreateUser(APIView):
         """Метод, создающий пользователя с помощью сериализатора."""
         serializer = CreateUserSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        send_mail(
-            'confirmation_code',
-            str(user.confirmation_code),
-            DEFAULT_FROM_EMAIL,
-            [serializer.validated_data['email']],
-            fail_silently=False,
-        )
+        with transaction.atomic():
+            user = serializer.save()
+            enqueue_email(
+                'confirmation_code',
+                str(user.confirmation_code),
+                serializer.validated_data['email'],
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -55,40 +113,32 @@ class ConfirmUser(APIView):
         serializer.is_valid(raise_exception=True)
         confirmation_code = serializer.validated_data.get('confirmation_code')
         username = serializer.validated_data.get('username')
-        if User.objects.filter(
-            username=username, confirmation_code=confirmation_code
-        ).exists():
-            user = get_object_or_404(
-                User, username=username,
-                confirmation_code=confirmation_code
-            )
-            refresh = RefreshToken.for_user(user)
-            send_mail(
-                'your_token',
-                str(str(refresh.access_token)),
-                DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
+        user = User.objects.filter(username=username).first()
+        if user is None:
             return Response(
-                {"token": str(refresh.access_token)},
-                status=status.HTTP_200_OK
+                'Не найден такой username!',
+                status=status.HTTP_404_NOT_FOUND
             )
-        if User.objects.filter(username=username).exists():
+        if not constant_time_compare(
+            user.confirmation_code, confirmation_code
+        ):
             return Response(
                 'Код подтверждения не верный!',
                 status=status.HTTP_400_BAD_REQUEST
             )
+        refresh = RefreshToken.for_user(user)
+        enqueue_email('your_token', str(refresh.access_token), user.email)
         return Response(
-            'Не найден такой username!',
-            status=status.HTTP_404_NOT_FOUND
+            {"token": str(refresh.access_token)},
+            status=status.HTTP_200_OK
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(CascadeDestroyMixin, viewsets.ModelViewSet):
     """Представление для обработки объектов модели User."""
 
-    queryset = User.objects.all().order_by('id')
+    queryset = User.objects.filter(pending_deletion=False).order_by('id')
+    cascade_class = UserCascade
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated, AdminOnly)
     pagination_class = PageNumberPagination
@@ -113,17 +163,102 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalReadMixin, CachedReadMixin, ReadQuerysetMixin,
+                   BulkCreateMixin, RowListMixin, CascadeDestroyMixin,
+                   viewsets.ModelViewSet):
     """Представление для обработки объектов Title."""
 
-    queryset = Title.objects.annotate(
-        rating=(Avg('reviews__score')),
-    ).order_by('name')
+    queryset = Title.objects.filter(pending_deletion=False).order_by('name')
+    cascade_class = TitleCascade
+    cache_resources = ('titles', 'genres', 'categories')
+    versioned_watermark = True
+    bulk_creator_class = TitleBulkCreator
+    row_class = TitleRows
+    read_select_related = ('category',)
+    read_prefetch_related = ('genre',)
     permission_classes = (IsAdminOrReadOnly, )
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     filter_backends = (DjangoFilterBackend, )
     filterset_class = TitleFilter
 
+    def include_stats(self):
+        """Метод, проверяющий, запрошено ли поле stats в списке.
+
+        Поле выводится только по явному запросу: ?stats=true или его
+        имени в ?fields=, но не в составе всех полей при ?omit=.
+        """
+        params = self.request.query_params
+        return (
+            params.get('stats') == 'true'
+            or 'stats' in split_names(params.get('fields'))
+        )
+
+    def get_queryset(self):
+        """Метод, подгружающий статистику оценок, если она запрошена."""
+        queryset = super().get_queryset()
+        if self.action in self.read_actions and self.include_stats():
+            return queryset.select_related('stats')
+        return queryset
+
+    def get_serializer_context(self):
+        """Метод, передающий сериализатору признак вывода статистики."""
+        context = super().get_serializer_context()
+        context['include_stats'] = self.include_stats()
+        return context
+
+    def get_watermark(self):
+        """Метод, возвращающий версии ресурсов, от которых зависит ответ."""
+        return resource_versions.get(self.cache_resources), None
+
+    def get_leaderboard_limit(self):
+        """Метод, возвращающий размер рейтинга из параметра limit."""
+        limit = self.request.query_params.get(
+            'limit', settings.LEADERBOARD['DEFAULT_LIMIT']
+        )
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        return max(1, min(limit, settings.LEADERBOARD['MAX_LIMIT']))
+
+    def leaderboard(self, request):
+        """Метод, выбирающий лучшие произведения из рейтинга."""
+        filterset = LeaderboardFilter(
+            request.query_params,
+            queryset=TitleRanking.objects.select_related(
+                'title__category'
+            ).prefetch_related('title__genre'),
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        rankings = filterset.qs[:self.get_leaderboard_limit()]
+        return Response(LeaderboardSerializer(rankings, many=True).data)
+
+    @action(detail=False, methods=('get',))
+    def top(self, request):
+        """Метод, возвращающий рейтинг лучших произведений.
+
+        Версию leaderboard увеличивает другой процесс, сервис leaderboard;
+        при кэше в памяти процесса она не меняется, поэтому ответ живет
+        не дольше интервала пересчета рейтинга.
+        """
+        return response_cache.fetch(
+            request,
+            ('leaderboard',) + self.cache_resources,
+            partial(self.leaderboard, request),
+            timeout=settings.LEADERBOARD['REFRESH_INTERVAL'],
+        )
+
+    @action(detail=True, methods=('get',))
+    def stats(self, request, pk=None):
+        """Метод, возвращающий распределение оценок произведения."""
+        title = self.get_object()
+        try:
+            stats = title.stats
+        except TitleStats.DoesNotExist:
+            stats = TitleStats(title=title)
+        return Response(TitleStatsSerializer(stats).data)
+
     def get_serializer_class(self):
         """Метод, обрабатывающий объекты Title."""
         if self.action in ('list', 'retrieve',):
@@ -131,10 +266,13 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitlePostSerializer
 
 
-class GenreViewSet(CreateListDestroyMixinViewset):
+class GenreViewSet(CachedListMixin, BulkCreateMixin,
+                   CreateListDestroyMixinViewset):
     """Представление для обработки объектов Genre."""
 
     queryset = Genre.objects.all()
+    cache_resources = ('genres',)
+    bulk_creator_class = GenreBulkCreator
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly, )
     pagination_class = PageNumberPagination
@@ -143,10 +281,13 @@ class GenreViewSet(CreateListDestroyMixinViewset):
     lookup_field = 'slug'
 
 
-class CategoryViewSet(CreateListDestroyMixinViewset):
+class CategoryViewSet(CachedListMixin, BulkCreateMixin,
+                      CreateListDestroyMixinViewset):
     """Представление для обработки объектов Category."""
 
     queryset = Category.objects.all()
+    cache_resources = ('categories',)
+    bulk_creator_class = CategoryBulkCreator
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly, )
     pagination_class = PageNumberPagination
@@ -155,29 +296,62 @@ class CategoryViewSet(CreateListDestroyMixinViewset):
     lookup_field = 'slug'
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalReadMixin, NestedParentMixin,
+                    ReadQuerysetMixin, CascadeDestroyMixin,
+                    viewsets.ModelViewSet):
     """Представление для обработки объектов Review."""
 
+    cascade_class = ReviewCascade
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorPatch,
         IsModeratorAuthorDelete,
     )
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOptInPagination
+    read_select_related = ('author',)
+
+    def get_parent_queryset(self):
+        """Метод, находящий произведение из адреса."""
+        return Title.objects.filter(
+            pk=self.kwargs.get('title_id'), pending_deletion=False
+        ).only(
+            'pk', 'modified', 'review_count'
+        ).annotate(latest_review=Subquery(
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by('-modified').values('modified')[:1]
+        ))
+
+    def get_watermark(self):
+        """Метод, возвращающий время изменения отзывов произведения.
+
+        Время изменения произведения отмечает состав и оценки отзывов,
+        а позднейшее время изменения отзыва - правку текста и имени автора.
+        """
+        title = self.get_parent()
+        latest = title.latest_review or title.modified
+        return '{}|{}'.format(
+            title.modified.isoformat(), latest.isoformat()
+        ), max(title.modified, latest)
+
+    def get_collection_count(self):
+        """Метод, возвращающий число отзывов произведения."""
+        return self.get_parent().review_count
 
     def get_queryset(self):
         """Метод, получающий объекты Review."""
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        reviews = self.get_parent().reviews.all()
+        if self.action not in self.read_actions:
+            return reviews.select_related('author')
+        return self.get_read_queryset(reviews)
 
     def perform_create(self, serializer):
         """Метод, создающий объекты Review."""
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_parent())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalReadMixin, NestedParentMixin,
+                     ReadQuerysetMixin, viewsets.ModelViewSet):
     """Представление для обработки объектов Comment."""
 
     serializer_class = CommentSerializer
@@ -186,14 +360,33 @@ class CommentViewSet(viewsets.ModelViewSet):
         IsAuthorPatch,
         IsModeratorAuthorDelete,
     )
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOptInPagination
+    read_select_related = ('author',)
+
+    def get_parent_queryset(self):
+        """Метод, находящий отзыв, принадлежащий произведению из адреса."""
+        return Review.objects.filter(
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+            title__pending_deletion=False,
+        ).only('pk', 'title_id', 'modified', 'comment_count')
+
+    def get_watermark(self):
+        """Метод, возвращающий время изменения комментариев отзыва."""
+        modified = self.get_parent().modified
+        return modified.isoformat(), modified
+
+    def get_collection_count(self):
+        """Метод, возвращающий число комментариев отзыва."""
+        return self.get_parent().comment_count
 
     def get_queryset(self):
         """Метод, получающий объекты Comment."""
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        comments = self.get_parent().comments.all()
+        if self.action not in self.read_actions:
+            return comments.select_related('author')
+        return self.get_read_queryset(comments)
 
     def perform_create(self, serializer):
         """Метод, создающий объекты Comment."""
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
@@ -2,6 +2,7 @@
 
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 
 from dotenv import load_dotenv
 
@@ -31,10 +32,13 @@ INSTALLED_APPS = [
     'django_filters',
     'users.apps.UsersConfig',
     'api.apps.ApiConfig',
-    'reviews',
+    'reviews.apps.ReviewsConfig',
 ]
 
 MIDDLEWARE = [
+    'api.profiling.RequestProfilingMiddleware',
+    'api.metrics.RequestMetricsMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +82,31 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICAS = {
+    'ALIASES': [],
+    'APPS': ('reviews',),
+    'PRIMARY_PATHS': ('/admin/',),
+    'STICKY_SECONDS': int(os.getenv('DB_REPLICA_STICKY_SECONDS', default=5)),
+}
+
+# DB_REPLICAS - реплики через запятую: хосты для PostgreSQL, файлы для SQLite.
+for index, location in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1
+):
+    alias = 'replica_{}'.format(index)
+    location_field = (
+        'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3')
+        else 'HOST'
+    )
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        **{location_field: location.strip()},
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS['ALIASES'].append(alias)
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -119,10 +148,119 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append(
+        'api.renderers.MessagePackRenderer'
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append(
+        'api.renderers.MessagePackParser'
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+# Resource versions are bumped by the web workers and by the worker,
+# leaderboard and purger containers and management commands, so caches
+# that depend on them are enabled by default only with a store shared by
+# all processes (memcached, redis, a common directory for files).
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+RESPONSE_CACHE = {
+    'ENABLED': os.getenv(
+        'RESPONSE_CACHE_ENABLED', default=str(SHARED_CACHE)
+    ) == 'True',
+    'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', default='lru'),
+    'CACHE_ALIAS': 'default',
+    'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', default=1024)),
+    'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300)),
+    'LOCK_TIMEOUT': 5,
+}
+
+# Opt-in: cached users are invalidated through the same version counters.
+AUTH_USER_CACHE = {
+    'ENABLED': os.getenv(
+        'AUTH_USER_CACHE_ENABLED', default='False'
+    ) == 'True',
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 60,
+}
+
+BULK_CREATE = {
+    'MAX_ITEMS': int(os.getenv('BULK_CREATE_MAX_ITEMS', default=500)),
+}
+
+LEADERBOARD = {
+    'MIN_VOTES': int(os.getenv('LEADERBOARD_MIN_VOTES', default=5)),
+    'PRIOR_WEIGHT': float(os.getenv('LEADERBOARD_PRIOR_WEIGHT', default=5)),
+    'REFRESH_INTERVAL': int(
+        os.getenv('LEADERBOARD_REFRESH_INTERVAL', default=300)
+    ),
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 100,
+}
+
+FAST_LISTS = os.getenv('FAST_LISTS_ENABLED', default='True') == 'True'
+
+EXPORT = {
+    'SINCE_OVERLAP': int(os.getenv('EXPORT_SINCE_OVERLAP', default=60)),
+}
+
+DELETION = {
+    'ASYNC_THRESHOLD': int(
+        os.getenv('DELETION_ASYNC_THRESHOLD', default=10000)
+    ),
+    'BATCH_SIZE': int(os.getenv('DELETION_BATCH_SIZE', default=500)),
+    'POLL_INTERVAL': float(os.getenv('DELETION_POLL_INTERVAL', default=2)),
+}
+
+ADMIN_ESTIMATED_COUNT = {
+    'THRESHOLD': int(
+        os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=10000)
+    ),
+}
+
+REQUEST_METRICS = {
+    'ENABLED': os.getenv('REQUEST_METRICS_ENABLED', default='False') == 'True',
+    'SERVER_TIMING': os.getenv(
+        'SERVER_TIMING_ENABLED', default='False'
+    ) == 'True',
+}
+
+REQUEST_PROFILING = {
+    'ENABLED': os.getenv(
+        'REQUEST_PROFILING_ENABLED', default='False'
+    ) == 'True',
+    'HEADER': 'HTTP_X_PROFILE',
+    'SAMPLE_RATE': float(
+        os.getenv('REQUEST_PROFILING_SAMPLE_RATE', default=0)
+    ),
+    'DIRECTORY': os.getenv(
+        'REQUEST_PROFILING_DIRECTORY',
+        default=os.path.join(BASE_DIR, 'profiles'),
+    ),
+    'MAX_FILES': int(os.getenv('REQUEST_PROFILING_MAX_FILES', default=500)),
 }
 
 SIMPLE_JWT = {
@@ -135,3 +273,12 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'from@example.com'
+
+OUTBOX = {
+    'BATCH_SIZE': int(os.getenv('OUTBOX_BATCH_SIZE', default=100)),
+    'MAX_ATTEMPTS': int(os.getenv('OUTBOX_MAX_ATTEMPTS', default=8)),
+    'BACKOFF': 30,
+    'MAX_BACKOFF': 3600,
+    'LEASE': 300,
+    'POLL_INTERVAL': float(os.getenv('OUTBOX_POLL_INTERVAL', default=2)),
+}
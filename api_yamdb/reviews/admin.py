@@ -1,8 +1,30 @@
 """Настройки админ-панели приложения Reviews."""
 
+from api.cache import resource_versions
+from api.pagination import EstimatedCountPaginator
 from django.contrib import admin
+from django.core.cache import cache
+from django.db.models import Prefetch
 
-from .models import Category, Genre, Title
+from .models import Category, Genre, Review, Title
+
+CATEGORY_CHOICES_KEY = 'admin:category-choices:{}'
+
+
+def category_choices():
+    """Возвращает варианты выбора категории, общие для всех строк.
+
+    Список хранится в кэше до следующего изменения категорий.
+    """
+    key = CATEGORY_CHOICES_KEY.format(*resource_versions.get(('categories',)))
+    choices = cache.get(key)
+    if choices is None:
+        choices = [('', '---------')] + [
+            (pk, str(name))
+            for pk, name in Category.objects.values_list('pk', 'name')
+        ]
+        cache.set(key, choices, None)
+    return choices
 
 
 class TitleAdmin(admin.ModelAdmin):
@@ -19,13 +41,47 @@ class TitleAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     list_editable = ('category',)
     list_filter = ('category', 'year')
+    list_select_related = ('category',)
     empty_value_display = '-empty-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        """Подгружает жанры всех строк страницы одним запросом."""
+        return super().get_queryset(request).prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.only('name'))
+        )
+
+    def get_changelist_formset(self, request, **kwargs):
+        """Строит формы строк с общим списком категорий."""
+        formset = super().get_changelist_formset(request, **kwargs)
+        formset.form.base_fields['category'].choices = category_choices()
+        return formset
 
     def genres(self, obj):
         """Отображение жанров."""
         return ", ".join([x.name for x in obj.genre.all()])
 
 
+class ReviewAdmin(admin.ModelAdmin):
+    """Описание для моделей Review."""
+
+    list_display = (
+        'pk',
+        'title',
+        'author',
+        'score',
+        'comment_count',
+        'pub_date',
+    )
+    list_filter = ('score',)
+    list_select_related = ('title', 'author')
+    raw_id_fields = ('title', 'author')
+    empty_value_display = '-empty-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 class GenreAdmin(admin.ModelAdmin):
     """Описание для моделей Genre."""
 
@@ -49,5 +105,6 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Title, TitleAdmin)
+admin.site.register(Review, ReviewAdmin)
 admin.site.register(Genre)
 admin.site.register(Category)
@@ -7,3 +7,7 @@ class ReviewsConfig(AppConfig):
     """Настройки конфигурации приложения reviews."""
 
     name = 'reviews'
+
+    def ready(self):
+        """Подключает сигналы приложения."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:18
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.using(schema_editor.connection.alias).annotate(
+        total=Sum('reviews__score'), count=Count('reviews'),
+    ).filter(count__gt=0)
+    for title in titles.iterator():
+        Title.objects.using(schema_editor.connection.alias).filter(
+            pk=title.pk
+        ).update(
+            score_sum=title.total,
+            review_count=title.count,
+            rating=title.total / title.count,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_auto_20220819_1212'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='average review score'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of reviews'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='sum of review scores'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:40
+
+from django.db import migrations
+
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce({0}.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({0}.description, '')), 'B')"
+)
+
+POSTGRES_FORWARD = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'ALTER TABLE reviews_title ADD COLUMN search_vector tsvector',
+    'CREATE FUNCTION reviews_title_search_update() RETURNS trigger AS $$ '
+    'BEGIN NEW.search_vector := {}; RETURN NEW; END '
+    '$$ LANGUAGE plpgsql'.format(POSTGRES_VECTOR.format('NEW')),
+    'CREATE TRIGGER reviews_title_search_trigger '
+    'BEFORE INSERT OR UPDATE OF name, description ON reviews_title '
+    'FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_update()',
+    'UPDATE reviews_title SET search_vector = {}'.format(
+        POSTGRES_VECTOR.format('reviews_title')
+    ),
+    'CREATE INDEX reviews_title_search_idx '
+    'ON reviews_title USING GIN (search_vector)',
+    'CREATE INDEX reviews_title_name_trgm_idx '
+    'ON reviews_title USING GIN (name gin_trgm_ops)',
+)
+
+POSTGRES_BACKWARD = (
+    'DROP INDEX reviews_title_name_trgm_idx',
+    'DROP TRIGGER reviews_title_search_trigger ON reviews_title',
+    'DROP FUNCTION reviews_title_search_update()',
+    'ALTER TABLE reviews_title DROP COLUMN search_vector',
+)
+
+SQLITE_FORWARD = (
+    'CREATE VIRTUAL TABLE reviews_title_fts USING fts5(name, description)',
+    'INSERT INTO reviews_title_fts (rowid, name, description) '
+    'SELECT id, name, description FROM reviews_title',
+)
+
+SQLITE_BACKWARD = (
+    'DROP TABLE reviews_title_fts',
+)
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_vendor_sql({
+                'postgresql': POSTGRES_FORWARD,
+                'sqlite': SQLITE_FORWARD,
+            }),
+            run_vendor_sql({
+                'postgresql': POSTGRES_BACKWARD,
+                'sqlite': SQLITE_BACKWARD,
+            }),
+        ),
+    ]
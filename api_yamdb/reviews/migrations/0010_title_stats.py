@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:41
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    alias = schema_editor.connection.alias
+    fields = {
+        'score_{}'.format(score): Count('reviews', filter=Q(reviews__score=score))
+        for score in range(1, 11)
+    }
+    TitleStats.objects.using(alias).bulk_create(
+        TitleStats(title_id=row.pop('pk'), **row)
+        for row in Title.objects.using(alias).order_by().values('pk').annotate(**fields)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title', verbose_name='title')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='reviews with score 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='reviews with score 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='reviews with score 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='reviews with score 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='reviews with score 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='reviews with score 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='reviews with score 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='reviews with score 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='reviews with score 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='reviews with score 10')),
+            ],
+            options={
+                'verbose_name': 'Title stats',
+                'verbose_name_plural': 'Title stats',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
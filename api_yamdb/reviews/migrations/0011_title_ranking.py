@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+POSTGRES_FORWARD = (
+    # Serves ?ordering=-rating: unrated titles go last, which a backward
+    # scan of title_rating_idx (NULLS FIRST when descending) cannot give.
+    'CREATE INDEX title_rating_desc_idx ON reviews_title '
+    '(rating DESC NULLS LAST, id DESC)',
+)
+
+POSTGRES_BACKWARD = (
+    'DROP INDEX IF EXISTS title_rating_desc_idx',
+)
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='reviews.Title', verbose_name='title')),
+                ('position', models.PositiveIntegerField(unique=True, verbose_name='position in the leaderboard')),
+                ('score', models.FloatField(verbose_name='bayesian score')),
+                ('review_count', models.PositiveIntegerField(verbose_name='number of reviews')),
+            ],
+            options={
+                'verbose_name': 'Title ranking',
+                'verbose_name_plural': 'Title rankings',
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'postgresql': POSTGRES_FORWARD}),
+            run_vendor_sql({'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
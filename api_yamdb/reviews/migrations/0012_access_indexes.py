@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+# SQLite emulates NULLS LAST as "rating IS NULL, rating": only expression
+# indexes with the same leading term can serve ?ordering=rating/-rating.
+SQLITE_FORWARD = (
+    'CREATE INDEX title_rating_nulls_idx ON reviews_title '
+    '((rating IS NULL), rating, id)',
+    'CREATE INDEX title_rating_nulls_desc_idx ON reviews_title '
+    '((rating IS NULL), rating DESC, id DESC)',
+)
+
+SQLITE_BACKWARD = (
+    'DROP INDEX IF EXISTS title_rating_nulls_idx',
+    'DROP INDEX IF EXISTS title_rating_nulls_desc_idx',
+)
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'name', 'id'], name='title_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'name', 'id'], name='title_year_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', 'id'], name='review_title_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', '-pub_date', 'id'], name='comment_review_date_idx'),
+        ),
+        # The auto-created genre through table only has (title_id, genre_id)
+        # and genre_id alone; ?genre= looks up titles by genre.
+        migrations.RunSQL(
+            'CREATE INDEX title_genre_genre_title_idx ON reviews_title_genre '
+            '(genre_id, title_id)',
+            'DROP INDEX title_genre_genre_title_idx',
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD}),
+            run_vendor_sql({'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:25
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comment_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    alias = schema_editor.connection.alias
+    reviews = list(
+        Review.objects.using(alias).order_by().annotate(
+            actual=Count('comments')
+        ).filter(actual__gt=0).only('pk')
+    )
+    for review in reviews:
+        review.comment_count = review.actual
+    Review.objects.using(alias).bulk_update(
+        reviews, ['comment_count'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of comments'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
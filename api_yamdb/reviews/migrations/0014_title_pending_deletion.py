@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+# Adding a column makes Django rebuild the SQLite table, which drops the
+# expression indexes created in 0012_access_indexes; they are restored here.
+SQLITE_FORWARD = (
+    'CREATE INDEX IF NOT EXISTS title_rating_nulls_idx ON reviews_title '
+    '((rating IS NULL), rating, id)',
+    'CREATE INDEX IF NOT EXISTS title_rating_nulls_desc_idx ON reviews_title '
+    '((rating IS NULL), rating DESC, id DESC)',
+)
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='pending_deletion',
+            field=models.BooleanField(default=False, editable=False, verbose_name='hidden until deleted in background'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(pending_deletion=True), fields=['id'], name='title_pending_deletion_idx'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD}),
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_modified_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='titleranking',
+            name='position',
+            field=models.PositiveIntegerField(db_index=True, verbose_name='position in the leaderboard'),
+        ),
+    ]
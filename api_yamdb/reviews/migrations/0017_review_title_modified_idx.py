@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-19 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_titleranking_position_not_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'modified'], name='review_title_modified_idx'),
+        ),
+    ]
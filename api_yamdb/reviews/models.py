@@ -1,9 +1,11 @@
 """Модели приложения reviews."""
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Q
 from users.models import User
 
+from .search import SEARCH_FIELDS, get_title_search
 from .validators import year_validator
 
 CHOICES = ((10, 'Best'),
@@ -16,6 +18,8 @@ CHOICES = ((10, 'Best'),
            (3, 'Poor'),
            (2, 'Terrible'),
            (1, 'Worst'))
+SCORES = range(1, 11)
+SCORE_FIELD = 'score_{}'
 
 
 class Category(models.Model):
@@ -54,6 +58,38 @@ class Genre(models.Model):
         return str(self.name)
 
 
+class TitleQuerySet(models.QuerySet):
+    """Выборка произведений, обновляющая поисковый индекс.
+
+    Сигналы модели, которые обновляют индекс SQLite, не срабатывают при
+    пакетной вставке и UPDATE выборки, поэтому эти методы обновляют
+    индекс сами.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Вставляет произведения и добавляет их в поисковый индекс."""
+        objs = super().bulk_create(objs, *args, **kwargs)
+        search = get_title_search(self.db)
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        if len(pks) == len(objs):
+            search.index_many(pks)
+        else:
+            search.index_missing()
+        return objs
+
+    def update(self, **kwargs):
+        """Обновляет произведения и их записи в поисковом индексе."""
+        search = get_title_search(self.db)
+        if not search.indexed_by_app or not SEARCH_FIELDS & set(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            pks = list(self.values_list('pk', flat=True))
+            updated = super().update(**kwargs)
+            if updated:
+                search.index_many(pks)
+        return updated
+
+
 class Title(models.Model):
     """Описание модели Title."""
 
@@ -84,11 +120,56 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='title related genre',
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='sum of review scores',
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='number of reviews',
+    )
+    rating = models.FloatField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='average review score',
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='date of last modification',
+    )
+    pending_deletion = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='hidden until deleted in background',
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         """Класс Meta, хранящий дополнительную информацию о модели Title."""
 
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+            models.Index(
+                fields=['category', 'name', 'id'],
+                name='title_category_name_idx',
+            ),
+            models.Index(
+                fields=['year', 'name', 'id'], name='title_year_name_idx'
+            ),
+            models.Index(
+                fields=['id'], name='title_pending_deletion_idx',
+                condition=Q(pending_deletion=True),
+            ),
+            models.Index(
+                fields=['modified', 'id'], name='title_modified_idx'
+            ),
+        ]
         verbose_name = 'Title'
         verbose_name_plural = 'Titles'
 
@@ -97,6 +178,127 @@ class Title(models.Model):
         return self.name
 
 
+class TitleStats(models.Model):
+    """Описание модели TitleStats - распределения оценок произведения."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='title',
+    )
+    score_1 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 1'
+    )
+    score_2 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 2'
+    )
+    score_3 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 3'
+    )
+    score_4 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 4'
+    )
+    score_5 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 5'
+    )
+    score_6 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 6'
+    )
+    score_7 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 7'
+    )
+    score_8 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 8'
+    )
+    score_9 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 9'
+    )
+    score_10 = models.PositiveIntegerField(
+        default=0, verbose_name='reviews with score 10'
+    )
+
+    class Meta:
+        """Класс Meta, хранящий дополнительную информацию о модели."""
+
+        verbose_name = 'Title stats'
+        verbose_name_plural = 'Title stats'
+
+    @property
+    def scores(self):
+        """Возвращает число отзывов по каждой оценке."""
+        return {
+            score: getattr(self, SCORE_FIELD.format(score))
+            for score in SCORES
+        }
+
+    @property
+    def count(self):
+        """Возвращает общее число отзывов."""
+        return sum(self.scores.values())
+
+    @property
+    def mean(self):
+        """Возвращает среднюю оценку или None."""
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in self.scores.items()
+        ) / count
+
+    @property
+    def median(self):
+        """Возвращает медиану оценок или None."""
+        count = self.count
+        if not count:
+            return None
+        middle = ((count - 1) // 2, count // 2)
+        values = []
+        seen = 0
+        for score, number in self.scores.items():
+            values.extend(
+                score for position in middle
+                if seen <= position < seen + number
+            )
+            seen += number
+        return sum(values) / 2
+
+
+class TitleRanking(models.Model):
+    """Описание модели TitleRanking - позиции произведения в рейтинге.
+
+    Таблица пересчитывается командой refresh_leaderboard; в нее попадают
+    произведения с числом отзывов не меньше LEADERBOARD['MIN_VOTES'].
+    Позиция не уникальна на уровне базы: пересчет переписывает только
+    изменившиеся строки, и позиции соседей меняются местами в одном UPDATE.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+        verbose_name='title',
+    )
+    position = models.PositiveIntegerField(
+        db_index=True,
+        verbose_name='position in the leaderboard',
+    )
+    score = models.FloatField(verbose_name='bayesian score')
+    review_count = models.PositiveIntegerField(
+        verbose_name='number of reviews',
+    )
+
+    class Meta:
+        """Класс Meta, хранящий дополнительную информацию о модели."""
+
+        ordering = ['position']
+        verbose_name = 'Title ranking'
+        verbose_name_plural = 'Title rankings'
+
+
 class Review(models.Model):
     """Описание модели Review."""
 
@@ -116,7 +318,16 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='date of publication',
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='date of last modification',
+    )
     text = models.TextField()
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='number of comments',
+    )
     score = models.IntegerField(
         choices=CHOICES,
         validators=[
@@ -129,6 +340,18 @@ class Review(models.Model):
         """Класс Meta, хранящий дополнительную информацию о модели Review."""
 
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_date_idx',
+            ),
+            models.Index(
+                fields=['modified', 'id'], name='review_modified_idx'
+            ),
+            models.Index(
+                fields=['title', 'modified'], name='review_title_modified_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
@@ -138,6 +361,14 @@ class Review(models.Model):
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
 
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв в одной транзакции с пересчетом рейтинга."""
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Описание модели Comment."""
@@ -162,10 +393,23 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='date of publication',
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='date of last modification',
+    )
 
     class Meta:
         """Класс Meta, хранящий дополнительную информацию о модели Comment."""
 
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_date_idx',
+            ),
+            models.Index(
+                fields=['modified', 'id'], name='comment_modified_idx'
+            ),
+        ]
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
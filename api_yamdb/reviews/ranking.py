@@ -0,0 +1,96 @@
+"""Рейтинг лучших произведений."""
+
+from itertools import islice
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F, FloatField, Q, Sum
+from django.db.models.expressions import ExpressionWrapper
+from django.db.models.functions import Cast
+
+from .models import Title, TitleRanking
+
+RANKING_FIELDS = ('position', 'score', 'review_count')
+
+
+def bayesian_score(score_sum, count, mean, prior_weight):
+    """Возвращает среднюю оценку, сглаженную к средней по всем отзывам.
+
+    Средняя по всем отзывам входит в оценку с весом prior_weight отзывов,
+    поэтому единственная десятка не выводит произведение в лидеры.
+    Аргументы могут быть выражениями базы данных.
+    """
+    return (score_sum + prior_weight * mean) / (count + prior_weight)
+
+
+def ranked_titles(config, using):
+    """Возвращает выборку (pk, оценка, число отзывов) в порядке рейтинга.
+
+    В рейтинг попадают нескрытые произведения не менее чем с
+    config['MIN_VOTES'] отзывами, оценка считается в базе данных.
+    """
+    titles = Title.objects.using(using).filter(pending_deletion=False)
+    totals = titles.aggregate(
+        score_sum=Sum('score_sum'), count=Sum('review_count')
+    )
+    mean = (totals['score_sum'] or 0) / (totals['count'] or 1)
+    return titles.filter(
+        review_count__gte=max(config['MIN_VOTES'], 1)
+    ).annotate(bayesian=ExpressionWrapper(
+        bayesian_score(
+            Cast('score_sum', FloatField()), F('review_count'),
+            mean, config['PRIOR_WEIGHT'],
+        ),
+        output_field=FloatField(),
+    )).order_by('-bayesian', 'pk').values_list(
+        'pk', 'bayesian', 'review_count'
+    )
+
+
+def save_chunk(rankings, chunk, start):
+    """Записывает порцию рейтинга, начиная с позиции start.
+
+    Вставляются новые строки и обновляются только изменившиеся.
+    """
+    stored = rankings.in_bulk([pk for pk, _, _ in chunk])
+    created = []
+    changed = []
+    for position, (pk, score, count) in enumerate(chunk, start):
+        ranking = TitleRanking(
+            title_id=pk, position=position, score=score, review_count=count
+        )
+        current = stored.get(pk)
+        if current is None:
+            created.append(ranking)
+        elif (current.position, current.score, current.review_count) != (
+            position, score, count
+        ):
+            changed.append(ranking)
+    rankings.bulk_create(created)
+    rankings.bulk_update(changed, RANKING_FIELDS)
+
+
+def refresh_ranking(config=None, using=None, chunk_size=500):
+    """Пересчитывает таблицу рейтинга и возвращает число позиций.
+
+    Произведения читаются из базы порциями по chunk_size в порядке
+    рейтинга; выбывшие из рейтинга строки удаляются, а из остальных
+    перезаписываются только те, у которых изменились позиция, оценка
+    или число отзывов.
+    """
+    config = config or settings.LEADERBOARD
+    using = using or router.db_for_write(TitleRanking)
+    rankings = TitleRanking.objects.using(using)
+    position = 1
+    with transaction.atomic(using=using):
+        rankings.filter(
+            Q(title__review_count__lt=max(config['MIN_VOTES'], 1))
+            | Q(title__pending_deletion=True)
+        ).delete()
+        rows = ranked_titles(config, using).iterator(chunk_size=chunk_size)
+        chunk = list(islice(rows, chunk_size))
+        while chunk:
+            save_chunk(rankings, chunk, position)
+            position += len(chunk)
+            chunk = list(islice(rows, chunk_size))
+    return position - 1
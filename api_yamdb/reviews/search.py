@@ -0,0 +1,186 @@
+"""Полнотекстовый поиск произведений."""
+
+from django.db import connections
+from django.db.models import Q
+
+POSTGRES_QUERY = "websearch_to_tsquery('simple', %s)"
+SEARCH_FIELDS = frozenset(('name', 'description'))
+
+
+class PostgresTitleSearch:
+    """Поиск по столбцу tsvector с GIN-индексом.
+
+    Столбец search_vector заполняет триггер базы данных, поэтому индекс
+    остается актуальным при любой записи в reviews_title.
+    """
+
+    indexed_by_app = False
+
+    def __init__(self, connection):
+        """Сохраняет подключение к базе данных."""
+        self.connection = connection
+
+    def filter(self, queryset, query):
+        """Отбирает произведения по запросу и ранжирует их."""
+        return queryset.extra(
+            select={'search_rank': 'ts_rank(reviews_title.search_vector, '
+                                   + POSTGRES_QUERY + ')'},
+            select_params=(query,),
+            where=['reviews_title.search_vector @@ ' + POSTGRES_QUERY],
+            params=(query,),
+        ).order_by('-search_rank', 'id')
+
+    def index(self, title):
+        """Индекс обновляет триггер."""
+
+    def remove(self, title_id):
+        """Индекс обновляет триггер."""
+
+    def index_many(self, title_ids):
+        """Индекс обновляет триггер."""
+
+    def index_missing(self):
+        """Индекс обновляет триггер."""
+
+    def rebuild(self):
+        """Пересчитывает search_vector для всех произведений."""
+        with self.connection.cursor() as cursor:
+            cursor.execute('UPDATE reviews_title SET name = name')
+
+
+class SqliteTitleSearch:
+    """Поиск по виртуальной таблице FTS5 для локального запуска.
+
+    SQLite пересоздает таблицу при изменении схемы и теряет триггеры,
+    поэтому индекс обновляется сигналами модели Title, а пакетную вставку
+    и UPDATE выборки учитывает TitleQuerySet.
+    """
+
+    indexed_by_app = True
+    batch_size = 500
+
+    def __init__(self, connection):
+        """Сохраняет подключение к базе данных."""
+        self.connection = connection
+
+    @staticmethod
+    def to_match(query):
+        """Превращает пользовательский запрос в выражение MATCH FTS5."""
+        return ' '.join(
+            '"{}"'.format(word.replace('"', '""')) for word in query.split()
+        )
+
+    def filter(self, queryset, query):
+        """Отбирает произведения по запросу и ранжирует их."""
+        return queryset.extra(
+            select={'search_rank': '-bm25(reviews_title_fts)'},
+            tables=('reviews_title_fts',),
+            where=(
+                'reviews_title_fts.rowid = reviews_title.id',
+                'reviews_title_fts MATCH %s',
+            ),
+            params=(self.to_match(query),),
+        ).order_by('-search_rank', 'id')
+
+    def index(self, title):
+        """Добавляет или обновляет произведение в индексе."""
+        self.remove(title.pk)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO reviews_title_fts (rowid, name, description) '
+                'VALUES (%s, %s, %s)',
+                (title.pk, title.name, title.description),
+            )
+
+    def remove(self, title_id):
+        """Удаляет произведение из индекса."""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM reviews_title_fts WHERE rowid = %s', (title_id,)
+            )
+
+    def index_many(self, title_ids):
+        """Переписывает в индексе произведения с ключами title_ids."""
+        title_ids = list(title_ids)
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(title_ids), self.batch_size):
+                batch = title_ids[start:start + self.batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    'DELETE FROM reviews_title_fts WHERE rowid IN ({})'
+                    .format(placeholders), batch,
+                )
+                cursor.execute(
+                    'INSERT INTO reviews_title_fts (rowid, name, description) '
+                    'SELECT id, name, description FROM reviews_title '
+                    'WHERE id IN ({})'.format(placeholders), batch,
+                )
+
+    def index_missing(self):
+        """Добавляет в индекс произведения, которых в нем нет."""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO reviews_title_fts (rowid, name, description) '
+                'SELECT id, name, description FROM reviews_title WHERE id '
+                'NOT IN (SELECT rowid FROM reviews_title_fts)'
+            )
+
+    def rebuild(self):
+        """Заполняет индекс заново по всем произведениям."""
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_title_fts')
+            cursor.execute(
+                'INSERT INTO reviews_title_fts (rowid, name, description) '
+                'SELECT id, name, description FROM reviews_title'
+            )
+
+
+class FallbackTitleSearch:
+    """Поиск подстрокой для баз без полнотекстового индекса."""
+
+    indexed_by_app = False
+
+    def __init__(self, connection):
+        """Сохраняет подключение к базе данных."""
+        self.connection = connection
+
+    def filter(self, queryset, query):
+        """Отбирает произведения, содержащие все слова запроса."""
+        for word in query.split():
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+
+    def index(self, title):
+        """Индекса нет."""
+
+    def remove(self, title_id):
+        """Индекса нет."""
+
+    def index_many(self, title_ids):
+        """Индекса нет."""
+
+    def index_missing(self):
+        """Индекса нет."""
+
+    def rebuild(self):
+        """Индекса нет."""
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresTitleSearch,
+    'sqlite': SqliteTitleSearch,
+}
+
+
+def get_title_search(using):
+    """Возвращает поиск для базы данных с псевдонимом using."""
+    connection = connections[using]
+    backend = SEARCH_BACKENDS.get(connection.vendor, FallbackTitleSearch)
+    return backend(connection)
+
+
+def search_titles(queryset, query):
+    """Отбирает произведения по запросу, самые релевантные первыми."""
+    return get_title_search(queryset.db).filter(queryset, query)
@@ -0,0 +1,222 @@
+"""Сигналы приложения reviews."""
+
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import ExpressionWrapper
+from django.db.models.functions import Cast, NullIf
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import User
+
+from .models import Category, Comment, Genre, Review, Title, TitleStats
+from .search import get_title_search
+from .stats import shift_score_count
+
+
+def shift_titles_rating(titles, score_delta, count_delta):
+    """Атомарно сдвигает сумму оценок, число отзывов и рейтинг выборки.
+
+    Все значения считаются в одном UPDATE от текущих значений строки,
+    поэтому параллельные отзывы к одному произведению не теряются.
+    Сдвиги могут быть выражениями, например подзапросами по OuterRef.
+    Время изменения Title служит меткой изменения состава и оценок его
+    отзывов; правка текста отметит только сам отзыв.
+    """
+    new_sum = F('score_sum') + score_delta
+    new_count = F('review_count') + count_delta
+    titles.update(
+        score_sum=new_sum,
+        review_count=new_count,
+        rating=ExpressionWrapper(
+            Cast(new_sum, FloatField()) / NullIf(new_count, 0),
+            output_field=FloatField(),
+        ),
+        modified=timezone.now(),
+    )
+
+
+def shift_title_rating(title_id, score_delta, count_delta, using=None):
+    """Атомарно сдвигает сумму оценок, число отзывов и рейтинг Title."""
+    shift_titles_rating(
+        Title.objects.using(using).filter(pk=title_id),
+        score_delta,
+        count_delta,
+    )
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, using, **kwargs):
+    """Запоминает произведение и оценку отзыва до сохранения."""
+    instance._previous_score = None
+    if instance.pk is not None:
+        instance._previous_score = (
+            Review.objects.using(using).select_for_update()
+            .filter(pk=instance.pk)
+            .values_list('title_id', 'score')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def apply_saved_score(sender, instance, using, **kwargs):
+    """Учитывает созданный или измененный отзыв в рейтинге и статистике."""
+    previous = getattr(instance, '_previous_score', None)
+    if previous is None:
+        shift_title_rating(instance.title_id, instance.score, 1, using)
+        shift_score_count(instance.title_id, instance.score, 1, using)
+        return
+    title_id, score = previous
+    if title_id != instance.title_id:
+        shift_title_rating(title_id, -score, -1, using)
+        shift_title_rating(instance.title_id, instance.score, 1, using)
+    elif score != instance.score:
+        shift_title_rating(title_id, instance.score - score, 0, using)
+    if (title_id, score) != (instance.title_id, instance.score):
+        shift_score_count(title_id, score, -1, using)
+        shift_score_count(instance.title_id, instance.score, 1, using)
+
+
+@receiver(post_delete, sender=Review)
+def apply_deleted_score(sender, instance, using, **kwargs):
+    """Исключает удаленный отзыв из рейтинга, в том числе при каскаде."""
+    shift_title_rating(instance.title_id, -instance.score, -1, using)
+    shift_score_count(instance.title_id, instance.score, -1, using)
+
+
+def shift_comment_count(review_id, delta, using=None):
+    """Атомарно сдвигает число комментариев отзыва.
+
+    Время изменения отзыва служит меткой изменения его комментариев, а
+    время изменения произведения - меткой списка отзывов, в котором
+    выводится это число.
+    """
+    now = timezone.now()
+    Review.objects.using(using).filter(pk=review_id).update(
+        comment_count=F('comment_count') + delta,
+        modified=now,
+    )
+    Title.objects.using(using).filter(reviews=review_id).update(modified=now)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_previous_review(sender, instance, using, **kwargs):
+    """Запоминает отзыв изменяемого комментария."""
+    instance._previous_review_id = None
+    if not instance._state.adding:
+        instance._previous_review_id = (
+            Comment.objects.using(using).filter(pk=instance.pk)
+            .values_list('review_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def apply_saved_comment(sender, instance, created, using, **kwargs):
+    """Учитывает созданный, измененный или перенесенный комментарий."""
+    previous = getattr(instance, '_previous_review_id', None)
+    if created:
+        shift_comment_count(instance.review_id, 1, using)
+    elif previous is not None and previous != instance.review_id:
+        shift_comment_count(previous, -1, using)
+        shift_comment_count(instance.review_id, 1, using)
+    else:
+        shift_comment_count(instance.review_id, 0, using)
+
+
+@receiver(post_delete, sender=Comment)
+def apply_deleted_comment(sender, instance, using, **kwargs):
+    """Исключает удаленный комментарий из числа, в том числе при каскаде."""
+    shift_comment_count(instance.review_id, -1, using)
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, using, **kwargs):
+    """Создает пустую статистику оценок нового произведения."""
+    if created:
+        TitleStats.objects.using(using).create(title=instance)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, using, **kwargs):
+    """Обновляет произведение в поисковом индексе."""
+    get_title_search(using).index(instance)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, using, **kwargs):
+    """Удаляет произведение из поискового индекса."""
+    get_title_search(using).remove(instance.pk)
+
+
+def touch_titles(instance, using):
+    """Отмечает изменение произведений категории или жанра.
+
+    Произведения выводят slug своих категорий и жанров, поэтому
+    инкрементальная выгрузка должна получить их заново.
+    """
+    lookup = 'category' if isinstance(instance, Category) else 'genre'
+    Title.objects.using(using).filter(**{lookup: instance.pk}).update(
+        modified=timezone.now()
+    )
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Genre)
+def remember_previous_slug(sender, instance, using, **kwargs):
+    """Запоминает slug категории или жанра до сохранения."""
+    instance._previous_slug = None
+    if not instance._state.adding:
+        instance._previous_slug = (
+            sender.objects.using(using).filter(pk=instance.pk)
+            .values_list('slug', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def touch_renamed_slug_titles(sender, instance, using, **kwargs):
+    """Отмечает произведения, если у их категории или жанра сменился slug."""
+    previous = getattr(instance, '_previous_slug', None)
+    if previous is not None and previous != instance.slug:
+        touch_titles(instance, using)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_deleted_slug_titles(sender, instance, using, **kwargs):
+    """Отмечает произведения удаляемой категории или жанра."""
+    touch_titles(instance, using)
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(sender, instance, using, **kwargs):
+    """Запоминает имя пользователя до сохранения."""
+    instance._previous_username = None
+    if not instance._state.adding:
+        instance._previous_username = (
+            User.objects.using(using).filter(pk=instance.pk)
+            .values_list('username', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=User)
+def touch_renamed_author_posts(sender, instance, using, **kwargs):
+    """Отмечает отзывы и комментарии пользователя, сменившего имя.
+
+    Отзывы и комментарии выводят имя автора, поэтому отмечаются они сами
+    и отзывы с комментариями пользователя, чье время изменения служит
+    меткой списка комментариев.
+    """
+    previous = getattr(instance, '_previous_username', None)
+    if previous is None or previous == instance.username:
+        return
+    now = timezone.now()
+    Comment.objects.using(using).filter(author=instance.pk).update(
+        modified=now
+    )
+    Review.objects.using(using).filter(
+        Q(author=instance.pk) | Q(comments__author=instance.pk)
+    ).update(modified=now)
@@ -0,0 +1,84 @@
+"""Распределения оценок произведений."""
+
+from django.db.models import Count, F, Q
+
+from .models import SCORE_FIELD, SCORES, Review, Title, TitleStats
+
+SCORE_FIELDS = tuple(SCORE_FIELD.format(score) for score in SCORES)
+
+
+def shift_score_count(title_id, score, delta, using=None):
+    """Атомарно сдвигает число отзывов произведения с данной оценкой.
+
+    Строка статистики создается при первом добавлении отзыва, если
+    произведение было добавлено в обход сигналов. При удалении строка не
+    создается: она может удаляться каскадом вместе с произведением.
+    """
+    field = SCORE_FIELD.format(score)
+    stats = TitleStats.objects.using(using).filter(title_id=title_id)
+    if not stats.update(**{field: F(field) + delta}) and delta > 0:
+        TitleStats.objects.using(using).get_or_create(title_id=title_id)
+        stats.update(**{field: F(field) + delta})
+
+
+def actual_stats(using=None, first=None, last=None):
+    """Возвращает распределения оценок, посчитанные по отзывам.
+
+    first и last ограничивают диапазон первичных ключей произведений.
+    """
+    reviews = Review.objects.using(using).order_by()
+    if first is not None:
+        reviews = reviews.filter(title_id__gte=first, title_id__lte=last)
+    rows = reviews.values('title_id').annotate(
+        **{
+            field: Count('pk', filter=Q(score=score))
+            for field, score in zip(SCORE_FIELDS, SCORES)
+        }
+    )
+    return {
+        row['title_id']: tuple(row[field] for field in SCORE_FIELDS)
+        for row in rows
+    }
+
+
+def find_stats_drift(using=None, chunk_size=1000):
+    """Возвращает исправленные строки статистики, расходящиеся с отзывами.
+
+    Произведения сверяются порциями по chunk_size первичных ключей, поэтому
+    в памяти одновременно находятся распределения только одной порции.
+    """
+    titles = Title.objects.using(using).order_by('pk').values_list(
+        'pk', flat=True
+    )
+    empty = (0,) * len(SCORE_FIELDS)
+    drifted = []
+    pks = list(titles[:chunk_size])
+    while pks:
+        first, last = pks[0], pks[-1]
+        actual = actual_stats(using, first, last)
+        stored = {
+            row[0]: row[1:]
+            for row in TitleStats.objects.using(using).filter(
+                title_id__gte=first, title_id__lte=last
+            ).values_list('title_id', *SCORE_FIELDS)
+        }
+        drifted.extend(
+            TitleStats(
+                title_id=title_id,
+                **dict(zip(SCORE_FIELDS, actual.get(title_id, empty))),
+            )
+            for title_id in pks
+            if stored.get(title_id) != actual.get(title_id, empty)
+        )
+        pks = list(titles.filter(pk__gt=last)[:chunk_size])
+    return drifted
+
+
+def save_stats(rows, using=None, batch_size=500):
+    """Заменяет строки статистики переданными."""
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        TitleStats.objects.using(using).filter(
+            title_id__in=[row.title_id for row in batch]
+        ).delete()
+        TitleStats.objects.using(using).bulk_create(batch)
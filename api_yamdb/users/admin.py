@@ -1,8 +1,9 @@
 """Настройки админ-панели приложения Users."""
 
+from api.pagination import EstimatedCountPaginator
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -21,6 +22,27 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ('username',)
     list_filter = ('date_joined',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(User, UserAdmin)
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Описание для очереди писем."""
+
+    list_display = (
+        'subject',
+        'recipient',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+    search_fields = ('recipient',)
+    list_filter = ('status',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-18 23:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_pending_deletion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_username_code_idx',
+        ),
+    ]
@@ -2,6 +2,8 @@
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.crypto import get_random_string
 from django.utils.translation import gettext_lazy as _
 
@@ -38,3 +40,65 @@ class User(AbstractUser):
         max_length=32, default=get_random
     )
     email = models.EmailField(_('email address'), blank=False, unique=True)
+    pending_deletion = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='hidden until deleted in background',
+    )
+
+    class Meta(AbstractUser.Meta):
+        """Класс Meta, хранящий дополнительную информацию о модели User."""
+
+        indexes = [
+            models.Index(
+                fields=['id'], name='user_pending_deletion_idx',
+                condition=Q(pending_deletion=True),
+            ),
+        ]
+
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+OUTBOX_STATUSES = (
+    (PENDING, 'pending'),
+    (SENT, 'sent'),
+    (FAILED, 'failed'),
+)
+
+
+class OutboxEmail(models.Model):
+    """Описание письма, ожидающего отправки воркером."""
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.EmailField()
+    recipient = models.EmailField()
+    status = models.CharField(
+        max_length=7,
+        choices=OUTBOX_STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        """Класс Meta, хранящий дополнительную информацию о модели."""
+
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_next_idx',
+            ),
+        ]
+        verbose_name = 'Outbox email'
+        verbose_name_plural = 'Outbox emails'
+
+    def __str__(self):
+        """Возвращает тему и адрес письма."""
+        return '{} -> {}'.format(self.subject, self.recipient)
@@ -0,0 +1,101 @@
+"""Очередь исходящих писем приложения users."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FAILED, PENDING, SENT, OutboxEmail
+
+
+def enqueue_email(subject, body, recipient):
+    """Ставит письмо в очередь в текущей транзакции."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient=recipient,
+    )
+
+
+def claim_batch(size, lease):
+    """Забирает пачку готовых к отправке писем на время lease.
+
+    Строки блокируются с SKIP LOCKED, а срок следующей попытки
+    сдвигается, поэтому параллельные воркеры не берут одни и те же
+    письма.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:size]
+        )
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + timedelta(seconds=lease))
+    return emails
+
+
+def mark_failed(email, error, config):
+    """Учитывает неудачную попытку и назначает следующую с отсрочкой."""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= config['MAX_ATTEMPTS']:
+        email.status = FAILED
+    else:
+        delay = min(
+            config['BACKOFF'] * 2 ** (email.attempts - 1),
+            config['MAX_BACKOFF'],
+        )
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    email.save(update_fields=(
+        'attempts', 'last_error', 'status', 'next_attempt_at'
+    ))
+
+
+def send_email(email, connection, config):
+    """Отправляет письмо и возвращает True, если оно отправлено."""
+    message = EmailMessage(
+        email.subject, email.body, email.from_email,
+        [email.recipient], connection=connection,
+    )
+    try:
+        message.send()
+    except Exception as error:
+        mark_failed(email, error, config)
+        return False
+    email.status = SENT
+    email.sent_at = timezone.now()
+    email.save(update_fields=('status', 'sent_at'))
+    return True
+
+
+def send_batch(config=None):
+    """Отправляет одну пачку писем и возвращает число отправленных.
+
+    Если почтовый сервер недоступен, попытка засчитывается каждому
+    забранному письму, поэтому отсрочка и MAX_ATTEMPTS действуют и тогда.
+    """
+    config = config or settings.OUTBOX
+    emails = claim_batch(config['BATCH_SIZE'], config['LEASE'])
+    if not emails:
+        return 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error, config)
+        return 0
+    try:
+        return sum(send_email(email, connection, config) for email in emails)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            # Письма уже отправлены и отмечены, сбой закрытия не важен.
+            pass
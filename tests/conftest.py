@@ -1,9 +1,88 @@
+import os
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_blocker):
+    from django.db import OperationalError, connection
+
+    with django_db_blocker.unblock():
+        try:
+            connection.ensure_connection()
+        except OperationalError as error:
+            # A broken CI database must not pass with nothing run.
+            if os.getenv('SKIP_DB_TESTS') != 'True':
+                pytest.fail(
+                    f'База данных недоступна: {error}. Тесты без базы '
+                    'запускаются с SKIP_DB_TESTS=True.'
+                )
+            pytest.skip(f'База данных недоступна: {error}')
+        finally:
+            connection.close()
+
+
+@pytest.fixture
+def api_client():
+    from api.cache import response_cache
+    from rest_framework.test import APIClient
+
+    response_cache.backend.clear()
+    return APIClient()
+
+
+@pytest.fixture
+def catalog(db):
+    from reviews.models import Category, Genre, Title
+
+    def create(size):
+        category = Category.objects.create(name='Фильмы', slug='movie')
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(3)
+        ]
+        titles = []
+        for i in range(size):
+            title = Title.objects.create(
+                name=f'Произведение {i}', year=2000, category=category
+            )
+            title.genre.set(genres[:i % 3 + 1])
+            titles.append(title)
+        return titles
+
+    return create
+
+
+@pytest.fixture
+def discussion(db, catalog):
+    from reviews.models import Comment, Review
+    from users.models import User
+
+    def create(size):
+        title = catalog(1)[0]
+        authors = [
+            User.objects.create(username=f'author{i}', email=f'a{i}@ya.ru')
+            for i in range(size)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=i % 10 + 1
+            )
+            for i, author in enumerate(authors)
+        ]
+        for author in authors:
+            Comment.objects.create(
+                review=reviews[0], author=author, text='Комментарий'
+            )
+        return title, reviews[0]
+
+    return create
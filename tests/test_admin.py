@@ -0,0 +1,93 @@
+import pytest
+
+CHANGELISTS = (
+    '/admin/reviews/title/',
+    '/admin/reviews/review/',
+    '/admin/users/user/',
+)
+
+
+@pytest.fixture
+def admin_client(db, client):
+    from users.models import User
+
+    user = User.objects.create_superuser(
+        username='superuser', email='superuser@ya.ru', password='password'
+    )
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def rows(db):
+    from reviews.models import Category, Genre, Review, Title
+    from users.models import User
+
+    created = []
+
+    def create(size):
+        for _ in range(size):
+            i = len(created)
+            category = Category.objects.create(
+                name=f'Категория {i}', slug=f'category-{i}'
+            )
+            genre = Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            title = Title.objects.create(
+                name=f'Произведение {i}', year=2000, category=category
+            )
+            title.genre.set([genre])
+            author = User.objects.create(
+                username=f'author{i}', email=f'author{i}@ya.ru'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+            created.append(title)
+
+    return create
+
+
+def changelist_queries(client, url):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что страница `{url}` открывается'
+    )
+    return len(queries.captured_queries)
+
+
+@pytest.mark.django_db
+class TestAdminChangelists:
+
+    @pytest.mark.parametrize('url', CHANGELISTS)
+    def test_queries_do_not_grow_with_rows(self, admin_client, rows, url):
+        rows(3)
+        changelist_queries(admin_client, url)
+        few = changelist_queries(admin_client, url)
+        rows(30)
+        many = changelist_queries(admin_client, url)
+        assert many == few, (
+            f'Проверьте, что число запросов страницы `{url}` не растет '
+            f'с числом строк: {few} и {many}'
+        )
+
+    def test_estimated_count(self, rows, settings):
+        from api.pagination import EstimatedCountPaginator
+        from django.db import connection
+        from reviews.models import Title
+
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            pytest.skip('Оценка доступна только для SQLite и PostgreSQL')
+        rows(5)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        settings.ADMIN_ESTIMATED_COUNT = {'THRESHOLD': 1}
+        paginator = EstimatedCountPaginator(Title.objects.all(), 100)
+        assert paginator.count == 5
+        filtered = EstimatedCountPaginator(
+            Title.objects.filter(year=1), 100
+        )
+        assert filtered.count == 0
@@ -0,0 +1,116 @@
+import pytest
+
+
+def user_queries(queries):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.fixture
+def user_cache(settings):
+    from api.authentication import CachedJWTAuthentication
+    from django.core.cache import cache
+
+    settings.AUTH_USER_CACHE = dict(settings.AUTH_USER_CACHE, ENABLED=True)
+    cache.clear()
+    CachedJWTAuthentication.get_cache().clear()
+    return settings.AUTH_USER_CACHE
+
+
+def token_client(api_client, user):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return api_client
+
+
+@pytest.mark.django_db
+class TestConfirmUser:
+
+    def test_token_flow(self, api_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from users.models import User
+
+        user = User.objects.create(username='reader', email='r@ya.ru')
+        url = '/api/v1/auth/token/'
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(url, {
+                'username': 'reader',
+                'confirmation_code': user.confirmation_code,
+            })
+        assert response.status_code == 200
+        assert 'token' in response.json()
+        assert len(user_queries(queries)) == 1, (
+            'Проверьте, что пользователь загружается одним запросом'
+        )
+        assert api_client.post(url, {
+            'username': 'reader', 'confirmation_code': 'wrong',
+        }).status_code == 400
+        assert api_client.post(url, {
+            'username': 'nobody', 'confirmation_code': 'wrong',
+        }).status_code == 404
+
+
+@pytest.mark.django_db
+class TestUserCache:
+
+    def test_disabled_by_default(self, api_client):
+        from django.conf import settings
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from users.models import User
+
+        assert not settings.AUTH_USER_CACHE['ENABLED'], (
+            'Проверьте, что кэш пользователей включается явно'
+        )
+        client = token_client(api_client, User.objects.create(
+            username='reader', email='r@ya.ru'
+        ))
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/v1/users/me/')
+            client.get('/api/v1/users/me/')
+        assert len(user_queries(queries)) == 2
+
+    def test_cached_user_skips_query(self, user_cache, api_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from users.models import User
+
+        client = token_client(api_client, User.objects.create(
+            username='reader', email='r@ya.ru'
+        ))
+        assert client.get('/api/v1/users/me/').status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == 'reader'
+        assert user_queries(queries) == [], (
+            'Проверьте, что пользователь токена берется из кэша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_role_change_invalidates(self, user_cache, api_client):
+        from users.models import ADMIN, User
+
+        user = User.objects.create(username='reader', email='r@ya.ru')
+        client = token_client(api_client, user)
+        assert client.get('/api/v1/users/').status_code == 403
+        user.role = ADMIN
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сразу сбрасывает кэш пользователя'
+        )
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 401
+
+    def test_local_version_store_warns(self, user_cache):
+        from api.checks import check_shared_cache
+
+        assert 'api.W003' in [
+            warning.id for warning in check_shared_cache(None)
+        ]
@@ -0,0 +1,176 @@
+import pytest
+
+
+@pytest.fixture
+def admin_api_client(db, api_client):
+    from users.models import User
+
+    admin = User.objects.create(
+        username='bulk-admin', email='bulk-admin@ya.ru', role='admin'
+    )
+    api_client.force_authenticate(admin)
+    return api_client
+
+
+@pytest.fixture
+def genres(db):
+    from reviews.models import Category, Genre
+
+    Category.objects.create(name='Фильмы', slug='movie')
+    return [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(2)
+    ]
+
+
+@pytest.mark.django_db
+class TestBulkCreate:
+
+    def test_admin_only(self, api_client):
+        from users.models import User
+
+        url = '/api/v1/genres/bulk/'
+        assert api_client.post(url, [], format='json').status_code == 401
+        api_client.force_authenticate(User.objects.create(
+            username='user', email='user@ya.ru'
+        ))
+        assert api_client.post(url, [], format='json').status_code == 403
+
+    def test_item_errors_by_index(self, admin_api_client, genres):
+        from reviews.models import Genre
+
+        response = admin_api_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'slug': 'no-name'},
+            {'name': 'Повтор', 'slug': 'drama'},
+            {'name': 'Существует', 'slug': 'genre-0'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ], format='json')
+        assert response.status_code == 201
+        data = response.json()
+        assert [genre['slug'] for genre in data['created']] == [
+            'drama', 'comedy'
+        ]
+        assert [error['index'] for error in data['errors']] == [1, 2, 3], (
+            'Проверьте, что ошибки возвращаются по индексам элементов, '
+            'а остальные элементы создаются'
+        )
+        assert 'name' in data['errors'][0]['errors']
+        assert 'slug' in data['errors'][1]['errors']
+        assert 'slug' in data['errors'][2]['errors']
+        assert 'updated' not in data
+        assert Genre.objects.count() == 4
+
+    def test_all_rejected(self, admin_api_client, genres):
+        from reviews.models import Genre
+
+        response = admin_api_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Существует', 'slug': 'genre-1'},
+        ], format='json')
+        assert response.status_code == 400
+        assert Genre.objects.count() == 2
+
+    def test_limits(self, admin_api_client, settings):
+        settings.BULK_CREATE = {'MAX_ITEMS': 2}
+        url = '/api/v1/categories/bulk/'
+        assert admin_api_client.post(
+            url, {'name': 'Одна', 'slug': 'one'}, format='json'
+        ).status_code == 400
+        assert admin_api_client.post(url, [
+            {'name': str(i), 'slug': f'c-{i}'} for i in range(3)
+        ], format='json').status_code == 400
+
+    def test_titles_resolve_slugs(self, admin_api_client, genres):
+        from reviews.models import Title
+
+        response = admin_api_client.post('/api/v1/titles/bulk/', [
+            {
+                'name': 'Фильм', 'year': 2000, 'category': 'movie',
+                'genre': ['genre-0', 'genre-1', 'genre-0'],
+            },
+            {
+                'name': 'Без жанра', 'year': 2000, 'category': 'movie',
+                'genre': ['missing'],
+            },
+            {
+                'name': 'Без категории', 'year': 2000, 'category': 'missing',
+                'genre': ['genre-0'],
+            },
+        ], format='json')
+        assert response.status_code == 201
+        data = response.json()
+        assert [error['index'] for error in data['errors']] == [1, 2]
+        assert 'genre' in data['errors'][0]['errors']
+        assert 'category' in data['errors'][1]['errors']
+        title = Title.objects.get()
+        assert data['created'][0]['id'] == title.pk
+        assert title.category.slug == 'movie'
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'genre-0', 'genre-1'
+        ], 'Проверьте, что жанры произведений находятся по slug'
+
+    def test_batch_is_all_or_nothing(self, admin_api_client, genres,
+                                     monkeypatch):
+        from api.bulk import TitleBulkCreator
+        from django.db import IntegrityError
+        from reviews.models import Title
+
+        create_titles = TitleBulkCreator.create_titles
+
+        def conflict(self, titles):
+            create_titles(self, titles)
+            raise IntegrityError('concurrent write')
+
+        monkeypatch.setattr(TitleBulkCreator, 'create_titles', conflict)
+        response = admin_api_client.post('/api/v1/titles/bulk/', [
+            {
+                'name': f'Фильм {i}', 'year': 2000, 'category': 'movie',
+                'genre': ['genre-0'],
+            }
+            for i in range(3)
+        ], format='json')
+        assert response.status_code == 409
+        assert not Title.objects.exists(), (
+            'Проверьте, что ошибка базы откатывает весь пакет'
+        )
+
+
+@pytest.mark.django_db
+class TestBulkUpsert:
+
+    def test_upsert_by_slug(self, admin_api_client, genres):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Genre
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_api_client.put('/api/v1/genres/bulk/', [
+                {'name': 'Новое имя', 'slug': 'genre-0'},
+                {'name': 'Драма', 'slug': 'drama'},
+                {'name': 'Повтор', 'slug': 'drama'},
+            ], format='json')
+        assert response.status_code == 201
+        data = response.json()
+        assert data['created'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert data['updated'] == [{'name': 'Новое имя', 'slug': 'genre-0'}]
+        assert [error['index'] for error in data['errors']] == [2]
+        assert dict(Genre.objects.values_list('slug', 'name')) == {
+            'genre-0': 'Новое имя', 'genre-1': 'Жанр 1', 'drama': 'Драма',
+        }, 'Проверьте, что PUT обновляет объекты с существующим slug'
+        assert len(queries.captured_queries) <= 8
+
+    def test_update_only(self, admin_api_client, genres):
+        from reviews.models import Category
+
+        response = admin_api_client.put('/api/v1/categories/bulk/', [
+            {'name': 'Кино', 'slug': 'movie'},
+        ], format='json')
+        assert response.status_code == 200
+        assert response.json()['created'] == []
+        assert Category.objects.get().name == 'Кино'
+
+    def test_titles_have_no_natural_key(self, admin_api_client, genres):
+        response = admin_api_client.put(
+            '/api/v1/titles/bulk/', [], format='json'
+        )
+        assert response.status_code == 405
@@ -0,0 +1,178 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def response_cache(settings):
+    from api.cache import response_cache
+    from django.core.cache import cache
+
+    settings.RESPONSE_CACHE = dict(settings.RESPONSE_CACHE, ENABLED=True)
+    cache.clear()
+    response_cache.backend.clear()
+    return response_cache
+
+
+def anonymous_request(path='/api/v1/genres/'):
+    from django.contrib.auth.models import AnonymousUser
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get(path))
+    request.user = AnonymousUser()
+    return request
+
+
+class TestLRUBackend:
+
+    def test_evicts_least_recently_used(self):
+        from api.cache import LRUBackend
+
+        backend = LRUBackend(2)
+        backend.set('a', 1, 60)
+        backend.set('b', 2, 60)
+        assert backend.get('a') == 1
+        backend.set('c', 3, 60)
+        assert backend.get('b') is None, (
+            'Проверьте, что при переполнении вытесняется запись, '
+            'к которой дольше всего не обращались'
+        )
+        assert (backend.get('a'), backend.get('c')) == (1, 3)
+
+    def test_expired_entry_is_dropped(self):
+        from api.cache import LRUBackend
+
+        backend = LRUBackend(2)
+        backend.set('a', 1, -1)
+        assert backend.get('a') is None
+
+
+class TestSettings:
+
+    def test_check_warns_about_local_versions(self, settings):
+        from api.checks import check_shared_cache
+
+        settings.RESPONSE_CACHE = dict(settings.RESPONSE_CACHE, ENABLED=True)
+        assert [
+            warning.id for warning in check_shared_cache(None)
+        ] == ['api.W001'], (
+            'Проверьте, что кэш ответов с версиями в памяти процесса '
+            'вызывает предупреждение'
+        )
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/tmp/yamdb-cache',
+        }}
+        assert check_shared_cache(None) == []
+
+    def test_disabled_cache_computes_every_time(self, settings):
+        from api.cache import response_cache
+        from rest_framework.response import Response
+
+        settings.RESPONSE_CACHE = dict(settings.RESPONSE_CACHE, ENABLED=False)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return Response([])
+
+        for _ in range(2):
+            response_cache.fetch(anonymous_request(), ('genres',), compute)
+        assert len(calls) == 2
+
+
+class TestSingleFlight:
+
+    def fetch_concurrently(self, response_cache, threads=5):
+        from rest_framework.response import Response
+
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return Response(['computed'])
+
+        results = []
+
+        def fetch():
+            results.append(response_cache.fetch(
+                anonymous_request(), ('genres',), compute
+            ).data)
+
+        workers = [threading.Thread(target=fetch) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return calls, results
+
+    def test_one_computation_per_key(self, response_cache):
+        calls, results = self.fetch_concurrently(response_cache)
+        assert len(calls) == 1, (
+            'Проверьте, что одновременные промахи по одному ключу '
+            'вычисляют ответ один раз'
+        )
+        assert results == [['computed']] * 5
+
+    def test_waits_for_peer_process(self, response_cache, settings):
+        from api.cache import ResponseCache
+        from rest_framework.response import Response
+
+        settings.RESPONSE_CACHE = dict(
+            settings.RESPONSE_CACHE, BACKEND='shared'
+        )
+        shared = ResponseCache()
+        request = anonymous_request()
+        key = shared.make_key(request, ('genres',))
+        assert shared.backend.claim(key, 5)
+        threading.Timer(
+            0.1, shared.backend.set, (key, ['from peer'], 60)
+        ).start()
+        response = shared.fetch(
+            request, ('genres',), lambda: Response(['computed'])
+        )
+        assert response.data == ['from peer'], (
+            'Проверьте, что воркер ждет ответ, который вычисляет '
+            'захвативший ключ процесс'
+        )
+        assert response['X-Cache'] == 'HIT'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestInvalidation:
+
+    def test_write_bumps_version(self, response_cache, api_client):
+        from reviews.models import Genre
+
+        Genre.objects.create(name='Драма', slug='drama')
+        first = api_client.get('/api/v1/genres/')
+        assert first['X-Cache'] == 'MISS'
+        assert api_client.get('/api/v1/genres/')['X-Cache'] == 'HIT'
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = api_client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что запись в ресурс сбрасывает кэшированные ответы'
+        )
+        assert response.json()['count'] == 2
+
+    def test_related_resource_bumps_titles(self, response_cache, api_client):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильмы', slug='movie')
+        Title.objects.create(name='Фильм', year=2000, category=category)
+        api_client.get('/api/v1/titles/')
+        category.name = 'Кино'
+        category.save()
+        response = api_client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['results'][0]['category']['name'] == 'Кино'
+
+    def test_command_bump_is_seen(self, response_cache, api_client):
+        from api.cache import resource_versions
+
+        api_client.get('/api/v1/genres/')
+        resource_versions.bump('genres')
+        assert api_client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
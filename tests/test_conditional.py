@@ -0,0 +1,93 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalRead:
+
+    def test_titles_if_none_match(self, api_client, catalog):
+        catalog(2)
+        first = api_client.get('/api/v1/titles/')
+        response = api_client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        assert response.status_code == 304, (
+            'Проверьте, что совпавший ETag возвращает 304'
+        )
+        assert not response.content
+        assert api_client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH='"other"'
+        ).status_code == 200
+
+    @pytest.mark.parametrize('suffix', ('', 'comments/'))
+    def test_if_modified_since(self, api_client, discussion, suffix):
+        title, review = discussion(2)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        if suffix:
+            url = f'{url}{review.pk}/{suffix}'
+        first = api_client.get(url)
+        assert first.status_code == 200
+        response = api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        assert response.status_code == 304, (
+            'Проверьте, что If-Modified-Since возвращает 304'
+        )
+        assert response['ETag'] == first['ETag']
+        assert api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 2015 00:00:00 GMT'
+        ).status_code == 200
+
+    def test_review_text_edit(self, api_client, discussion):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        title, review = discussion(2)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = api_client.get(url)['ETag']
+        review.text = 'Новый текст'
+        with CaptureQueriesContext(connection) as queries:
+            review.save()
+        assert not [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ], 'Проверьте, что правка текста отзыва не обновляет произведение'
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что правка текста отзыва меняет ETag списка'
+        )
+        assert 'Новый текст' in response.content.decode()
+
+    def test_author_rename(self, api_client, discussion):
+        title, review = discussion(2)
+        urls = (
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+        etags = [api_client.get(url)['ETag'] for url in urls]
+        author = review.comments.exclude(author=review.author).get().author
+        author.username = 'renamed'
+        author.save()
+        for url, etag in zip(urls, etags):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                'Проверьте, что смена имени автора меняет ETag списка'
+            )
+            assert 'renamed' in response.content.decode()
+        author.email = 'new@ya.ru'
+        author.save()
+        assert api_client.get(
+            urls[1], HTTP_IF_NONE_MATCH=api_client.get(urls[1])['ETag']
+        ).status_code == 304
+
+    def test_new_comment(self, api_client, discussion):
+        from reviews.models import Comment
+
+        title, review = discussion(1)
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        etag = api_client.get(url)['ETag']
+        Comment.objects.create(
+            review=review, author=review.author, text='Еще комментарий'
+        )
+        assert api_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 200
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+
+def counts():
+    from reviews.models import Review, Title
+
+    return (
+        dict(Title.objects.values_list('pk', 'review_count')),
+        dict(Review.objects.values_list('pk', 'comment_count')),
+    )
+
+
+def actual_counts():
+    from django.db.models import Count
+    from reviews.models import Review, Title
+
+    return (
+        dict(Title.objects.order_by().annotate(
+            actual=Count('reviews')).values_list('pk', 'actual')),
+        dict(Review.objects.order_by().annotate(
+            actual=Count('comments')).values_list('pk', 'actual')),
+    )
+
+
+@pytest.mark.django_db
+class TestCounters:
+
+    def test_create_and_delete(self, discussion):
+        from reviews.models import Comment
+
+        title, review = discussion(3)
+        assert counts() == actual_counts()
+        title.refresh_from_db()
+        review.refresh_from_db()
+        assert (title.review_count, review.comment_count) == (3, 3)
+        Comment.objects.filter(review=review).first().delete()
+        assert counts() == actual_counts()
+
+    def test_moved_comment(self, discussion):
+        from reviews.models import Review
+
+        title, review = discussion(3)
+        other = Review.objects.exclude(pk=review.pk).first()
+        comment = review.comments.first()
+        comment.review = other
+        comment.save()
+        assert counts() == actual_counts()
+
+    @pytest.mark.parametrize('target', ('user', 'review', 'title'))
+    def test_cascades(self, discussion, target):
+        title, review = discussion(3)
+        victim = {
+            'user': review.comments.first().author,
+            'review': review,
+            'title': title,
+        }[target]
+        victim.delete()
+        assert counts() == actual_counts()
+
+    def test_reconcile(self, discussion):
+        from django.core.management import call_command
+        from reviews.models import Review, Title
+
+        title, review = discussion(2)
+        Review.objects.update(comment_count=7)
+        Title.objects.update(review_count=0)
+        out = io.StringIO()
+        call_command('recalculate_ratings', stdout=out)
+        assert 'Reviews with comment count drift: 2' in out.getvalue()
+        assert counts() == actual_counts()
+
+    def test_serialized(self, api_client, discussion):
+        title, review = discussion(2)
+        response = api_client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['review_count'] == 2
+        response = api_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/'
+        )
+        assert response.json()['comment_count'] == 2
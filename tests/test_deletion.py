@@ -0,0 +1,166 @@
+import io
+
+import pytest
+
+
+def drift():
+    from django.core.management import call_command
+
+    out = io.StringIO()
+    call_command('recalculate_ratings', '--dry-run', stdout=out)
+    return [line for line in out.getvalue().splitlines() if 'drift' in line]
+
+
+def assert_consistent():
+    assert all(line.endswith('drift: 0 (not fixed)') for line in drift()), (
+        f'Счетчики разошлись с данными после удаления: {drift()}'
+    )
+
+
+@pytest.fixture
+def admin_client(db, api_client):
+    from users.models import User
+
+    admin = User.objects.create(
+        username='remover', email='remover@ya.ru', role='admin'
+    )
+    api_client.force_authenticate(admin)
+    return api_client
+
+
+@pytest.fixture
+def commented(discussion):
+    """Отзывы с комментариями к нескольким отзывам, а не только к первому."""
+    from reviews.models import Comment, Review
+
+    title, review = discussion(6)
+    for other in Review.objects.exclude(pk=review.pk):
+        Comment.objects.create(
+            review=other, author=review.author, text='Ответ'
+        )
+    return title, review
+
+
+def purge_all():
+    from api.deletion import purge_batch
+
+    batches = 0
+    while purge_batch():
+        batches += 1
+    return batches
+
+
+@pytest.mark.django_db
+class TestDeletion:
+
+    def test_title(self, admin_client, commented):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Comment, Review, TitleStats
+
+        title, _ = commented
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 204
+        assert not Review.objects.exists()
+        assert not Comment.objects.exists()
+        assert not TitleStats.objects.exists()
+        loaded = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_comment"' in query['sql']
+        ]
+        assert not loaded, (
+            'Проверьте, что комментарии удаляются без загрузки в память'
+        )
+
+    def test_review(self, commented):
+        from api.deletion import ReviewCascade
+        from reviews.models import Comment
+
+        title, review = commented
+        ReviewCascade(review).destroy()
+        assert not Comment.objects.filter(review_id=review.pk).exists()
+        title.refresh_from_db()
+        assert title.review_count == 5
+        assert_consistent()
+
+    def test_user(self, admin_client, commented):
+        from reviews.models import Comment, Review
+        from users.models import User
+
+        title, review = commented
+        author = review.author
+        response = admin_client.delete(f'/api/v1/users/{author.username}/')
+        assert response.status_code == 204
+        assert not User.objects.filter(pk=author.pk).exists()
+        assert not Review.objects.filter(pk=review.pk).exists()
+        assert not Comment.objects.filter(author=author).exists()
+        assert Review.objects.count() == 5
+        assert_consistent()
+
+    def test_deferred_title(self, admin_client, commented, settings):
+        from reviews.models import Review, Title
+
+        settings.DELETION = dict(
+            settings.DELETION, ASYNC_THRESHOLD=1, BATCH_SIZE=2
+        )
+        title, review = commented
+        response = admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 202
+        assert Review.objects.filter(title=title).exists()
+        for url in (
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        ):
+            assert admin_client.get(url).status_code == 404, (
+                f'Проверьте, что `{url}` скрыт до удаления'
+            )
+        assert admin_client.get('/api/v1/titles/').data['count'] == 0
+        assert purge_all() > 2, 'Проверьте, что строки удаляются порциями'
+        assert not Title.objects.exists()
+        assert not Review.objects.exists()
+
+    def test_deferred_user(self, admin_client, commented, settings):
+        from users.models import User
+
+        settings.DELETION = dict(
+            settings.DELETION, ASYNC_THRESHOLD=1, BATCH_SIZE=2
+        )
+        _, review = commented
+        author = review.author
+        response = admin_client.delete(f'/api/v1/users/{author.username}/')
+        assert response.status_code == 202
+        author.refresh_from_db()
+        assert not author.is_active
+        assert admin_client.get(
+            f'/api/v1/users/{author.username}/'
+        ).status_code == 404
+        assert purge_all() > 2, 'Проверьте, что строки удаляются порциями'
+        assert not User.objects.filter(pk=author.pk).exists()
+        assert_consistent()
+
+    @pytest.mark.parametrize('threshold', (1, 10000))
+    def test_title_leaves_leaderboard(self, admin_client, catalog, settings,
+                                      threshold):
+        from reviews.models import Review, TitleRanking
+        from reviews.ranking import refresh_ranking
+        from users.models import User
+
+        settings.DELETION = dict(settings.DELETION, ASYNC_THRESHOLD=threshold)
+        titles = catalog(3)
+        author = User.objects.create(username='critic', email='c@ya.ru')
+        for score, title in zip((9, 8, 7), titles):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        refresh_ranking({'MIN_VOTES': 1, 'PRIOR_WEIGHT': 0})
+        admin_client.delete(f'/api/v1/titles/{titles[1].pk}/')
+        assert list(TitleRanking.objects.values_list(
+            'position', 'title_id'
+        )) == [(1, titles[0].pk), (2, titles[2].pk)], (
+            'Проверьте, что после удаления в рейтинге лучших нет пропусков'
+        )
+        data = admin_client.get('/api/v1/titles/top/').json()
+        assert [item['position'] for item in data] == [1, 2]
@@ -0,0 +1,186 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+@pytest.fixture
+def admin_api_client(db, api_client):
+    from users.models import User
+
+    admin = User.objects.create(
+        username='exporter', email='exporter@ya.ru', role='admin'
+    )
+    api_client.force_authenticate(admin)
+    return api_client
+
+
+def read(response):
+    assert response.status_code == 200, response.content
+    assert response.streaming, 'Проверьте, что выгрузка отдается потоком'
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_admin_only(self, api_client, discussion):
+        from users.models import User
+
+        discussion(1)
+        assert api_client.get('/api/v1/export/titles/').status_code == 401
+        api_client.force_authenticate(User.objects.first())
+        assert api_client.get('/api/v1/export/titles/').status_code == 403
+
+    def test_titles_ndjson(self, admin_api_client, discussion, monkeypatch):
+        from api import export
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        monkeypatch.setattr(export, 'CHUNK_SIZE', 2)
+        title, _ = discussion(2)
+        with CaptureQueriesContext(connection) as queries:
+            rows = [
+                json.loads(line) for line in read(
+                    admin_api_client.get('/api/v1/export/titles/')
+                ).splitlines()
+            ]
+        assert len(rows) == 1
+        assert rows[0]['id'] == title.pk
+        assert rows[0]['review_count'] == 2
+        assert rows[0]['category'] == 'movie'
+        assert rows[0]['genre'] == ['genre-0']
+        assert rows[0]['modified'].endswith('Z')
+        assert len(queries.captured_queries) <= 3
+
+    def test_reviews_csv(self, admin_api_client, discussion):
+        from reviews.models import Review
+
+        discussion(3)
+        response = admin_api_client.get('/api/v1/export/reviews/?format=csv')
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        assert [int(row['id']) for row in rows] == list(
+            Review.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        assert rows[0]['author'] == 'author0'
+
+    @pytest.mark.parametrize('resource', ('titles', 'reviews', 'comments'))
+    def test_hidden_title(self, admin_api_client, discussion, resource):
+        from reviews.models import Comment, Review, Title
+
+        hidden, review = discussion(2)
+        shown = Title.objects.create(
+            name='Видимое', year=2000, category=hidden.category
+        )
+        Comment.objects.create(
+            review=Review.objects.create(
+                title=shown, author=review.author, text='Отзыв', score=5
+            ),
+            author=review.author, text='Комментарий',
+        )
+        Title.objects.filter(pk=hidden.pk).update(pending_deletion=True)
+        response = admin_api_client.get(f'/api/v1/export/{resource}/')
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert rows, 'Проверьте, что строки видимых произведений выгружаются'
+        assert {
+            row['id' if resource == 'titles' else 'title'] for row in rows
+        } == {shown.pk}, (
+            'Проверьте, что строки произведений, ожидающих удаления, '
+            'не выгружаются'
+        )
+
+    def test_since(self, admin_api_client, discussion):
+        from django.utils import timezone
+        from reviews.models import Comment
+
+        title, review = discussion(3)
+        Comment.objects.update(modified=timezone.now() - timezone.timedelta(
+            days=1
+        ))
+        comment = review.comments.first()
+        comment.text = 'Изменен'
+        comment.save()
+        since = (timezone.now() - timezone.timedelta(hours=1)).isoformat()
+        response = admin_api_client.get(
+            '/api/v1/export/comments/', {'since': since}
+        )
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert [row['id'] for row in rows] == [comment.pk]
+        assert rows[0]['title'] == title.pk
+        assert response['X-Export-Since']
+
+    @pytest.mark.parametrize('change', ('rename', 'delete'))
+    def test_since_sees_slug_changes(self, admin_api_client, catalog,
+                                     change):
+        from django.utils import timezone
+        from reviews.models import Genre, Title
+
+        titles = catalog(3)
+        Title.objects.update(modified=timezone.now() - timezone.timedelta(
+            days=1
+        ))
+        genre = Genre.objects.get(slug='genre-2')
+        if change == 'rename':
+            genre.slug = 'genre-renamed'
+            genre.save()
+        else:
+            genre.delete()
+        since = (timezone.now() - timezone.timedelta(hours=1)).isoformat()
+        rows = [
+            json.loads(line) for line in read(admin_api_client.get(
+                '/api/v1/export/titles/', {'since': since}
+            )).splitlines()
+        ]
+        assert [row['id'] for row in rows] == [titles[2].pk], (
+            'Проверьте, что смена slug жанра или категории попадает в '
+            'инкрементальную выгрузку произведений'
+        )
+        expected = ['genre-0', 'genre-1'] + (
+            ['genre-renamed'] if change == 'rename' else []
+        )
+        assert rows[0]['genre'] == expected
+
+    def test_category_rename_keeps_name_only_changes_out(
+        self, admin_api_client, catalog
+    ):
+        from django.utils import timezone
+        from reviews.models import Category, Title
+
+        catalog(2)
+        Title.objects.update(modified=timezone.now() - timezone.timedelta(
+            days=1
+        ))
+        category = Category.objects.get()
+        category.name = 'Кино'
+        category.save()
+        since = (timezone.now() - timezone.timedelta(hours=1)).isoformat()
+        assert read(admin_api_client.get(
+            '/api/v1/export/titles/', {'since': since}
+        )) == ''
+        category.slug = 'cinema'
+        category.save()
+        rows = read(admin_api_client.get(
+            '/api/v1/export/titles/', {'since': since}
+        )).splitlines()
+        assert [json.loads(row)['category'] for row in rows] == [
+            'cinema', 'cinema'
+        ]
+
+    def test_errors(self, admin_api_client):
+        response = admin_api_client.get('/api/v1/export/users/')
+        assert response.status_code == 404
+        response = admin_api_client.get(
+            '/api/v1/export/titles/?since=yesterday'
+        )
+        assert response.status_code == 400
+
+    def test_command(self, discussion, tmp_path):
+        from django.core.management import call_command
+
+        discussion(2)
+        output = tmp_path / 'reviews.csv'
+        call_command('export_catalog', 'reviews', '--format', 'csv',
+                     '--output', str(output), stderr=io.StringIO())
+        assert len(output.read_text().splitlines()) == 3
@@ -0,0 +1,120 @@
+import io
+
+import pytest
+from django.core.management.base import CommandError
+
+FILES = {
+    'users.csv': (
+        'id,username,email,role\n'
+        '1,reader,reader@ya.ru,user\n'
+        '2,critic,critic@ya.ru,user\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильмы,movie\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Фильм,2000,1\n'
+        '2,Сериал,2010,1\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,1,2\n3,2,2\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,Отзыв,1,4,2020-01-01T00:00:00Z\n'
+        '2,1,Отзыв,2,9,2020-01-02T00:00:00Z\n'
+        '3,2,Отзыв,1,7,2020-01-03T00:00:00Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Комментарий,2,2020-01-04T00:00:00Z\n'
+    ),
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in FILES.items():
+        (tmp_path / name).write_text(content, encoding='utf-8')
+    return tmp_path
+
+
+def load(path, *args):
+    from django.core.management import call_command
+
+    out = io.StringIO()
+    call_command(
+        'load_csv', '--path', str(path), '--batch-size', '2', *args,
+        stdout=out,
+    )
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestLoadCSV:
+
+    def test_loads_and_recalculates(self, data_dir, settings):
+        from reviews.models import Review, Title, TitleRanking
+        from reviews.search import search_titles
+
+        settings.LEADERBOARD = dict(settings.LEADERBOARD, MIN_VOTES=1)
+        load(data_dir)
+        assert dict(Title.objects.values_list('name', 'rating')) == {
+            'Фильм': 6.5, 'Сериал': 7.0,
+        }, 'Проверьте, что после загрузки рейтинги пересчитываются'
+        title = Title.objects.get(name='Фильм')
+        assert title.stats.score_4 == title.stats.score_9 == 1
+        assert Review.objects.get(pk=1).comment_count == 1
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+        assert Review.objects.get(pk=1).pub_date.year == 2020, (
+            'Проверьте, что даты публикации из файла сохраняются'
+        )
+        assert list(TitleRanking.objects.values_list(
+            'title__name', flat=True
+        )) == ['Сериал', 'Фильм']
+        assert list(search_titles(
+            Title.objects.all(), 'Сериал'
+        ).values_list('name', flat=True)) == ['Сериал']
+        assert not (data_dir / '.load_csv_state.json').exists()
+
+    def test_resume_after_error(self, data_dir):
+        from reviews.models import Review
+
+        (data_dir / 'review.csv').write_text(
+            FILES['review.csv'] + '4,2,Отзыв,2,оценка,2020-01-05T00:00:00Z\n',
+            encoding='utf-8',
+        )
+        with pytest.raises(CommandError, match='review.csv rows 3-4'):
+            load(data_dir)
+        assert (data_dir / '.load_csv_state.json').exists()
+        with pytest.raises(CommandError, match='--resume'):
+            load(data_dir)
+        (data_dir / 'review.csv').write_text(
+            FILES['review.csv'] + '4,2,Отзыв,2,5,2020-01-05T00:00:00Z\n',
+            encoding='utf-8',
+        )
+        out = load(data_dir, '--resume')
+        assert 'Skipped users.csv: already loaded' in out
+        assert Review.objects.count() == 4, (
+            'Проверьте, что --resume продолжает загрузку с места остановки'
+        )
+        assert not (data_dir / '.load_csv_state.json').exists()
+
+    def test_resume_reports_duplicates(self, data_dir):
+        from reviews.models import Genre
+
+        (data_dir / 'genre.csv').write_text(
+            FILES['genre.csv'] + '2,Повтор,comedy-2\n', encoding='utf-8'
+        )
+        out = load(data_dir, '--resume')
+        assert 'Skipped 1 rows of genre.csv with existing keys' in out, (
+            'Проверьте, что пропущенные при --resume строки попадают в отчет'
+        )
+        assert Genre.objects.get(pk=2).name == 'Комедия'
+
+    def test_duplicates_fail_without_resume(self, data_dir):
+        (data_dir / 'genre.csv').write_text(
+            FILES['genre.csv'] + '2,Повтор,comedy-2\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError, match='genre.csv rows 3-3'):
+            load(data_dir)
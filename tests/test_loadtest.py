@@ -0,0 +1,80 @@
+import io
+import json
+import random
+
+import pytest
+
+
+@pytest.fixture
+def workload(db):
+    from api.loadtest import Workload, seed
+
+    seed(2, random.Random(0))
+    return Workload
+
+
+def picks(workload, seed_value, count):
+    from api.loadtest import Runner
+
+    runner = Runner(workload(), count, 1, seed_value)
+    rng = random.Random(f'{seed_value}-0')
+    return [runner.pick(rng) for _ in range(count)]
+
+
+class TestRequestMix:
+
+    def test_same_seed_same_requests(self, workload):
+        assert picks(workload, 0, 50) == picks(workload, 0, 50), (
+            'Проверьте, что смесь запросов воспроизводится по seed'
+        )
+        assert picks(workload, 0, 50) != picks(workload, 1, 50)
+
+    def test_weights(self, workload):
+        from api.loadtest import MIX
+
+        requests = picks(workload, 0, 2000)
+        anonymous = sum(
+            1 for (_, method, _, _), user_id in requests
+            if method == 'GET' and user_id is None
+        )
+        share = MIX[0][0] / sum(weight for weight, _, _ in MIX)
+        assert abs(anonymous / len(requests) - share) < 0.05, (
+            'Проверьте, что запросы выбираются по весам смеси'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLoadtestCommand:
+
+    def test_report(self):
+        from django.core.management import call_command
+
+        out = io.StringIO()
+        call_command(
+            'loadtest', scale=2, requests=40, concurrency=1, stdout=out
+        )
+        report = json.loads(out.getvalue())
+        assert set(report) == {'endpoints', 'total', 'elapsed_s', 'meta'}
+        assert report['total']['requests'] == 40, (
+            'Проверьте, что выполняется заданное число запросов'
+        )
+        assert set(report['total']) == {
+            'requests', 'rps', 'p50_ms', 'p95_ms', 'p99_ms',
+            'queries_per_request', 'statuses',
+        }
+        assert sum(
+            endpoint['requests'] for endpoint in report['endpoints'].values()
+        ) == 40
+        assert not [
+            status for status in report['total']['statuses']
+            if not status.isdigit() or status.startswith('5')
+        ], 'Проверьте, что нагрузка не получает ошибок сервера'
+        assert report['meta']['requests'] == 40
+        assert report['meta']['titles'] == 2
+
+    def test_refuses_filled_database(self, catalog):
+        from django.core.management import CommandError, call_command
+
+        catalog(1)
+        with pytest.raises(CommandError):
+            call_command('loadtest', requests=1, stdout=io.StringIO())
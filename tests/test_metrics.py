@@ -0,0 +1,119 @@
+import pytest
+
+
+@pytest.fixture
+def metrics(settings):
+    from api.metrics import registry
+
+    settings.REQUEST_METRICS = dict(
+        settings.REQUEST_METRICS, ENABLED=True, SERVER_TIMING=True
+    )
+    registry.views.clear()
+    yield registry
+    registry.views.clear()
+
+
+def client_for(api_client, role):
+    from users.models import User
+
+    api_client.force_authenticate(User.objects.create(
+        username=role, email=f'{role}@ya.ru', role=role
+    ))
+    return api_client
+
+
+class TestHistogram:
+
+    def test_cumulative_buckets(self):
+        from api.metrics import Histogram
+
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 7):
+            histogram.observe(value)
+        assert list(histogram.cumulative()) == [
+            (1, 2), (5, 3), ('+Inf', 4)
+        ], 'Проверьте, что корзины гистограммы накопительные'
+        assert (histogram.sum, histogram.count) == (11.5, 4)
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+
+    def test_disabled_by_default(self, api_client):
+        from api.metrics import registry
+
+        registry.views.clear()
+        response = api_client.get('/api/v1/genres/')
+        assert 'Server-Timing' not in response
+        assert registry.views == {}, (
+            'Проверьте, что без REQUEST_METRICS_ENABLED запросы не замеряются'
+        )
+
+    def test_request_is_measured(self, metrics, api_client, catalog):
+        catalog(3)
+        response = api_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'queries"' in response['Server-Timing']
+        histograms = metrics.views['TitleViewSet.list']
+        wall, serializer, sql_time, queries = histograms
+        assert wall.count == 1
+        assert queries.sum >= 1, (
+            'Проверьте, что middleware считает SQL-запросы'
+        )
+        assert 0 < sql_time.sum <= wall.sum
+        assert 0 <= serializer.sum <= wall.sum
+        api_client.get('/api/v1/titles/')
+        assert metrics.views['TitleViewSet.list'][0].count == 2
+
+    def test_unresolved_path(self, metrics, api_client):
+        api_client.get('/no-such-page/')
+        assert 'unresolved' in metrics.views
+
+    def test_serializer_time_counted_once(self, metrics, catalog,
+                                          monkeypatch):
+        from api import metrics as module
+        from api.serializers import TitleGetSerializer
+
+        ticks = iter(range(100))
+        monkeypatch.setattr(
+            module.time, 'perf_counter', lambda: next(ticks)
+        )
+        title = catalog(1)[0]
+        record = module.RequestRecord()
+        module._local.record = record
+        try:
+            assert TitleGetSerializer(title).data['genre']
+        finally:
+            module._local.record = None
+        assert record.serializer == 1, (
+            'Проверьте, что вложенные сериализаторы не учитываются дважды'
+        )
+        assert record.serializer_depth == 0
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+
+    url = '/api/v1/metrics/'
+
+    def test_admin_only(self, metrics, api_client):
+        assert api_client.get(self.url).status_code == 401
+        assert client_for(api_client, 'user').get(
+            self.url
+        ).status_code == 403, 'Проверьте, что метрики видит только админ'
+
+    def test_prometheus_format(self, metrics, api_client):
+        client = client_for(api_client, 'admin')
+        client.get('/api/v1/genres/')
+        response = client.get(self.url)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        text = response.content.decode()
+        assert '# TYPE yamdb_request_duration_seconds histogram' in text
+        assert (
+            'yamdb_sql_queries_count{view="GenreViewSet.list"} 1' in text
+        )
+        assert (
+            'yamdb_request_duration_seconds_bucket'
+            '{view="GenreViewSet.list",le="+Inf"} 1'
+        ) in text
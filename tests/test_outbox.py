@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+import pytest
+from django.core.mail.backends.locmem import EmailBackend
+
+CONFIG = {
+    'BATCH_SIZE': 10,
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF': 30,
+    'MAX_BACKOFF': 45,
+    'LEASE': 300,
+}
+
+
+class DownBackend(EmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP server is down')
+
+
+class RejectingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        if any('bad' in message.to[0] for message in messages):
+            raise ValueError('Recipient rejected')
+        return super().send_messages(messages)
+
+
+class ClosingBackend(EmailBackend):
+
+    def close(self):
+        raise ConnectionResetError('Lost connection on QUIT')
+
+
+def backend(name):
+    return f'{__name__}.{name}'
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    @pytest.fixture
+    def emails(self):
+        from users.outbox import enqueue_email
+
+        def create(*recipients):
+            return [
+                enqueue_email('Код', 'Код подтверждения', recipient)
+                for recipient in recipients
+            ]
+
+        return create
+
+    def make_due(self):
+        from django.utils import timezone
+        from users.models import OutboxEmail
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+
+    def test_sends_pending(self, emails, settings, mailoutbox):
+        from users.models import SENT, OutboxEmail
+        from users.outbox import send_batch
+
+        settings.EMAIL_BACKEND = backend('EmailBackend')
+        emails('one@ya.ru', 'two@ya.ru')
+        assert send_batch(CONFIG) == 2
+        assert len(mailoutbox) == 2
+        assert set(OutboxEmail.objects.values_list('status', flat=True)) == {
+            SENT
+        }
+        assert send_batch(CONFIG) == 0
+
+    def test_server_down_counts_attempt(self, emails, settings):
+        from django.utils import timezone
+        from users.models import PENDING, OutboxEmail
+        from users.outbox import send_batch
+
+        settings.EMAIL_BACKEND = backend('DownBackend')
+        emails('one@ya.ru', 'two@ya.ru')
+        started = timezone.now()
+        assert send_batch(CONFIG) == 0, (
+            'Проверьте, что недоступный почтовый сервер не роняет воркер'
+        )
+        for email in OutboxEmail.objects.all():
+            assert email.status == PENDING
+            assert email.attempts == 1, (
+                'Проверьте, что сбой соединения засчитывается попыткой '
+                'каждому забранному письму'
+            )
+            assert 'SMTP server is down' in email.last_error
+            assert email.next_attempt_at >= started + timedelta(seconds=30)
+        assert send_batch(CONFIG) == 0
+        assert set(OutboxEmail.objects.values_list(
+            'attempts', flat=True
+        )) == {1}, 'Проверьте, что письма не отправляются до срока'
+
+    def test_backoff_grows_and_is_capped(self, emails, settings):
+        from django.utils import timezone
+        from users.models import OutboxEmail
+        from users.outbox import send_batch
+
+        settings.EMAIL_BACKEND = backend('DownBackend')
+        emails('one@ya.ru')
+        delays = []
+        for _ in range(2):
+            self.make_due()
+            started = timezone.now()
+            send_batch(CONFIG)
+            delays.append(
+                (OutboxEmail.objects.get().next_attempt_at - started)
+                .total_seconds()
+            )
+        assert 30 <= delays[0] < 40
+        assert 45 <= delays[1] < 55, (
+            'Проверьте, что отсрочка удваивается и ограничена MAX_BACKOFF'
+        )
+
+    def test_gives_up_after_max_attempts(self, emails, settings):
+        from users.models import FAILED, OutboxEmail
+        from users.outbox import send_batch
+
+        settings.EMAIL_BACKEND = backend('DownBackend')
+        emails('one@ya.ru')
+        for _ in range(CONFIG['MAX_ATTEMPTS']):
+            self.make_due()
+            send_batch(CONFIG)
+        email = OutboxEmail.objects.get()
+        assert email.status == FAILED
+        assert email.attempts == CONFIG['MAX_ATTEMPTS']
+        self.make_due()
+        send_batch(CONFIG)
+        assert OutboxEmail.objects.get().attempts == CONFIG['MAX_ATTEMPTS'], (
+            'Проверьте, что письмо после MAX_ATTEMPTS больше не отправляется'
+        )
+
+    def test_rejected_message_does_not_block_batch(self, emails, settings,
+                                                   mailoutbox):
+        from users.models import PENDING, SENT, OutboxEmail
+        from users.outbox import send_batch
+
+        settings.EMAIL_BACKEND = backend('RejectingBackend')
+        emails('one@ya.ru', 'bad@ya.ru', 'two@ya.ru')
+        assert send_batch(CONFIG) == 2
+        assert dict(OutboxEmail.objects.values_list('recipient', 'status')) == {
+            'one@ya.ru': SENT, 'bad@ya.ru': PENDING, 'two@ya.ru': SENT,
+        }
+
+    def test_close_error_keeps_sent(self, emails, settings, mailoutbox):
+        from users.models import SENT, OutboxEmail
+        from users.outbox import send_batch
+
+        settings.EMAIL_BACKEND = backend('ClosingBackend')
+        emails('one@ya.ru')
+        assert send_batch(CONFIG) == 1
+        assert OutboxEmail.objects.get().status == SENT
+
+    def test_signup_enqueues_email(self, api_client, settings, mailoutbox):
+        from users.models import OutboxEmail
+
+        response = api_client.post(
+            '/api/v1/auth/signup/',
+            {'email': 'new@ya.ru', 'username': 'newcomer'},
+        )
+        assert response.status_code == 200
+        assert mailoutbox == [], (
+            'Проверьте, что письмо отправляет воркер, а не запрос'
+        )
+        assert OutboxEmail.objects.get().recipient == 'new@ya.ru'
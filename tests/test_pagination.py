@@ -0,0 +1,103 @@
+import pytest
+
+
+def walk(api_client, url, link='next'):
+    pages = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data
+        pages.append([item['id'] for item in data['results']])
+        url = data[link]
+    return pages
+
+
+@pytest.fixture
+def page_size(monkeypatch):
+    from rest_framework.pagination import CursorPagination
+
+    monkeypatch.setattr(CursorPagination, 'page_size', 2)
+    return 2
+
+
+@pytest.fixture
+def same_names(db):
+    from reviews.models import Category, Title
+
+    category = Category.objects.create(name='Фильмы', slug='movie')
+    return [
+        Title.objects.create(name=name, year=2000, category=category)
+        for name in ('Б', 'А', 'Б', 'Б', 'А', 'Б', 'В')
+    ]
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_titles_follow_key(self, api_client, page_size, same_names):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Title
+
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('pk', flat=True)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            pages = walk(api_client, '/api/v1/titles/?pagination=cursor')
+        assert [pk for page in pages for pk in page] == expected, (
+            'Проверьте, что курсор проходит произведения с одинаковыми '
+            'названиями без пропусков и повторов'
+        )
+        assert [len(page) for page in pages] == [2, 2, 2, 1]
+        assert not [
+            query for query in queries.captured_queries
+            if 'OFFSET' in query['sql'] or 'COUNT(' in query['sql']
+        ], 'Проверьте, что курсорный режим не использует OFFSET и COUNT'
+
+    def test_previous_links(self, api_client, page_size, same_names):
+        pages = walk(api_client, '/api/v1/titles/?pagination=cursor')
+        last = '/api/v1/titles/?pagination=cursor'
+        for _ in pages[1:]:
+            last = api_client.get(last).json()['next']
+        assert walk(api_client, last, 'previous') == pages[::-1], (
+            'Проверьте, что ссылки previous возвращают те же страницы'
+        )
+
+    def test_sparse_fields(self, api_client, page_size, same_names):
+        pages = walk(api_client, '/api/v1/titles/?pagination=cursor&fields=id')
+        assert len([pk for page in pages for pk in page]) == len(same_names)
+
+    def test_reviews(self, api_client, page_size, discussion):
+        from reviews.models import Review
+
+        title, _ = discussion(5)
+        Review.objects.filter(title=title).update(
+            pub_date=Review.objects.first().pub_date
+        )
+        pages = walk(
+            api_client,
+            f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor',
+        )
+        assert [pk for page in pages for pk in page] == list(
+            Review.objects.order_by('-pub_date', 'id')
+            .values_list('pk', flat=True)
+        )
+
+    @pytest.mark.parametrize('param', ('ordering=-year', 'search=Б'))
+    def test_reordering_is_rejected(self, api_client, same_names, param):
+        response = api_client.get(
+            f'/api/v1/titles/?pagination=cursor&{param}'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что курсорный режим отклоняет смену порядка'
+        )
+        assert param.split('=')[0] in response.json()
+        assert api_client.get(f'/api/v1/titles/?{param}').status_code == 200
+
+    def test_invalid_cursor(self, api_client, same_names):
+        from base64 import b64encode
+
+        for cursor in ('garbage', b64encode(b'p=%5B1%5D').decode()):
+            response = api_client.get(f'/api/v1/titles/?cursor={cursor}')
+            assert response.status_code == 404
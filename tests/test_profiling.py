@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.REQUEST_PROFILING = dict(
+        settings.REQUEST_PROFILING,
+        ENABLED=True, SAMPLE_RATE=0, DIRECTORY=str(tmp_path), MAX_FILES=500,
+    )
+    return settings.REQUEST_PROFILING
+
+
+def token_client(api_client, role):
+    from rest_framework_simplejwt.tokens import AccessToken
+    from users.models import User
+
+    user = User.objects.create(
+        username=role, email=f'{role}@ya.ru', role=role
+    )
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return api_client
+
+
+def saved(config):
+    return sorted(os.listdir(config['DIRECTORY']))
+
+
+@pytest.mark.django_db
+class TestRequestProfiling:
+
+    def test_admin_header(self, profiling, api_client):
+        client = token_client(api_client, 'admin')
+        response = client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        assert saved(profiling) == [response['X-Profile-Id']], (
+            'Проверьте, что профиль запроса администратора сохраняется, '
+            'а имя файла возвращается в заголовке X-Profile-Id'
+        )
+        name = response['X-Profile-Id']
+        assert '--TitleViewSet.list--' in name and name.endswith('ms.prof')
+
+    def test_header_requires_admin(self, profiling, api_client):
+        client = token_client(api_client, 'user')
+        response = client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+        assert saved(profiling) == [], (
+            'Проверьте, что заголовок X-Profile учитывается только '
+            'для администратора'
+        )
+        api_client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        api_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert saved(profiling) == []
+
+    def test_sampling_and_pruning(self, profiling, api_client):
+        profiling.update(SAMPLE_RATE=1, MAX_FILES=2)
+        names = [
+            api_client.get('/api/v1/titles/')['X-Profile-Id']
+            for _ in range(3)
+        ]
+        assert saved(profiling) == names[1:], (
+            'Проверьте, что сохраняется выборка запросов, а старые '
+            'профили сверх MAX_FILES удаляются'
+        )
+
+    def test_disabled(self, settings, api_client):
+        settings.REQUEST_PROFILING = dict(
+            settings.REQUEST_PROFILING, ENABLED=False, SAMPLE_RATE=1
+        )
+        assert 'X-Profile-Id' not in api_client.get('/api/v1/titles/')
+
+    def test_command(self, profiling, api_client, capsys):
+        profiling.update(SAMPLE_RATE=1)
+        for url in ('/api/v1/titles/', '/api/v1/titles/', '/api/v1/genres/'):
+            api_client.get(url)
+        call_command('profiles', 'list')
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 3
+        assert 'GenreViewSet.list' in lines[0], (
+            'Проверьте, что профили выводятся от новых к старым'
+        )
+        call_command('profiles', 'aggregate', 'TitleViewSet.list')
+        output = capsys.readouterr().out
+        assert output.startswith('2 profiles')
+        assert 'function calls' in output
+        call_command(
+            'profiles', 'diff', 'TitleViewSet.list', '*GenreViewSet*',
+            '--limit', '5',
+        )
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].split()[-1] == 'function'
+        assert len(lines) == 6
+        with pytest.raises(Exception, match='No profiles'):
+            call_command('profiles', 'aggregate', 'Missing.list')
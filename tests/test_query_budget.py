@@ -0,0 +1,77 @@
+import pytest
+
+QUERY_BUDGETS = {
+    '/api/v1/titles/': 3,
+    '/api/v1/titles/?genre=genre-0&category=movie': 3,
+    '/api/v1/titles/?stats=true': 3,
+    '/api/v1/genres/': 2,
+    '/api/v1/categories/': 2,
+}
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('url,budget', QUERY_BUDGETS.items())
+    @pytest.mark.parametrize('size', (1, 30))
+    def test_list_budget(self, api_client, catalog,
+                         django_assert_max_num_queries, url, budget, size):
+        catalog(size)
+        with django_assert_max_num_queries(budget):
+            response = api_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+
+    @pytest.mark.parametrize('mode', ('', '?pagination=cursor'))
+    @pytest.mark.parametrize('size', (1, 30))
+    def test_nested_list_budget(self, api_client, discussion,
+                                django_assert_max_num_queries, mode, size):
+        title, review = discussion(size)
+        urls = (
+            f'/api/v1/titles/{title.pk}/reviews/{mode}',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/{mode}',
+        )
+        for url in urls:
+            with django_assert_max_num_queries(2):
+                response = api_client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+            )
+            assert len(response.json()['results']) == size, (
+                'Проверьте, что список выводится полностью'
+            )
+            if not mode:
+                assert response.json()['count'] == size, (
+                    'Проверьте, что count совпадает с числом объектов'
+                )
+
+    def test_nested_parent_chain(self, api_client, discussion):
+        title, review = discussion(1)
+        response = api_client.get(
+            f'/api/v1/titles/{title.pk + 1}/reviews/{review.pk}/comments/'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что комментарии отзыва чужого произведения '
+            'возвращают 404'
+        )
+
+    def test_title_retrieve_budget(self, api_client, catalog,
+                                   django_assert_max_num_queries):
+        title = catalog(3)[-1]
+        with django_assert_max_num_queries(2):
+            response = api_client.get(f'/api/v1/titles/{title.pk}/')
+        assert len(response.json()['genre']) == 3, (
+            'Проверьте, что жанры произведения выводятся полностью'
+        )
+
+    def test_title_filters(self, api_client, catalog):
+        catalog(6)
+        response = api_client.get('/api/v1/titles/?genre=genre-2')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что фильтр по жанру работает вместе с prefetch'
+        )
+        response = api_client.get('/api/v1/titles/?category=movie')
+        assert response.json()['count'] == 6, (
+            'Проверьте, что фильтр по категории работает'
+        )
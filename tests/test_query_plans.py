@@ -0,0 +1,162 @@
+import io
+import re
+
+import pytest
+
+TITLES = 300
+REVIEWS = 150
+COMMENTS = 150
+
+# (метод, адрес, признак основного запроса, допустима ли сортировка)
+ENDPOINTS = (
+    ('get', '/api/v1/titles/', 'FROM "reviews_title"', False),
+    ('get', '/api/v1/titles/?pagination=cursor', 'FROM "reviews_title"',
+     False),
+    ('get', '/api/v1/titles/?category=category-1', 'FROM "reviews_title"',
+     False),
+    ('get', '/api/v1/titles/?year=1990', 'FROM "reviews_title"', False),
+    ('get', '/api/v1/titles/?ordering=-rating', 'FROM "reviews_title"',
+     False),
+    ('get', '/api/v1/titles/?ordering=rating', 'FROM "reviews_title"',
+     False),
+    ('get', '/api/v1/titles/?ordering=year', 'FROM "reviews_title"', False),
+    # Порядок по названию внутри жанра не обслуживается одним индексом:
+    # индекс (genre_id, title_id) избавляет только от полного просмотра.
+    ('get', '/api/v1/titles/?genre=genre-1', 'FROM "reviews_title"', True),
+    ('get', '/api/v1/titles/{title}/reviews/', 'FROM "reviews_review"',
+     False),
+    ('get', '/api/v1/titles/{title}/reviews/?pagination=cursor',
+     'FROM "reviews_review"', False),
+    ('get', '/api/v1/titles/{title}/reviews/{review}/comments/',
+     'FROM "reviews_comment"', False),
+    ('get', '/api/v1/titles/{title}/reviews/{review}/comments/'
+     '?pagination=cursor', 'FROM "reviews_comment"', False),
+    ('get', '/api/v1/titles/top/', 'FROM "reviews_titleranking"', False),
+    ('post', '/api/v1/auth/token/', 'FROM "users_user"', False),
+)
+
+SEQUENTIAL = {
+    'sqlite': re.compile(r'\bSCAN (TABLE )?\w+$'),
+    'postgresql': re.compile(r'Seq Scan'),
+}
+SORT = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY'),
+    'postgresql': re.compile(r'(^|->)\s*(Incremental )?Sort\b'),
+}
+
+
+@pytest.fixture
+def seeded(db):
+    from django.core.management import call_command
+    from django.db import connection
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import User
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(5)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(8)
+    ]
+    Title.objects.bulk_create([
+        Title(name=f'Произведение {i:04}', year=1960 + i % 60,
+              category=categories[i % len(categories)])
+        for i in range(TITLES)
+    ])
+    titles = list(Title.objects.order_by('pk'))
+    Title.genre.through.objects.bulk_create([
+        Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+        for i, title in enumerate(titles)
+        for genre in {genres[i % 8], genres[i * 3 % 8]}
+    ])
+    User.objects.bulk_create([
+        User(username=f'reader{i}', email=f'reader{i}@ya.ru')
+        for i in range(REVIEWS)
+    ])
+    users = list(User.objects.order_by('pk'))
+    for title in titles[:10]:
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='Отзыв', score=i % 10 + 1)
+            for i, user in enumerate(users)
+        ])
+    review = Review.objects.filter(title=titles[0]).first()
+    Comment.objects.bulk_create([
+        Comment(review=review, author=users[i % len(users)], text='Текст')
+        for i in range(COMMENTS)
+    ])
+    call_command('recalculate_ratings', stdout=io.StringIO())
+    call_command('refresh_leaderboard', '--once', stdout=io.StringIO())
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {'title': titles[0].pk, 'review': review.pk, 'user': users[0]}
+
+
+def explain(sql):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # На тестовом объеме планировщик предпочитает полный просмотр
+            # маленьких таблиц; без него проверяется, что индекс подходит.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    @pytest.mark.parametrize('method,url,marker,allow_sort', ENDPOINTS)
+    def test_main_query_uses_index(self, api_client, seeded, method, url,
+                                   marker, allow_sort):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        if connection.vendor not in SEQUENTIAL:
+            pytest.skip(f'Планы {connection.vendor} не проверяются')
+        url = url.format(**seeded)
+        data = {
+            'username': seeded['user'].username,
+            'confirmation_code': str(seeded['user'].confirmation_code),
+        } if method == 'post' else None
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(api_client, method)(url, data)
+        assert response.status_code == 200, response.content
+        main = [
+            query['sql'] for query in queries.captured_queries
+            if marker in query['sql'] and 'COUNT(' not in query['sql']
+        ]
+        assert main, f'Не найден основной запрос `{url}`'
+        plan = explain(main[0])
+        assert not any(
+            SEQUENTIAL[connection.vendor].search(line) for line in plan
+        ), f'Основной запрос `{url}` просматривает таблицу целиком: {plan}'
+        if not allow_sort:
+            assert not any(
+                SORT[connection.vendor].search(line) for line in plan
+            ), f'Основной запрос `{url}` сортирует строки: {plan}'
+
+    @pytest.mark.parametrize('resource', ('titles', 'reviews', 'comments'))
+    def test_incremental_export_uses_index(self, seeded, resource):
+        from api.export import EXPORTS
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+
+        if connection.vendor not in SEQUENTIAL:
+            pytest.skip(f'Планы {connection.vendor} не проверяются')
+        since = timezone.now() - timezone.timedelta(hours=1)
+        export = EXPORTS[resource](since)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in export.chunks():
+                pass
+        plan = explain(queries.captured_queries[0]['sql'])
+        assert not any(
+            SEQUENTIAL[connection.vendor].search(line)
+            or SORT[connection.vendor].search(line)
+            for line in plan
+        ), f'Инкрементальная выгрузка {resource} не использует индекс: {plan}'
@@ -0,0 +1,130 @@
+import pytest
+
+CONFIG = {'MIN_VOTES': 2, 'PRIOR_WEIGHT': 10}
+
+
+@pytest.fixture
+def rated(db, catalog):
+    from reviews.models import Review
+    from users.models import User
+
+    titles = catalog(4)
+    authors = [
+        User.objects.create(username=f'critic{i}', email=f'c{i}@ya.ru')
+        for i in range(5)
+    ]
+    scores = {
+        0: (10, 10),
+        1: (9, 9, 9, 9, 9),
+        2: (2, 3, 4),
+        3: (10,),
+    }
+    for index, title_scores in scores.items():
+        for author, score in zip(authors, title_scores):
+            Review.objects.create(
+                title=titles[index], author=author, text='Отзыв',
+                score=score,
+            )
+    return titles
+
+
+def leaderboard():
+    from reviews.models import TitleRanking
+
+    return list(TitleRanking.objects.values_list(
+        'position', 'title__name', 'review_count'
+    ))
+
+
+class TestBayesianScore:
+
+    def test_score(self):
+        from reviews.ranking import bayesian_score
+
+        assert bayesian_score(10, 1, 6, 0) == 10
+        assert bayesian_score(10, 1, 6, 3) == 7, (
+            'Проверьте, что оценка сглаживается к средней с весом prior'
+        )
+        assert bayesian_score(90, 10, 6, 10) == 7.5
+
+
+@pytest.mark.django_db
+class TestRefreshRanking:
+
+    def test_ordering(self, rated):
+        from reviews.models import TitleRanking
+        from reviews.ranking import bayesian_score, refresh_ranking
+
+        assert refresh_ranking(CONFIG) == 3
+        assert leaderboard() == [
+            (1, 'Произведение 1', 5),
+            (2, 'Произведение 0', 2),
+            (3, 'Произведение 2', 3),
+        ], 'Проверьте, что много девяток важнее двух десяток'
+        mean = (20 + 45 + 9 + 10) / 11
+        assert TitleRanking.objects.get(position=2).score == pytest.approx(
+            bayesian_score(20, 2, mean, 10)
+        )
+
+    def test_min_votes_and_prior_are_separate(self, rated):
+        from reviews.ranking import refresh_ranking
+
+        refresh_ranking({'MIN_VOTES': 1, 'PRIOR_WEIGHT': 0})
+        assert [row[1] for row in leaderboard()] == [
+            'Произведение 0', 'Произведение 3',
+            'Произведение 1', 'Произведение 2',
+        ], 'Проверьте, что без веса средней порядок совпадает со средней'
+        refresh_ranking({'MIN_VOTES': 5, 'PRIOR_WEIGHT': 0})
+        assert [row[1] for row in leaderboard()] == ['Произведение 1']
+
+    def test_only_changes_are_written(self, rated):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review
+        from reviews.ranking import refresh_ranking
+
+        refresh_ranking(CONFIG, chunk_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            refresh_ranking(CONFIG, chunk_size=2)
+        assert not [
+            query for query in queries.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+        ], 'Проверьте, что неизменный рейтинг не перезаписывается'
+        Review.objects.filter(title=rated[1]).delete()
+        assert refresh_ranking(CONFIG, chunk_size=2) == 2
+        assert leaderboard() == [
+            (1, 'Произведение 0', 2), (2, 'Произведение 2', 3),
+        ], 'Проверьте, что выбывшие произведения удаляются из рейтинга'
+
+    def test_hidden_titles_drop_out(self, rated):
+        from reviews.models import Title
+        from reviews.ranking import refresh_ranking
+
+        refresh_ranking(CONFIG)
+        Title.objects.filter(pk=rated[1].pk).update(pending_deletion=True)
+        refresh_ranking(CONFIG)
+        assert [row[:2] for row in leaderboard()] == [
+            (1, 'Произведение 0'), (2, 'Произведение 2'),
+        ]
+
+    def test_top_endpoint(self, api_client, rated, settings):
+        from reviews.ranking import refresh_ranking
+
+        settings.LEADERBOARD = dict(settings.LEADERBOARD, **CONFIG)
+        refresh_ranking()
+        data = api_client.get('/api/v1/titles/top/?limit=2').json()
+        assert [item['position'] for item in data] == [1, 2]
+        assert data[0]['title']['name'] == 'Произведение 1'
+
+    def test_top_cache_expires_with_refresh(self, api_client, rated,
+                                            settings):
+        from api.cache import response_cache
+
+        settings.RESPONSE_CACHE = dict(settings.RESPONSE_CACHE, ENABLED=True)
+        response_cache.backend.clear()
+        settings.LEADERBOARD = dict(settings.LEADERBOARD, REFRESH_INTERVAL=-1)
+        assert api_client.get('/api/v1/titles/top/')['X-Cache'] == 'MISS'
+        assert api_client.get('/api/v1/titles/top/')['X-Cache'] == 'MISS', (
+            'Проверьте, что ответ рейтинга живет не дольше интервала '
+            'пересчета'
+        )
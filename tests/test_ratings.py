@@ -0,0 +1,158 @@
+import io
+
+import pytest
+
+
+def ratings():
+    from reviews.models import Title
+
+    return {
+        pk: (score_sum, count, rating)
+        for pk, score_sum, count, rating in Title.objects.values_list(
+            'pk', 'score_sum', 'review_count', 'rating'
+        )
+    }
+
+
+def actual_ratings():
+    from django.db.models import Count, Sum
+    from reviews.models import Title
+
+    return {
+        pk: (score_sum or 0, count, score_sum / count if count else None)
+        for pk, score_sum, count in Title.objects.order_by().annotate(
+            actual_sum=Sum('reviews__score'), actual=Count('reviews')
+        ).values_list('pk', 'actual_sum', 'actual')
+    }
+
+
+@pytest.fixture
+def reviews(db, catalog):
+    from reviews.models import Review
+    from users.models import User
+
+    titles = catalog(2)
+    authors = [
+        User.objects.create(username=f'critic{i}', email=f'c{i}@ya.ru')
+        for i in range(3)
+    ]
+    return titles, [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=score
+        )
+        for author, score in zip(authors, (4, 7, 10))
+    ]
+
+
+@pytest.mark.django_db
+class TestRating:
+
+    def test_create(self, reviews):
+        titles, _ = reviews
+        assert ratings() == {titles[0].pk: (21, 3, 7.0), titles[1].pk: (
+            0, 0, None
+        )}, 'Проверьте, что новый отзыв учитывается в рейтинге'
+
+    def test_update_text(self, reviews):
+        _, (review, *_) = reviews
+        review.text = 'Новый текст'
+        review.save()
+        assert ratings() == actual_ratings()
+
+    def test_score_change(self, reviews):
+        titles, (review, *_) = reviews
+        review.score = 1
+        review.save()
+        assert ratings()[titles[0].pk] == (18, 3, 6.0), (
+            'Проверьте, что смена оценки сдвигает рейтинг'
+        )
+        assert ratings() == actual_ratings()
+
+    def test_moved_review(self, reviews):
+        titles, (review, *_) = reviews
+        review.title = titles[1]
+        review.score = 9
+        review.save()
+        assert ratings() == {
+            titles[0].pk: (17, 2, 8.5), titles[1].pk: (9, 1, 9.0),
+        }, 'Проверьте, что перенос отзыва переносит его оценку'
+
+    def test_delete(self, reviews):
+        titles, review_list = reviews
+        review_list[0].delete()
+        assert ratings()[titles[0].pk] == (17, 2, 8.5)
+        for review in review_list[1:]:
+            review.delete()
+        assert ratings()[titles[0].pk] == (0, 0, None), (
+            'Проверьте, что без отзывов рейтинг пустой'
+        )
+
+    def test_api_score_change(self, reviews, api_client):
+        from users.models import MODER
+
+        titles, (review, *_) = reviews
+        api_client.force_authenticate(review.author)
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/{review.pk}/'
+        assert api_client.patch(url, {'score': 10}).status_code == 200
+        assert api_client.get(
+            f'/api/v1/titles/{titles[0].pk}/'
+        ).json()['rating'] == 9
+        review.author.role = MODER
+        review.author.save()
+        assert api_client.delete(url).status_code == 204
+        assert ratings() == actual_ratings()
+
+
+@pytest.mark.django_db
+class TestRecalculateRatings:
+
+    def test_repairs_drift(self, reviews):
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        titles, _ = reviews
+        expected = ratings()
+        Title.objects.filter(pk=titles[0].pk).update(
+            score_sum=5, review_count=1, rating=5.0
+        )
+        Title.objects.filter(pk=titles[1].pk).update(rating=3.0)
+        out = io.StringIO()
+        call_command('recalculate_ratings', '--dry-run', stdout=out)
+        assert 'Titles with drift: 2 (not fixed)' in out.getvalue()
+        assert ratings() != expected
+        out = io.StringIO()
+        call_command('recalculate_ratings', stdout=out)
+        assert 'Titles with drift: 2\n' in out.getvalue()
+        assert ratings() == expected, (
+            'Проверьте, что команда восстанавливает рейтинг по отзывам'
+        )
+
+    def test_no_drift(self, reviews):
+        from django.core.management import call_command
+
+        out = io.StringIO()
+        call_command('recalculate_ratings', stdout=out)
+        assert 'Titles with drift: 0' in out.getvalue()
+
+    def test_concurrent_review_is_kept(self, reviews, monkeypatch):
+        from api.management.commands import recalculate_ratings
+        from django.core.management import call_command
+        from reviews.models import Review, Title
+        from users.models import User
+
+        titles, _ = reviews
+        Title.objects.filter(pk=titles[0].pk).update(score_sum=5)
+        repair = recalculate_ratings.repair
+
+        def write_then_repair(*args, **kwargs):
+            Review.objects.create(
+                title=titles[0], text='Отзыв', score=1,
+                author=User.objects.create(username='late', email='l@ya.ru'),
+            )
+            repair(*args, **kwargs)
+
+        monkeypatch.setattr(recalculate_ratings, 'repair', write_then_repair)
+        call_command('recalculate_ratings', stdout=io.StringIO())
+        assert ratings()[titles[0].pk] == (22, 4, 5.5), (
+            'Проверьте, что отзыв, записанный после сверки, не затирается'
+        )
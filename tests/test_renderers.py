@@ -0,0 +1,134 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+import pytest
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?stats=true',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+)
+
+DATA = {
+    'text': 'Текст с \u2028разделителями\u2029 строк',
+    'pub_date': datetime.datetime(
+        2021, 5, 1, 12, 30, 45, 123456, tzinfo=datetime.timezone.utc
+    ),
+    'day': datetime.date(2021, 5, 1),
+    'time': datetime.time(12, 30, 45, 5),
+    'duration': datetime.timedelta(hours=1),
+    'rating': decimal.Decimal('7.50'),
+    'uuid': uuid.UUID(int=1),
+    'large': 2 ** 70,
+    'nested': [{'score': 10, 'mean': 0.1}, None, True, ()],
+}
+
+FLOATS = [1e16, 1e-7, 1.5e-7, -2e-5, 123456789012345678.0]
+
+
+class TestFastJSON:
+
+    def test_render_is_identical(self):
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), 'Проверьте, что FastJSONRenderer совпадает с JSONRenderer'
+        assert FastJSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        ) == JSONRenderer().render(DATA, 'application/json; indent=4')
+
+    def test_float_notation(self):
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        content = FastJSONRenderer().render({'floats': FLOATS})
+        assert content != JSONRenderer().render({'floats': FLOATS})
+        assert json.loads(content) == {'floats': FLOATS}, (
+            'Проверьте, что дробные числа в экспоненциальной форме '
+            'сохраняют значение'
+        )
+        assert FastJSONRenderer().render({'mean': float('nan')}) == (
+            b'{"mean":null}'
+        )
+        with pytest.raises(ValueError):
+            JSONRenderer().render({'mean': float('nan')})
+
+    def test_score_floats_are_identical(self):
+        from api.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+
+        data = {
+            'score': 7.142857142857143,
+            'stats': {'mean': 6.333333333333333, 'median': 5.5},
+            'scores': [score / 3 for score in range(1, 31)],
+        }
+        assert FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        ), 'Проверьте, что оценки записываются как в JSONRenderer'
+
+    def test_render_without_orjson(self, monkeypatch):
+        from api import renderers
+        from rest_framework.renderers import JSONRenderer
+
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(DATA) == (
+            JSONRenderer().render(DATA)
+        )
+
+    def test_parse(self):
+        from api.renderers import FastJSONParser
+        from rest_framework.exceptions import ParseError
+
+        body = '{"text": "Текст", "score": 10, "large": 1180591620717411303424}'
+        assert FastJSONParser().parse(io.BytesIO(body.encode())) == {
+            'text': 'Текст', 'score': 10, 'large': 2 ** 70,
+        }
+        for body in (b'{"score": NaN}', b'{"score":'):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('url', URLS)
+    def test_responses_are_identical(self, api_client, catalog, url):
+        from rest_framework.renderers import JSONRenderer
+
+        catalog(3)
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert response.content == JSONRenderer().render(response.data), (
+            f'Проверьте, что ответ `{url}` совпадает с JSONRenderer'
+        )
+
+    @pytest.mark.django_db
+    def test_review_dates(self, api_client, discussion):
+        from rest_framework.renderers import JSONRenderer
+
+        title, _ = discussion(2)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = api_client.get(url)
+        assert response.content == JSONRenderer().render(response.data)
+        assert response.json()['results'][0]['pub_date'].endswith('Z')
+
+
+class TestMessagePack:
+
+    @pytest.mark.django_db
+    def test_negotiation(self, api_client, catalog):
+        msgpack = pytest.importorskip('msgpack')
+
+        catalog(2)
+        json_response = api_client.get('/api/v1/titles/')
+        response = api_client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/msgpack'
+        )
+        assert response['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(response.content) == json_response.json()
+        assert response['ETag'] != json_response['ETag'], (
+            'Проверьте, что ETag зависит от формата ответа'
+        )
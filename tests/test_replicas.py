@@ -0,0 +1,152 @@
+import pytest
+from django.test import RequestFactory
+
+REPLICAS = {
+    'ALIASES': ['replica_1'],
+    'APPS': ('reviews',),
+    'PRIMARY_PATHS': ('/admin/',),
+    'STICKY_SECONDS': 5,
+}
+
+
+class TestReplicaRouting:
+
+    def request(self, method, path='/api/v1/titles/', token='Bearer one'):
+        from api.replicas import ReplicaMiddleware, ReplicaRouter
+        from reviews.models import Title
+        from users.models import User
+
+        used = {}
+
+        def get_response(request):
+            router = ReplicaRouter()
+            used['title'] = router.db_for_read(Title)
+            used['user'] = router.db_for_read(User)
+            used['write'] = router.db_for_write(Title)
+
+        extra = {'HTTP_AUTHORIZATION': token} if token else {}
+        request = getattr(RequestFactory(), method)(path, **extra)
+        ReplicaMiddleware(get_response)(request)
+        return used
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        from django.core.cache import cache
+
+        settings.DATABASE_REPLICAS = REPLICAS
+        cache.clear()
+
+    def test_safe_requests_read_replicas(self):
+        used = self.request('get', token=None)
+        assert used == {'title': 'replica_1', 'user': None, 'write': 'default'}
+
+    def test_writes_and_admin_use_primary(self):
+        assert self.request('post')['title'] is None
+        assert self.request('get', '/admin/reviews/title/')['title'] is None
+
+    def test_writer_sticks_to_primary(self):
+        self.request('patch', token='Bearer one')
+        assert self.request('get', token='Bearer one')['title'] is None, (
+            'Проверьте, что после записи клиент читает из основной базы'
+        )
+        assert self.request('get', token='Bearer two')['title'] == 'replica_1'
+
+    def test_sticky_window_expires(self, settings):
+        settings.DATABASE_REPLICAS = dict(REPLICAS, STICKY_SECONDS=0)
+        self.request('post', token='Bearer one')
+        assert self.request('get', token='Bearer one')['title'] == 'replica_1'
+
+    def test_outside_requests_use_primary(self):
+        from api.replicas import ReplicaRouter
+        from reviews.models import Title
+
+        assert ReplicaRouter().db_for_read(Title) is None
+
+    def test_disabled_without_replicas(self, settings):
+        from api.replicas import ReplicaMiddleware
+        from django.core.exceptions import MiddlewareNotUsed
+
+        settings.DATABASE_REPLICAS = dict(REPLICAS, ALIASES=[])
+        with pytest.raises(MiddlewareNotUsed):
+            ReplicaMiddleware(lambda request: None)
+
+    def test_one_replica_per_request(self, settings):
+        from api.replicas import ReplicaMiddleware, ReplicaRouter
+        from reviews.models import Review, Title
+
+        settings.DATABASE_REPLICAS = dict(
+            REPLICAS, ALIASES=['replica_1', 'replica_2']
+        )
+        used = set()
+
+        def get_response(request):
+            router = ReplicaRouter()
+            for _ in range(20):
+                used.add(router.db_for_read(Title))
+                used.add(router.db_for_read(Review))
+
+        for _ in range(10):
+            ReplicaMiddleware(get_response)(RequestFactory().get('/'))
+            assert len(used) == 1, (
+                'Проверьте, что все чтения запроса идут в одну реплику'
+            )
+            used.clear()
+
+    def test_primary_block(self):
+        from api.replicas import ReplicaMiddleware, ReplicaRouter, primary
+        from reviews.models import Title
+
+        used = []
+
+        def get_response(request):
+            with primary():
+                used.append(ReplicaRouter().db_for_read(Title))
+            used.append(ReplicaRouter().db_for_read(Title))
+
+        ReplicaMiddleware(get_response)(RequestFactory().get('/'))
+        assert used == [None, 'replica_1']
+
+    def test_cache_fill_reads_primary(self, settings):
+        from api.cache import response_cache
+        from api.replicas import ReplicaMiddleware, ReplicaRouter
+        from django.contrib.auth.models import AnonymousUser
+        from rest_framework.request import Request
+        from rest_framework.response import Response
+        from reviews.models import Title
+
+        settings.RESPONSE_CACHE = dict(settings.RESPONSE_CACHE, ENABLED=True)
+        response_cache.backend.clear()
+        used = []
+
+        def compute():
+            used.append(ReplicaRouter().db_for_read(Title))
+            return Response([])
+
+        def get_response(request):
+            request = Request(request)
+            request.user = AnonymousUser()
+            response_cache.fetch(request, ('titles',), compute)
+
+        ReplicaMiddleware(get_response)(RequestFactory().get('/'))
+        assert used == [None], (
+            'Проверьте, что ответ для кэша вычисляется в основной базе, '
+            'а не в отстающей реплике'
+        )
+
+    @pytest.mark.django_db
+    def test_versioned_reads_use_primary(self, api_client, catalog):
+        catalog(2)
+        # replica_1 is not a configured database, so any query routed to
+        # it would fail.
+        response = api_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'ETag' in response
+        title = response.json()['results'][0]['id']
+        assert api_client.get(f'/api/v1/titles/{title}/').status_code == 200
+
+    def test_local_pin_store_warns(self):
+        from api.checks import check_shared_cache
+
+        assert 'api.W002' in [
+            warning.id for warning in check_shared_cache(None)
+        ]
@@ -0,0 +1,115 @@
+import io
+
+import pytest
+
+
+def found(api_client, query):
+    response = api_client.get('/api/v1/titles/', {'search': query})
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.fixture
+def category(db):
+    from reviews.models import Category
+
+    return Category.objects.create(name='Фильмы', slug='movie')
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def test_name_and_description(self, api_client, category):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Сталкер', year=1979, category=category,
+            description='Зона исполняет желания',
+        )
+        Title.objects.create(name='Солярис', year=1972, category=category)
+        assert found(api_client, 'сталкер') == ['Сталкер']
+        assert found(api_client, 'Зона') == ['Сталкер'], (
+            'Проверьте, что поиск идет и по описанию'
+        )
+        assert found(api_client, 'Андрей') == []
+
+    def test_saved_and_deleted(self, api_client, category):
+        from reviews.models import Title
+
+        title = Title.objects.create(
+            name='Сталкер', year=1979, category=category
+        )
+        title.name = 'Зеркало'
+        title.save()
+        assert found(api_client, 'Сталкер') == []
+        assert found(api_client, 'Зеркало') == ['Зеркало']
+        title.delete()
+        assert found(api_client, 'Зеркало') == []
+
+    @pytest.mark.parametrize('with_pk', (True, False))
+    def test_bulk_create(self, api_client, category, with_pk):
+        from reviews.models import Title
+
+        Title.objects.create(name='Солярис', year=1972, category=category)
+        Title.objects.bulk_create([
+            Title(
+                pk=100 + i if with_pk else None, name=f'Сталкер {i}',
+                year=1979, category=category,
+            )
+            for i in range(3)
+        ])
+        assert sorted(found(api_client, 'Сталкер')) == [
+            'Сталкер 0', 'Сталкер 1', 'Сталкер 2'
+        ], 'Проверьте, что пакетная вставка обновляет поисковый индекс'
+        assert found(api_client, 'Солярис') == ['Солярис']
+
+    def test_queryset_update(self, api_client, category):
+        from reviews.models import Title
+
+        titles = [
+            Title.objects.create(name=f'Сталкер {i}', year=1979,
+                                 category=category)
+            for i in range(3)
+        ]
+        Title.objects.filter(pk=titles[0].pk).update(name='Зеркало')
+        assert found(api_client, 'Зеркало') == ['Зеркало'], (
+            'Проверьте, что UPDATE выборки обновляет поисковый индекс'
+        )
+        assert len(found(api_client, 'Сталкер')) == 2
+        titles[1].description = 'Фильм о Зоне'
+        Title.objects.bulk_update(titles[1:], ['description'])
+        assert found(api_client, 'Зоне') == ['Сталкер 1']
+
+    def test_counter_updates_keep_index(self, api_client, discussion):
+        from reviews.models import Review
+
+        title, review = discussion(2)
+        Review.objects.filter(pk=review.pk).delete()
+        assert found(api_client, title.name) == [title.name]
+
+    def test_bulk_api(self, api_client, category):
+        from users.models import ADMIN, User
+
+        api_client.force_authenticate(User.objects.create(
+            username='admin', email='admin@ya.ru', role=ADMIN
+        ))
+        response = api_client.post('/api/v1/titles/bulk/', [
+            {'name': 'Сталкер', 'year': 1979, 'category': 'movie',
+             'genre': []},
+        ], format='json')
+        assert response.status_code == 201
+        assert found(api_client, 'Сталкер') == ['Сталкер']
+
+    def test_rebuild(self, api_client, category):
+        from django.core.management import call_command
+        from django.db import DEFAULT_DB_ALIAS
+        from reviews.models import Title
+        from reviews.search import get_title_search
+
+        Title.objects.create(name='Сталкер', year=1979, category=category)
+        search = get_title_search(DEFAULT_DB_ALIAS)
+        search.remove(Title.objects.get().pk)
+        if search.indexed_by_app:
+            assert found(api_client, 'Сталкер') == []
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        assert found(api_client, 'Сталкер') == ['Сталкер']
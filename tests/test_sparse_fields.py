@@ -0,0 +1,89 @@
+import pytest
+from django.test import override_settings
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?fields=id,name,rating',
+    '/api/v1/titles/?omit=description',
+    '/api/v1/titles/?fields=genre,category',
+    '/api/v1/titles/?genre=genre-1&ordering=-rating',
+    '/api/v1/titles/?search=Произведение',
+    '/api/v1/titles/?pagination=cursor&fields=id,name',
+)
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def get(self, api_client, url):
+        from api.cache import response_cache
+
+        response_cache.backend.clear()
+        response = api_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        return response.content
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_fast_list_is_identical(self, api_client, catalog, discussion,
+                                    url):
+        from reviews.models import Title
+
+        discussion(3)
+        Title.objects.filter(
+            pk=Title.objects.order_by('pk').values('pk')[:1]
+        ).update(category=None)
+        fast = self.get(api_client, url)
+        with override_settings(FAST_LISTS=False):
+            slow = self.get(api_client, url)
+        assert fast == slow, (
+            f'Проверьте, что быстрый список `{url}` совпадает побайтно '
+            'с ответом сериализатора'
+        )
+
+    def test_fields_and_omit(self, api_client, catalog):
+        title = catalog(2)[0]
+        response = api_client.get('/api/v1/titles/?fields=id,name,rating')
+        assert list(response.json()['results'][0]) == ['id', 'name', 'rating']
+        response = api_client.get(f'/api/v1/titles/{title.pk}/?omit=genre')
+        assert 'genre' not in response.json()
+        assert 'description' in response.json()
+        response = api_client.get('/api/v1/titles/?fields=nope')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в ?fields= дает ошибку 400'
+        )
+
+    def test_description_is_deferred(self, api_client, catalog):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        title = catalog(1)[0]
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(f'/api/v1/titles/{title.pk}/?fields=id,name')
+        assert all(
+            'description' not in query['sql']
+            for query in queries.captured_queries
+        ), 'Проверьте, что незапрошенный description не выбирается'
+
+    def test_stats_only_on_request(self, api_client, catalog, monkeypatch):
+        from api.rows import TitleRows
+
+        catalog(2)
+        calls = []
+        init = TitleRows.__init__
+        monkeypatch.setattr(
+            TitleRows, '__init__',
+            lambda rows, names: calls.append(names) or init(rows, names),
+        )
+        item = api_client.get(
+            '/api/v1/titles/?omit=description'
+        ).json()['results'][0]
+        assert 'stats' not in item, (
+            'Проверьте, что ?omit= не включает статистику оценок'
+        )
+        assert calls, 'Проверьте, что ?omit= не отключает быстрый список'
+        item = api_client.get(
+            '/api/v1/titles/?fields=id,stats'
+        ).json()['results'][0]
+        assert list(item) == ['id', 'stats']
@@ -0,0 +1,127 @@
+import pytest
+
+
+def histogram(title):
+    from reviews.models import TitleStats
+
+    return {
+        score: count for score, count in
+        TitleStats.objects.get(title=title).scores.items() if count
+    }
+
+
+@pytest.fixture
+def rate(db, catalog):
+    from reviews.models import Review
+    from users.models import User
+
+    def create(title, *scores):
+        offset = Review.objects.count()
+        return [
+            Review.objects.create(
+                title=title, text='Отзыв', score=score,
+                author=User.objects.create(
+                    username=f'critic{offset + i}',
+                    email=f'c{offset + i}@ya.ru',
+                ),
+            )
+            for i, score in enumerate(scores)
+        ]
+
+    return create
+
+
+@pytest.mark.django_db
+class TestHistogram:
+
+    def test_create_change_delete(self, catalog, rate):
+        title = catalog(1)[0]
+        assert histogram(title) == {}
+        reviews = rate(title, 3, 7, 7)
+        assert histogram(title) == {3: 1, 7: 2}, (
+            'Проверьте, что новый отзыв попадает в распределение оценок'
+        )
+        reviews[0].score = 7
+        reviews[0].save()
+        assert histogram(title) == {7: 3}, (
+            'Проверьте, что смена оценки переносит отзыв в распределении'
+        )
+        reviews[1].text = 'Новый текст'
+        reviews[1].save()
+        assert histogram(title) == {7: 3}
+        reviews[2].delete()
+        assert histogram(title) == {7: 2}
+
+    def test_moved_review(self, catalog, rate):
+        first, second = catalog(2)
+        review, = rate(first, 5)
+        review.title = second
+        review.save()
+        assert (histogram(first), histogram(second)) == ({}, {5: 1})
+
+    @pytest.mark.parametrize('scores, mean, median', (
+        ((), None, None),
+        ((8,), 8, 8),
+        ((1, 10), 5.5, 5.5),
+        ((2, 3, 10), 5, 3),
+        ((1, 1, 9, 10), 5.25, 5),
+        ((4, 4, 4, 9, 9), 6, 4),
+    ))
+    def test_mean_and_median(self, catalog, rate, scores, mean, median):
+        from reviews.models import TitleStats
+
+        title = catalog(1)[0]
+        rate(title, *scores)
+        stats = TitleStats.objects.get(title=title)
+        assert stats.count == len(scores)
+        assert (stats.mean, stats.median) == (mean, median), (
+            'Проверьте расчет средней и медианы по распределению'
+        )
+
+    def test_endpoint(self, api_client, catalog, rate):
+        title = catalog(1)[0]
+        rate(title, 2, 3, 10)
+        data = api_client.get(f'/api/v1/titles/{title.pk}/stats/').json()
+        assert (data['count'], data['mean'], data['median']) == (3, 5, 3)
+        assert data['scores']['10'] == 1
+
+    @pytest.mark.parametrize('pk', ('abc', 0))
+    def test_endpoint_not_found(self, api_client, catalog, pk):
+        catalog(1)
+        response = api_client.get(f'/api/v1/titles/{pk}/stats/')
+        assert response.status_code == 404, (
+            'Проверьте, что статистика неизвестного произведения дает 404'
+        )
+
+    def test_endpoint_hidden_title(self, api_client, catalog, rate):
+        from reviews.models import Title
+
+        title = catalog(1)[0]
+        rate(title, 5)
+        Title.objects.filter(pk=title.pk).update(pending_deletion=True)
+        assert api_client.get(
+            f'/api/v1/titles/{title.pk}/stats/'
+        ).status_code == 404, (
+            'Проверьте, что статистика скрытого произведения недоступна'
+        )
+
+
+@pytest.mark.django_db
+class TestStatsDrift:
+
+    def test_drift_in_chunks(self, catalog, rate):
+        from reviews.models import TitleStats
+        from reviews.stats import find_stats_drift, save_stats
+
+        titles = catalog(5)
+        for title in titles:
+            rate(title, 6)
+        TitleStats.objects.filter(title=titles[1]).update(score_6=3)
+        TitleStats.objects.filter(title=titles[4]).delete()
+        drifted = find_stats_drift(chunk_size=2)
+        assert sorted(row.title_id for row in drifted) == [
+            titles[1].pk, titles[4].pk
+        ], 'Проверьте, что расхождения находятся во всех порциях'
+        save_stats(drifted)
+        assert find_stats_drift(chunk_size=2) == []
+        assert histogram(titles[4]) == {6: 1}
@@ -0,0 +1,85 @@
+import io
+
+import pytest
+
+
+def generate(prefix, seed=1):
+    from api.synthetic import Generator
+
+    return Generator(
+        60, 40, categories=3, genres=5, seed=seed, prefix=prefix,
+        max_reviews=30, max_comments=5, batch_size=50,
+    ).generate()
+
+
+def fingerprint(prefix):
+    from django.db.models import Count
+    from reviews.models import Review, Title
+    from users.models import User
+
+    return (
+        list(User.objects.filter(username__startswith=prefix).order_by(
+            'pk'
+        ).values_list('role', 'confirmation_code')),
+        [
+            (title.year, title.category.name, title.rating, title.genres)
+            for title in Title.objects.filter(
+                category__slug__startswith=prefix
+            ).order_by('pk').select_related('category').annotate(
+                genres=Count('genre')
+            )
+        ],
+        list(Review.objects.filter(
+            author__username__startswith=prefix
+        ).order_by('pk').values_list(
+            'author__username', 'score', 'comment_count'
+        )),
+    )
+
+
+@pytest.mark.django_db
+class TestSynthetic:
+
+    def test_deterministic(self):
+        first = generate('first')
+        second = generate('second')
+        assert first == second
+        left, right = fingerprint('first'), fingerprint('second')
+        assert left[:2] == right[:2], (
+            'Проверьте, что одинаковый seed дает одинаковые данные'
+        )
+        assert [row[1:] for row in left[2]] == [row[1:] for row in right[2]]
+        generate('third', seed=2)
+        assert fingerprint('third')[1] != left[1], (
+            'Проверьте, что другой seed дает другие данные'
+        )
+
+    def test_consistent(self):
+        from django.core.management import call_command
+        from django.db.models import F, Min
+        from reviews.models import Comment, Review
+        from users.models import ADMIN, MODER, USER, User
+
+        counts = generate('gen')
+        assert counts['reviews'] == Review.objects.count() > 0
+        assert counts['comments'] == Comment.objects.count() > 0
+        assert set(User.objects.values_list('role', flat=True)) == {
+            ADMIN, MODER, USER,
+        }
+        out = io.StringIO()
+        call_command('recalculate_ratings', '--dry-run', stdout=out)
+        assert out.getvalue().count('drift: 0') == 3, out.getvalue()
+        assert not Review.objects.annotate(
+            first_comment=Min('comments__pub_date')
+        ).filter(first_comment__lt=F('pub_date')).exists(), (
+            'Проверьте, что комментарии не старше отзывов'
+        )
+        last = Review.objects.order_by('pk').last().pk
+        review = Review.objects.create(
+            title=Review.objects.first().title,
+            author=User.objects.create(username='new', email='new@ya.ru'),
+            text='Отзыв', score=5,
+        )
+        assert review.pk == last + 1, (
+            'Проверьте, что последовательности ключей сдвинуты'
+        )